@@ -5,13 +5,21 @@ VERSÃO CORRIGIDA - Processamento paralelo funcional
 """
 
 from langgraph.graph import StateGraph, END
-from .state import GuiaState
+from .state import GuiaState, liberar_conteudo_topico
 from .nodes.gerador_node import gerador_node
+from .nodes.especulativo_node import especulativo_node
 from .nodes.revisor_node import revisor_node
 from .nodes.salvar_node import salvar_node
 import asyncio
-from typing import List
-from backend.utils.logger import logger
+from functools import lru_cache
+from typing import List, Optional, Callable
+from datetime import datetime
+from backend.core.config import get_settings
+from backend.utils.logger import logger, criar_buffer_logs
+from backend.services.worker_pool import executar_em_pool
+from backend.services.config_parser import extrair_fallbacks, extrair_revisor_rapido
+
+settings = get_settings()
 
 
 def create_guias_graph():
@@ -20,17 +28,24 @@ def create_guias_graph():
     workflow = StateGraph(GuiaState)
     
     # Adiciona nodes
+    workflow.add_node("especular", especulativo_node)
     workflow.add_node("gerar", gerador_node)
     workflow.add_node("revisar", revisor_node)
     workflow.add_node("salvar", salvar_node)
     
-    # Entry point
-    workflow.set_entry_point("gerar")
+    # Entry point: disputa best-of-N (modo especulativo) ou geração simples
+    def escolher_entrada(state: GuiaState) -> str:
+        return "especular" if state.get("especulativo") else "gerar"
+    
+    workflow.set_conditional_entry_point(
+        escolher_entrada,
+        {"especular": "especular", "gerar": "gerar"}
+    )
     
     # Edges
     workflow.add_edge("gerar", "revisar")
     
-    # Edge condicional (revisar → gerar ou salvar)
+    # Edge condicional (revisar/especular → gerar ou salvar)
     def should_retry(state: GuiaState) -> str:
         topico = next(t for t in state["topicos"] if t["id"] == state["topico_atual_id"])
         
@@ -45,11 +60,29 @@ def create_guias_graph():
         {"gerar": "gerar", "salvar": "salvar"}
     )
     
+    workflow.add_conditional_edges(
+        "especular",
+        should_retry,
+        {"gerar": "gerar", "salvar": "salvar"}
+    )
+    
     workflow.add_edge("salvar", END)
     
     return workflow.compile()
 
 
+@lru_cache()
+def obter_grafo_guias():
+    """
+    Grafo de guias compilado uma única vez por processo.
+    
+    O grafo compilado não guarda estado entre execuções (sem
+    checkpointer): cada tópico roda com o próprio state, então a mesma
+    instância atende jobs e tópicos concorrentes.
+    """
+    return create_guias_graph()
+
+
 # ============================================
 # PROCESSAMENTO DE UM ÚNICO TÓPICO
 # ============================================
@@ -107,6 +140,7 @@ async def processar_topico(
             "message": str(e),
             "timestamp": datetime.now().isoformat()
         }
+        liberar_conteudo_topico(topico)
         
         return topico_id, topico
 
@@ -118,15 +152,22 @@ async def processar_topico(
 async def processar_topicos_paralelo(
     state: GuiaState,
     graph,
-    max_paralelo: int = 3
+    max_paralelo: int = 3,
+    on_topico_concluido: Optional[Callable] = None
 ) -> List[dict]:
     """
     Processa múltiplos tópicos em paralelo.
     
+    Usa um pool fixo de `max_paralelo` workers alimentado por fila, de
+    modo que o overhead não cresce com o número de tópicos e cada
+    tópico é reportado assim que termina.
+    
     Args:
         state: Estado base
         graph: Grafo compilado
         max_paralelo: Máximo de tópicos simultâneos
+        on_topico_concluido: Callback (topico, concluidos, total) chamado
+                             a cada tópico finalizado
         
     Returns:
         Lista de tópicos processados
@@ -137,26 +178,38 @@ async def processar_topicos_paralelo(
     
     logger.info(
         f"🚀 Iniciando processamento PARALELO de {total_topicos} tópico(s)\n"
-        f"   ⚙️ Max simultâneos: {max_paralelo}"
+        f"   ⚙️ Workers: {max_paralelo}"
     )
     
-    # Semáforo para limitar concorrência
-    semaphore = asyncio.Semaphore(max_paralelo)
+    async def processar(topico_id: str):
+        return await processar_topico(state, topico_id, graph)
     
-    async def process_with_semaphore(topico_id: str):
-        """Wrapper que usa semáforo para limitar concorrência."""
-        async with semaphore:
-            return await processar_topico(state, topico_id, graph)
+    concluidos = 0
     
-    # Cria tasks para todos os tópicos
-    tasks = [process_with_semaphore(tid) for tid in topicos_ids]
+    async def ao_concluir(indice: int, topico_id: str, resultado):
+        nonlocal concluidos
+        concluidos += 1
+        
+        if isinstance(resultado, Exception):
+            topico = state["topicos"][indice]
+        else:
+            topico = resultado[1]
+        
+        logger.info(f"📊 [Paralelo] {concluidos}/{total_topicos} tópico(s) finalizado(s)")
+        
+        if on_topico_concluido:
+            retorno = on_topico_concluido(topico, concluidos, total_topicos)
+            if asyncio.iscoroutine(retorno):
+                await retorno
     
-    # Executa todas as tasks em paralelo (respeitando max_paralelo)
     logger.info(f"⏳ Aguardando conclusão de {total_topicos} tópico(s)...")
     
-    resultados = await asyncio.gather(
-        *tasks,
-        return_exceptions=True  # Não para se um falhar
+    resultados = await executar_em_pool(
+        topicos_ids,
+        processar,
+        max_workers=max_paralelo,
+        on_resultado=ao_concluir,
+        nome="guias"
     )
     
     # Processa resultados
@@ -172,6 +225,7 @@ async def processar_topicos_paralelo(
                 "message": str(resultado),
                 "timestamp": datetime.now().isoformat()
             }
+            liberar_conteudo_topico(topico_original)
             topicos_processados[topico_original["id"]] = topico_original
         else:
             topico_id, topico_atualizado = resultado
@@ -200,7 +254,12 @@ async def processar_topicos_paralelo(
 # FUNÇÃO PRINCIPAL - EXECUTE GRAPH GUIAS
 # ============================================
 
-async def execute_graph_guias(config: dict, modo: str = "sequencial"):
+async def execute_graph_guias(
+    config: dict,
+    modo: str = "sequencial",
+    on_topico_concluido: Optional[Callable] = None,
+    gerar_handoff_mapas: bool = False
+):
     """
     Executa geração de guias para todos os tópicos.
     
@@ -209,12 +268,18 @@ async def execute_graph_guias(config: dict, modo: str = "sequencial"):
     Args:
         config: Dict com configuração do YAML
         modo: "sequencial" ou "paralelo"
+        on_topico_concluido: Callback (topico, concluidos, total) chamado
+                             assim que cada tópico é finalizado
+        gerar_handoff_mapas: Se True, devolve em "handoffs" os dados de
+                             cada guia já extraídos para o pipeline de mapas
     """
     from .state import criar_topico_inicial, criar_estatisticas_iniciais
-    from datetime import datetime
     
     logger.info(f"📋 Modo de processamento: {modo.upper()}")
     
+    # Cadeias de failover por papel (modelos_guias.<papel>.fallback)
+    fallbacks = extrair_fallbacks(config, "modelos_guias")
+    
     # Cria state inicial
     state: GuiaState = {
         "projeto_nome": config["projeto"]["nome"],
@@ -231,15 +296,20 @@ async def execute_graph_guias(config: dict, modo: str = "sequencial"):
         "llm_gerador_modelo": config["modelos_guias"]["gerador"]["modelo"],
         "llm_gerador_temperatura": config["modelos_guias"]["gerador"].get("temperatura", 0.7),
         "llm_gerador_max_tokens": config["modelos_guias"]["gerador"].get("max_tokens", 8000),
+        "llm_gerador_fallback": fallbacks.get("gerador"),
         
         "llm_revisor_provider": config["modelos_guias"]["revisor"]["provedor"],
         "llm_revisor_modelo": config["modelos_guias"]["revisor"]["modelo"],
         "llm_revisor_temperatura": config["modelos_guias"]["revisor"].get("temperatura", 0.3),
         "llm_revisor_max_tokens": config["modelos_guias"]["revisor"].get("max_tokens", 2048),
+        "llm_revisor_fallback": fallbacks.get("revisor"),
+        "llm_revisor_rapido": extrair_revisor_rapido(config, "modelos_guias"),
         
         "max_paralelo": config["processamento"].get("max_paralelo", 3),
         "max_tentativas_revisao": config["processamento"].get("max_tentativas_revisao", 3),
         "delay_retry": config["processamento"].get("delay_retry", 5),
+        "gerar_handoff_mapas": gerar_handoff_mapas,
+        "especulativo": config["processamento"].get("especulativo", settings.especulacao_ativa),
         
         "prompt_gerador": "",  # Carregado dos prompts.py
         "prompt_revisor": "",
@@ -247,11 +317,11 @@ async def execute_graph_guias(config: dict, modo: str = "sequencial"):
         "status_geral": "processando",
         "topico_atual_id": None,
         "estatisticas": criar_estatisticas_iniciais(len(config["topicos"])),
-        "logs": [],
+        "logs": criar_buffer_logs(),
         "erro_msg": None
     }
     
-    graph = create_guias_graph()
+    graph = obter_grafo_guias()
     
     # ============================================
     # ESCOLHE MODO DE PROCESSAMENTO
@@ -266,7 +336,8 @@ async def execute_graph_guias(config: dict, modo: str = "sequencial"):
         topicos_finais = await processar_topicos_paralelo(
             state=state,
             graph=graph,
-            max_paralelo=max_paralelo
+            max_paralelo=max_paralelo,
+            on_topico_concluido=on_topico_concluido
         )
         
         # Atualiza state com tópicos processados
@@ -276,7 +347,9 @@ async def execute_graph_guias(config: dict, modo: str = "sequencial"):
         # ✅ PROCESSAMENTO SEQUENCIAL (original)
         logger.info("📝 Usando processamento SEQUENCIAL")
         
-        for topico in state["topicos"]:
+        total_topicos = len(state["topicos"])
+        
+        for i, topico in enumerate(state["topicos"], 1):
             state["topico_atual_id"] = topico["id"]
             
             logger.info(f"🎯 Processando: {topico['nome_completo']}")
@@ -296,6 +369,13 @@ async def execute_graph_guias(config: dict, modo: str = "sequencial"):
             
             if topico["status"] == "concluido":
                 logger.success(f"✅ Concluído: {topico['nome_completo']}")
+            else:
+                liberar_conteudo_topico(topico)
+            
+            if on_topico_concluido:
+                retorno = on_topico_concluido(topico, i, total_topicos)
+                if asyncio.iscoroutine(retorno):
+                    await retorno
     
     # ============================================
     # FINALIZAÇÃO
@@ -308,6 +388,13 @@ async def execute_graph_guias(config: dict, modo: str = "sequencial"):
         if t["status"] == "concluido" and t.get("nome_arquivo")
     ]
     
+    # Handoffs para o pipeline de mapas, por nome de arquivo
+    handoffs = {
+        t["nome_arquivo"]: t["handoff_mapa"]
+        for t in state["topicos"]
+        if t["status"] == "concluido" and t.get("handoff_mapa")
+    }
+    
     state["status_geral"] = "concluido"
     state["arquivos_gerados"] = arquivos_gerados
     
@@ -325,6 +412,7 @@ async def execute_graph_guias(config: dict, modo: str = "sequencial"):
         "status": "concluido",
         "status_geral": "concluido",
         "arquivos_gerados": arquivos_gerados,
+        "handoffs": handoffs,
         "estatisticas": state.get("estatisticas", {}),
-        "logs": state.get("logs", [])
+        "logs": list(state.get("logs", []))
     }
\ No newline at end of file
@@ -0,0 +1,209 @@
+# backend/agents/guias/nodes/especulativo_node.py
+"""
+Node de geração especulativa (best-of-N) de guias.
+
+Substitui a 1ª rodada gerar → revisar quando `especulativo` está ativo:
+N guias são gerados em paralelo e cada um é revisado assim que fica
+pronto. O primeiro aprovado encerra a disputa (o restante é cancelado).
+Se nenhum for aprovado, o de maior nota segue para o fluxo normal
+(gerador com retry conversacional → revisor delta).
+"""
+
+from ..state import GuiaState
+from ..prompts.gerador_prompts import SYSTEM_PROMPT as GERADOR_SYSTEM
+from ..prompts.gerador_prompts import USER_PROMPT_TEMPLATE as GERADOR_TEMPLATE
+from ..prompts.revisor_prompts import SYSTEM_PROMPT as REVISOR_SYSTEM
+from ..prompts.revisor_prompts import USER_PROMPT_TEMPLATE as REVISOR_TEMPLATE
+from .revisor_node import AvaliacaoGuia, feedback_de_avaliacao
+from backend.services.llm_factory import get_llm
+from backend.services.conversa_retry import montar_conversa
+from backend.services.revisao_cascata import criar_revisor
+from backend.services.content_linter import lintar, mesclar_achados
+from backend.services.especulacao import (
+    chave_historico,
+    escolher_num_candidatos,
+    disputar_candidatos
+)
+from backend.services.retry_policy import PoliticaRetry
+from backend.core.config import get_settings
+from backend.utils.logger import logger
+from datetime import datetime
+import asyncio
+
+settings = get_settings()
+
+
+async def especulativo_node(state: GuiaState) -> GuiaState:
+    """
+    Gera N candidatos em paralelo e fica com o melhor aprovado.
+    
+    Status de saída do tópico:
+    - "salvando": candidato aprovado (ou auto-aprovado)
+    - "gerando": nenhum aprovado (ou todos falharam) → fluxo normal
+    """
+    
+    topico_id = state["topico_atual_id"]
+    topico = next(t for t in state["topicos"] if t["id"] == topico_id)
+    nome_topico = topico["nome_completo"]
+    max_tentativas = state["max_tentativas_revisao"]
+    
+    topico["status"] = "gerando"
+    topico["timestamp_inicio"] = datetime.now().isoformat()
+    
+    chave = chave_historico("guias", state["llm_gerador_provider"])
+    num_candidatos = escolher_num_candidatos(chave)
+    
+    logger.info(f"🎲 Geração especulativa: {num_candidatos} candidato(s) para {nome_topico}")
+    
+    try:
+        # ============================================
+        # LLMS E PROMPTS
+        # ============================================
+        
+        llm_gerador = get_llm(
+            provider=state["llm_gerador_provider"],
+            model=state["llm_gerador_modelo"],
+            temperature=state["llm_gerador_temperatura"],
+            max_tokens=state["llm_gerador_max_tokens"],
+            papel="guias_gerador",
+            fallbacks=state.get("llm_gerador_fallback")
+        )
+        
+        llm_revisor = criar_revisor(
+            get_llm(
+                provider=state["llm_revisor_provider"],
+                model=state["llm_revisor_modelo"],
+                temperature=state["llm_revisor_temperatura"],
+                max_tokens=state["llm_revisor_max_tokens"],
+                papel="guias_revisor",
+                fallbacks=state.get("llm_revisor_fallback")
+            ),
+            AvaliacaoGuia,
+            nota=lambda a: a.pontuacao_geral,
+            papel="guias_revisor",
+            rapido=state.get("llm_revisor_rapido")
+        )
+        
+        mensagens = montar_conversa(
+            GERADOR_SYSTEM,
+            GERADOR_TEMPLATE.format(
+                area_conhecimento=state["area_conhecimento"],
+                topico=nome_topico
+            )
+        )
+        
+        politica = PoliticaRetry(
+            max_tentativas=settings.llm_max_tentativas_chamada,
+            base=state["delay_retry"]
+        )
+        
+        # ============================================
+        # DISPUTA
+        # ============================================
+
+        async def gerar(indice: int):
+            return await politica.executar(
+                lambda: llm_gerador.ainvoke(mensagens),
+                descricao=f"Gerador ({nome_topico}, candidato {indice + 1})"
+            )
+
+        async def revisar(response) -> AvaliacaoGuia:
+            user_prompt = REVISOR_TEMPLATE.format(
+                topico=nome_topico,
+                area_conhecimento=state["area_conhecimento"],
+                html_gerado=response.content,
+                tentativa=1,
+                max_tentativas=max_tentativas,
+                feedback_anterior=""
+            )
+            lint_guia = asyncio.create_task(lintar("guia", response.content))
+            avaliacao = await politica.executar(
+                lambda: llm_revisor.ainvoke([
+                    {"role": "system", "content": REVISOR_SYSTEM},
+                    {"role": "user", "content": user_prompt}
+                ]),
+                descricao=f"Revisor ({nome_topico})"
+            )
+            return mesclar_achados(avaliacao, await lint_guia)
+        
+        melhor, concluidos = await disputar_candidatos(
+            num_candidatos,
+            gerar,
+            revisar,
+            aprovado=lambda avaliacao: avaliacao.aprovado,
+            nota=lambda avaliacao: avaliacao.pontuacao_geral,
+            chave=chave,
+            descricao=nome_topico
+        )
+    
+    except Exception as e:
+        logger.error(f"❌ Erro na geração especulativa: {e}")
+        melhor, concluidos = None, []
+    
+    # ============================================
+    # TOKENS E HISTÓRICO
+    # ============================================
+    
+    topico["tokens_usados"]["geracao_input"] = sum(
+        c.saida.usage_metadata.get("input_tokens", 0) for c in concluidos
+    )
+    topico["tokens_usados"]["geracao_output"] = sum(
+        c.saida.usage_metadata.get("output_tokens", 0) for c in concluidos
+    )
+    
+    aprovados = [c for c in concluidos if c.avaliacao.aprovado]
+    
+    topico["historico"].append({
+        "timestamp": datetime.now().isoformat(),
+        "acao": "geracao_especulativa",
+        "tentativa": 1,
+        "candidatos": num_candidatos,
+        "revisados": len(concluidos),
+        "aprovados": len(aprovados),
+        "pontuacoes": [c.avaliacao.pontuacao_geral for c in concluidos],
+        "tokens": {
+            "input": topico["tokens_usados"]["geracao_input"],
+            "output": topico["tokens_usados"]["geracao_output"]
+        }
+    })
+    
+    # ============================================
+    # DECISÃO
+    # ============================================
+    
+    if melhor is None:
+        # Todos falharam: segue pelo fluxo normal, do zero
+        logger.warning(f"⚠️ Nenhum candidato revisado para {nome_topico}; usando fluxo normal")
+        topico["status"] = "gerando"
+        return state
+    
+    avaliacao = melhor.avaliacao
+    topico["html_gerado"] = melhor.saida.content
+    topico["ultimo_feedback"] = feedback_de_avaliacao(avaliacao, 1)
+    
+    if avaliacao.aprovado:
+        logger.success(
+            f"✅ Guia APROVADO na disputa (candidato {melhor.indice + 1}, "
+            f"nota {avaliacao.pontuacao_geral:.1f}/10)"
+        )
+        topico["status"] = "salvando"
+        return state
+    
+    topico["tentativas_revisao"] = 1
+    
+    if topico["tentativas_revisao"] >= max_tentativas:
+        topico["status"] = "salvando"
+        topico["ultimo_feedback"]["aprovado"] = True
+        topico["ultimo_feedback"]["observacoes"] = (
+            f"[AUTO-APROVADO] Esgotadas {max_tentativas} tentativas. "
+            f"Nota original: {avaliacao.pontuacao_geral:.1f}. "
+            f"Revisar manualmente se necessário."
+        )
+    else:
+        logger.info(
+            f"🔄 Nenhum candidato aprovado; melhor (nota {avaliacao.pontuacao_geral:.1f}) "
+            "segue para o retry conversacional"
+        )
+        topico["status"] = "gerando"
+    
+    return state
@@ -1,9 +1,30 @@
-from ..state import GuiaState
+from ..state import GuiaState, liberar_conteudo_topico
 from backend.services.llm_factory import get_llm
-from ..prompts.gerador_prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
+from ..prompts.gerador_prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE, FEEDBACK_RETRY_TEMPLATE
+from backend.services.revisao_delta import formatar_problemas
+from backend.services.conversa_retry import montar_conversa, formatar_sugestoes
+from backend.services.retry_policy import PoliticaRetry
+from backend.core.config import get_settings
 from backend.utils.logger import logger
 from datetime import datetime
 
+settings = get_settings()
+
+
+def montar_feedback_retry(topico: dict, max_tentativas: int) -> str:
+    """Turno user com as críticas do revisor, para o retry conversacional."""
+    feedback = topico["ultimo_feedback"]
+    
+    return FEEDBACK_RETRY_TEMPLATE.format(
+        tentativa=feedback.get("tentativa", topico["tentativas_revisao"]),
+        max_tentativas=max_tentativas,
+        nota=feedback.get("pontuacao_geral") or 0.0,
+        problemas=formatar_problemas(feedback.get("problemas", [])) or "- (não detalhados)",
+        sugestoes=formatar_sugestoes(feedback.get("sugestoes_melhoria", [])),
+        observacoes=feedback.get("observacoes") or "-"
+    )
+
+
 async def gerador_node(state: GuiaState) -> GuiaState:
     """
     Node do LLM Gerador de Guias.
@@ -25,7 +46,9 @@ async def gerador_node(state: GuiaState) -> GuiaState:
             provider=state["llm_gerador_provider"],
             model=state["llm_gerador_modelo"],
             temperature=state["llm_gerador_temperatura"],
-            max_tokens=state["llm_gerador_max_tokens"]
+            max_tokens=state["llm_gerador_max_tokens"],
+            papel="guias_gerador",
+            fallbacks=state.get("llm_gerador_fallback")
         )
         
         # Prepara prompt
@@ -34,11 +57,36 @@ async def gerador_node(state: GuiaState) -> GuiaState:
             topico=topico["nome_completo"]
         )
         
-        # Chama LLM
-        response = await llm.ainvoke([
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": prompt}
-        ])
+        # Retry após reprovação: continua a conversa (guia anterior + críticas)
+        # em vez de reenviar o prompt do zero
+        ultimo = topico.get("ultimo_feedback")
+        html_anterior = None
+        feedback = None
+        
+        if ultimo and not ultimo.get("aprovado") and topico.get("html_gerado"):
+            html_anterior = topico["html_gerado"]
+            feedback = montar_feedback_retry(topico, state["max_tentativas_revisao"])
+            logger.info(
+                f"💬 Retry conversacional: {len(ultimo.get('problemas', []))} problema(s) "
+                "enviados ao gerador"
+            )
+        
+        mensagens = montar_conversa(
+            SYSTEM_PROMPT, prompt,
+            saida_anterior=html_anterior,
+            feedback=feedback
+        )
+        
+        # Chama LLM (retry com backoff; base = processamento.delay_retry)
+        politica = PoliticaRetry(
+            max_tentativas=settings.llm_max_tentativas_chamada,
+            base=state["delay_retry"]
+        )
+        
+        response = await politica.executar(
+            lambda: llm.ainvoke(mensagens),
+            descricao=f"Gerador ({topico['nome_completo']})"
+        )
         
         html_gerado = response.content
         
@@ -52,9 +100,11 @@ async def gerador_node(state: GuiaState) -> GuiaState:
             "timestamp": datetime.now().isoformat(),
             "acao": "geracao",
             "tentativa": topico["tentativas_revisao"] + 1,
+            "conversacional": feedback is not None,
             "tokens": {
                 "input": topico["tokens_usados"]["geracao_input"],
-                "output": topico["tokens_usados"]["geracao_output"]
+                "output": topico["tokens_usados"]["geracao_output"],
+                "cache_read": (response.usage_metadata.get("input_token_details") or {}).get("cache_read", 0)
             }
         })
         
@@ -68,5 +118,6 @@ async def gerador_node(state: GuiaState) -> GuiaState:
         logger.error(f"❌ Erro na geração: {e}")
         topico["status"] = "erro_fatal"
         topico["erro"] = {"message": str(e), "timestamp": datetime.now().isoformat()}
+        liberar_conteudo_topico(topico)
         state["erro_msg"] = str(e)
         return state
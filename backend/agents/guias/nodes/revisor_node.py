@@ -6,13 +6,28 @@ Versão atualizada com substituição dinâmica de variáveis.
 
 from ..state import GuiaState
 from backend.services.llm_factory import get_llm
-from ..prompts.revisor_prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
+from ..prompts.revisor_prompts import (
+    SYSTEM_PROMPT,
+    USER_PROMPT_TEMPLATE,
+    DELTA_SYSTEM_PROMPT,
+    DELTA_USER_PROMPT_TEMPLATE
+)
+from backend.services.retry_policy import PoliticaRetry
+from backend.services.saida_estruturada import SaidaEstruturadaInvalida
+from backend.services.especulacao import chave_historico, registrar_revisao
+from backend.services.revisao_cascata import criar_revisor
+from backend.services.content_linter import lintar, mesclar_achados, e_achado_lint
+from backend.services.revisao_delta import formatar_problemas, aplicar_delta
+from backend.core.config import get_settings
 from backend.utils.logger import logger
 from pydantic import BaseModel, Field
 from typing import List
 from datetime import datetime
+import asyncio
 import json
 
+settings = get_settings()
+
 
 # ============================================
 # MODELS PARA STRUCTURED OUTPUT
@@ -33,6 +48,27 @@ class AvaliacaoGuia(BaseModel):
     observacoes: str
 
 
+class RevisaoDeltaGuia(BaseModel):
+    """Re-revisão: só confere correções e regressões (schema enxuto)."""
+    problemas_corrigidos: List[int] = Field(description="Números dos problemas anteriores que foram corrigidos")
+    regressoes: List[Problema] = Field(default_factory=list, description="Problemas graves novos")
+    aprovado: bool
+    pontuacao_geral: float = Field(ge=0, le=10)
+    comentario: str
+
+
+def feedback_de_avaliacao(avaliacao: AvaliacaoGuia, tentativa: int) -> dict:
+    """Feedback guardado em `topico["ultimo_feedback"]`."""
+    return {
+        "aprovado": avaliacao.aprovado,
+        "pontuacao_geral": avaliacao.pontuacao_geral,
+        "problemas": [p.model_dump() for p in avaliacao.problemas],
+        "sugestoes_melhoria": avaliacao.sugestoes_melhoria,
+        "observacoes": avaliacao.observacoes,
+        "tentativa": tentativa
+    }
+
+
 # ============================================
 # NODE FUNCTION
 # ============================================
@@ -67,9 +103,14 @@ async def revisor_node(state: GuiaState) -> GuiaState:
         
         # Feedback anterior (se houver)
         feedback_anterior = ""
+        problemas_anteriores = []
         if topico.get("ultimo_feedback"):
             ultimo = topico["ultimo_feedback"]
             if not ultimo.get("aprovado"):
+                # Achados do linter não vão para a re-revisão: o lint é refeito
+                problemas_anteriores = [
+                    p for p in ultimo.get("problemas", []) if not e_achado_lint(p)
+                ]
                 feedback_anterior = f"""
 **FEEDBACK DA TENTATIVA ANTERIOR:**
 - Nota: {ultimo.get('pontuacao_geral', 0):.1f}/10
@@ -93,10 +134,22 @@ async def revisor_node(state: GuiaState) -> GuiaState:
             provider=state["llm_revisor_provider"],
             model=state["llm_revisor_modelo"],
             temperature=state["llm_revisor_temperatura"],
-            max_tokens=state["llm_revisor_max_tokens"]
+            max_tokens=state["llm_revisor_max_tokens"],
+            papel="guias_revisor",
+            fallbacks=state.get("llm_revisor_fallback")
         )
         
-        structured_llm = llm.with_structured_output(AvaliacaoGuia)
+        # Retry de guia reprovado: re-revisão delta (só correções/regressões)
+        modo_delta = settings.revisao_delta_em_retries and bool(problemas_anteriores)
+        
+        # Com revisor rápido no YAML: cascata (rápido → forte na faixa de incerteza)
+        structured_llm = criar_revisor(
+            llm,
+            RevisaoDeltaGuia if modo_delta else AvaliacaoGuia,
+            nota=lambda a: a.pontuacao_geral,
+            papel="guias_revisor_delta" if modo_delta else "guias_revisor",
+            rapido=state.get("llm_revisor_rapido")
+        )
         
         logger.debug(f"LLM configurado: {state['llm_revisor_provider']}/{state['llm_revisor_modelo']}")
         
@@ -104,14 +157,26 @@ async def revisor_node(state: GuiaState) -> GuiaState:
         # FORMATA PROMPT COM VARIÁVEIS DINÂMICAS
         # ============================================
         
-        user_prompt = USER_PROMPT_TEMPLATE.format(
-            topico=nome_topico,
-            area_conhecimento=area_conhecimento,
-            html_gerado=html_gerado,
-            tentativa=tentativa_atual,
-            max_tentativas=max_tentativas,
-            feedback_anterior=feedback_anterior
-        )
+        if modo_delta:
+            system_prompt = DELTA_SYSTEM_PROMPT
+            user_prompt = DELTA_USER_PROMPT_TEMPLATE.format(
+                topico=nome_topico,
+                area_conhecimento=area_conhecimento,
+                html_gerado=html_gerado,
+                tentativa=tentativa_atual,
+                max_tentativas=max_tentativas,
+                problemas_anteriores=formatar_problemas(problemas_anteriores)
+            )
+        else:
+            system_prompt = SYSTEM_PROMPT
+            user_prompt = USER_PROMPT_TEMPLATE.format(
+                topico=nome_topico,
+                area_conhecimento=area_conhecimento,
+                html_gerado=html_gerado,
+                tentativa=tentativa_atual,
+                max_tentativas=max_tentativas,
+                feedback_anterior=feedback_anterior
+            )
         
         logger.debug(f"Prompt montado ({len(user_prompt)} chars)")
         
@@ -119,12 +184,38 @@ async def revisor_node(state: GuiaState) -> GuiaState:
         # CHAMA LLM REVISOR
         # ============================================
         
-        logger.info(f"📞 Chamando LLM Revisor (tentativa {tentativa_atual}/{max_tentativas})...")
+        logger.info(
+            f"📞 Chamando LLM Revisor (tentativa {tentativa_atual}/{max_tentativas}"
+            f"{', delta' if modo_delta else ''})..."
+        )
+        
+        politica = PoliticaRetry(
+            max_tentativas=settings.llm_max_tentativas_chamada,
+            base=state["delay_retry"]
+        )
         
-        avaliacao = await structured_llm.ainvoke([
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ])
+        # Linter local em paralelo com o revisor (verificações mecânicas)
+        lint_guia = asyncio.create_task(lintar("guia", html_gerado))
+        
+        try:
+            avaliacao = await politica.executar(
+                lambda: structured_llm.ainvoke([
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ]),
+                descricao=f"Revisor ({nome_topico})"
+            )
+            
+            if modo_delta:
+                avaliacao = aplicar_delta(
+                    avaliacao, problemas_anteriores, AvaliacaoGuia,
+                    campo_nota="pontuacao_geral", campo_texto="observacoes"
+                )
+            
+            avaliacao = mesclar_achados(avaliacao, await lint_guia)
+        finally:
+            # Revisor falhou (ou foi cancelado): o lint não fica solto
+            lint_guia.cancel()
         
         logger.success(
             f"✅ Revisão concluída: "
@@ -136,14 +227,14 @@ async def revisor_node(state: GuiaState) -> GuiaState:
         # ARMAZENA FEEDBACK NO STATE
         # ============================================
         
-        topico["ultimo_feedback"] = {
-            "aprovado": avaliacao.aprovado,
-            "pontuacao_geral": avaliacao.pontuacao_geral,
-            "problemas": [p.model_dump() for p in avaliacao.problemas],
-            "sugestoes_melhoria": avaliacao.sugestoes_melhoria,
-            "observacoes": avaliacao.observacoes,
-            "tentativa": tentativa_atual
-        }
+        topico["ultimo_feedback"] = feedback_de_avaliacao(avaliacao, tentativa_atual)
+        
+        # Taxa de rejeição na 1ª tentativa (calibra o N do modo especulativo)
+        if tentativa_atual == 1:
+            registrar_revisao(
+                chave_historico("guias", state["llm_gerador_provider"]),
+                avaliacao.aprovado
+            )
         
         # ============================================
         # REGISTRA NO HISTÓRICO
@@ -152,6 +243,7 @@ async def revisor_node(state: GuiaState) -> GuiaState:
         topico["historico"].append({
             "timestamp": datetime.now().isoformat(),
             "acao": "revisao",
+            "modo": "delta" if modo_delta else "completa",
             "tentativa": tentativa_atual,
             "resultado": "aprovado" if avaliacao.aprovado else "reprovado",
             "pontuacao": avaliacao.pontuacao_geral,
@@ -249,6 +341,12 @@ async def revisor_node(state: GuiaState) -> GuiaState:
         logger.error(f"❌ Erro na revisão: {e}")
         logger.exception(e)
         
+        # Saída estruturada irreparável (mesmo após reparo local e
+        # retries): a revisão não pôde ser lida, o que não é o mesmo
+        # que uma falha do provider
+        ilegivel = isinstance(e, SaidaEstruturadaInvalida)
+        motivo = "Saída estruturada do revisor inválida" if ilegivel else "Erro no revisor"
+        
         # Em caso de erro, auto-aprova para não travar o pipeline
         topico["status"] = "salvando"
         topico["ultimo_feedback"] = {
@@ -256,7 +354,7 @@ async def revisor_node(state: GuiaState) -> GuiaState:
             "pontuacao_geral": 5.0,
             "problemas": [],
             "sugestoes_melhoria": [],
-            "observacoes": f"[AUTO-APROVADO POR ERRO] Erro no revisor: {str(e)}"
+            "observacoes": f"[AUTO-APROVADO POR ERRO] {motivo}: {str(e)}"
         }
         
         state["logs"].append({
@@ -266,6 +364,7 @@ async def revisor_node(state: GuiaState) -> GuiaState:
             "message": f"Erro ao revisar '{topico['nome_completo']}': {str(e)}",
             "data": {
                 "error_type": type(e).__name__,
+                "saida_estruturada_invalida": ilegivel,
                 "auto_aprovado": True
             }
         })
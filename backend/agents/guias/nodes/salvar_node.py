@@ -1,6 +1,7 @@
-from ..state import GuiaState
-from backend.services.file_manager import salvar_guia_html
+from ..state import GuiaState, liberar_conteudo_topico
+from backend.services.file_manager import salvar_guia_html, referencia_artefato
 from backend.services.naming_utils import gerar_nome_arquivo
+from backend.services.handoff_guias import criar_handoff
 from backend.utils.logger import logger
 from datetime import datetime
 
@@ -22,9 +23,21 @@ async def salvar_node(state: GuiaState) -> GuiaState:
         
         # Salva
         filepath = salvar_guia_html(nome_arquivo, topico["html_gerado"])
+        referencia = referencia_artefato(filepath, topico["html_gerado"])
         
-        # Atualiza state
+        # Atualiza state (só a referência; o HTML fica em disco)
         topico["nome_arquivo"] = nome_arquivo
+        topico["caminho_arquivo"] = referencia["caminho"]
+        topico["sha256"] = referencia["sha256"]
+        topico["tamanho_bytes"] = referencia["tamanho_bytes"]
+        
+        # Handoff para o pipeline de mapas (evita reler/reparsear do disco)
+        if state.get("gerar_handoff_mapas"):
+            topico["handoff_mapa"] = await criar_handoff(
+                nome_arquivo, filepath, topico["html_gerado"], referencia["sha256"]
+            )
+        
+        liberar_conteudo_topico(topico)
         topico["status"] = "concluido"
         topico["timestamp_conclusao"] = datetime.now().isoformat()
         
@@ -41,4 +54,5 @@ async def salvar_node(state: GuiaState) -> GuiaState:
         logger.error(f"❌ Erro ao salvar: {e}")
         topico["status"] = "erro_fatal"
         topico["erro"] = {"message": str(e), "timestamp": datetime.now().isoformat()}
+        liberar_conteudo_topico(topico)
         return state
\ No newline at end of file
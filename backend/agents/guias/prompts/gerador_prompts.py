@@ -587,4 +587,18 @@ Elabore o material seguindo rigorosamente todas as instruções do sistema, incl
 - 2 casos práticos resolvidos
 
 Entregue APENAS o código HTML completo e funcional, sem marcadores de código.
-"""
\ No newline at end of file
+"""
+FEEDBACK_RETRY_TEMPLATE = """O revisor REPROVOU o guia acima (tentativa {tentativa} de {max_tentativas}, nota {nota:.1f}/10).
+
+**PROBLEMAS APONTADOS:**
+{problemas}
+
+**SUGESTÕES DO REVISOR:**
+{sugestoes}
+
+**OBSERVAÇÕES:**
+{observacoes}
+
+Corrija TODOS os problemas apontados, mantendo as seções que já estavam corretas.
+Entregue novamente o guia COMPLETO, APENAS o código HTML, sem marcadores de código.
+"""
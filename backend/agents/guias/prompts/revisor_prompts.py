@@ -4,6 +4,13 @@ Prompts para o LLM Revisor de Guias.
 Adaptado com system_message e user_message separados.
 """
 
+from backend.services.revisao_delta import (
+    DELTA_INSTRUCAO,
+    DELTA_CRITERIO_APROVACAO,
+    DELTA_PROBLEMAS_ANTERIORES,
+    DELTA_PEDIDO
+)
+
 SYSTEM_PROMPT = """Você é um revisor técnico especializado em conteúdo educacional jurídico em HTML.
 
 **CRITÉRIOS DE AVALIAÇÃO:**
@@ -36,6 +43,10 @@ SYSTEM_PROMPT = """Você é um revisor técnico especializado em conteúdo educa
    - Adequação do vocabulário ao público-alvo (estudantes de direito)
    - Uso correto de termos técnicos
 
+ℹ️ Verificados AUTOMATICAMENTE por um linter (NÃO os avalie): presença de
+<section id="fundamentacao">, seções obrigatórias, mínimo de palavras,
+HTML completo e anglicismos.
+
 **FORMATO DA RESPOSTA:**
 
 Responda APENAS com um JSON estruturado seguindo EXATAMENTE este formato:
@@ -79,4 +90,44 @@ USER_PROMPT_TEMPLATE = """Analise o guia HTML fornecido sobre o tópico "{topico
 {feedback_anterior}
 
 Avalie o guia considerando todos os critérios estabelecidos (alucinações, cobertura, precisão técnica e língua portuguesa) e responda APENAS com um JSON válido no formato especificado.
-"""
\ No newline at end of file
+"""
+
+# ============================================
+# REVISÃO DELTA (RETRIES)
+# ============================================
+# Na re-revisão de um guia reprovado não se reaplica a rubrica inteira:
+# o revisor só confere se os problemas apontados foram corrigidos e se
+# a nova versão introduziu algum problema grave.
+
+DELTA_SYSTEM_PROMPT = """Você é um revisor técnico de guias jurídicos em HTML fazendo uma RE-REVISÃO.
+
+O guia já foi avaliado e reprovado. """ + DELTA_INSTRUCAO + """
+1. Quais dos problemas listados foram corrigidos na nova versão
+2. Se a nova versão introduziu algum problema NOVO de gravidade alta ou crítica
+   (alucinação, erro jurídico, conteúdo removido) — as "regressões"
+
+""" + DELTA_CRITERIO_APROVACAO + """
+
+Responda APENAS com o JSON:
+{
+  "problemas_corrigidos": [1, 3],
+  "regressoes": [
+    {"categoria": "...", "gravidade": "alta", "descricao": "...", "localizacao": "..."}
+  ],
+  "aprovado": true,
+  "pontuacao_geral": 8.0,
+  "comentario": "uma frase"
+}
+"""
+
+DELTA_USER_PROMPT_TEMPLATE = """Re-revisão do guia sobre "{topico}" ({area_conhecimento}) — tentativa {tentativa} de {max_tentativas}.
+
+""" + DELTA_PROBLEMAS_ANTERIORES + """
+
+**NOVA VERSÃO DO GUIA:**
+```html
+{html_gerado}
+```
+
+""" + DELTA_PEDIDO + """ e responda APENAS com o JSON.
+"""
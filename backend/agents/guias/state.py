@@ -4,8 +4,38 @@ State do LangGraph para geração de guias educacionais.
 Migrado e adaptado do sistema Node.js original.
 """
 
-from typing import TypedDict, List, Literal, Optional
+from typing import TypedDict, List, Literal, Optional, Annotated
 from datetime import datetime
+from collections import deque
+from backend.utils.logger import limitar_logs
+
+
+# ============================================
+# REDUCERS
+# ============================================
+
+def criar_historico_topico() -> deque:
+    """Histórico circular de um tópico (últimos `max_historico_topico` eventos)."""
+    from backend.core.config import get_settings
+    return deque(maxlen=get_settings().max_historico_topico)
+
+
+def limitar_historicos(atual, novos) -> List[dict]:
+    """
+    Reducer do campo `topicos`.
+    
+    Mesmo motivo de `limitar_logs`: o `historico` de cada tópico não pode
+    depender de o node devolver um deque com `maxlen`. O reducer reaplica
+    o limite a cada atualização.
+    """
+    topicos = novos if novos is not None else (atual or [])
+    
+    for topico in topicos:
+        historico = criar_historico_topico()
+        historico.extend(topico.get("historico") or ())
+        topico["historico"] = historico
+    
+    return topicos
 
 
 class GuiaState(TypedDict):
@@ -34,7 +64,7 @@ class GuiaState(TypedDict):
     # ============================================
     # TÓPICOS A PROCESSAR
     # ============================================
-    topicos: List[dict]
+    topicos: Annotated[List[dict], limitar_historicos]
     """
     Lista de tópicos a processar. Cada tópico:
     {
@@ -47,12 +77,25 @@ class GuiaState(TypedDict):
         "timestamp_conclusao": None,
         "html_gerado": "",
         "nome_arquivo": "",
+        "caminho_arquivo": None,
+        "sha256": None,
+        "tamanho_bytes": 0,
+        "handoff_mapa": None,
         "tokens_usados": {},
         "tempo_decorrido_ms": 0,
-        "historico": [],
+        "historico": deque(maxlen=max_historico_topico),
         "ultimo_feedback": None,
         "erro": None
     }
+    
+    O `historico` é reaplicado com `maxlen` pelo reducer
+    `limitar_historicos` a cada atualização.
+    
+    `html_gerado` só existe enquanto o tópico está em geração/revisão.
+    Após o salvamento o HTML fica apenas em disco e o tópico guarda
+    a referência (caminho_arquivo, sha256, tamanho_bytes) e o
+    `handoff_mapa` (referência ao guia cuja extração já está no cache do
+    html_extractor, para o pipeline de mapas não reparsear o arquivo).
     """
     
     # ============================================
@@ -63,11 +106,20 @@ class GuiaState(TypedDict):
     llm_gerador_temperatura: float
     llm_gerador_max_tokens: int
     
+    llm_gerador_fallback: Optional[List[dict]]
+    """Cadeia de failover do gerador (None = padrão das settings)"""
+    
     llm_revisor_provider: str
     llm_revisor_modelo: str
     llm_revisor_temperatura: float
     llm_revisor_max_tokens: int
     
+    llm_revisor_fallback: Optional[List[dict]]
+    """Cadeia de failover do revisor (None = padrão das settings)"""
+    
+    llm_revisor_rapido: Optional[dict]
+    """Revisor rápido da revisão em cascata (None = só o revisor forte)"""
+    
     # ============================================
     # CONFIGURAÇÕES DE PROCESSAMENTO
     # ============================================
@@ -80,6 +132,12 @@ class GuiaState(TypedDict):
     delay_retry: int
     """Delay em segundos entre retries"""
     
+    gerar_handoff_mapas: bool
+    """Se True, o salvar_node monta o handoff para o pipeline de mapas"""
+    
+    especulativo: bool
+    """Se True, a 1ª tentativa de cada tópico é uma disputa best-of-N"""
+    
     # ============================================
     # PROMPTS
     # ============================================
@@ -124,9 +182,10 @@ class GuiaState(TypedDict):
     # ============================================
     # LOGS E TELEMETRIA
     # ============================================
-    logs: List[dict]
+    logs: Annotated[List[dict], limitar_logs]
     """
-    Lista de eventos de log:
+    Buffer circular (deque com maxlen, reaplicado pelo reducer
+    `limitar_logs` a cada atualização) de eventos de log:
     {
         "timestamp": "2025-01-15T14:30:00",
         "level": "info|success|warning|error",
@@ -163,6 +222,10 @@ def criar_topico_inicial(indice: int, nome: str, radical: str) -> dict:
         "timestamp_conclusao": None,
         "html_gerado": "",
         "nome_arquivo": "",
+        "caminho_arquivo": None,
+        "sha256": None,
+        "tamanho_bytes": 0,
+        "handoff_mapa": None,
         "tokens_usados": {
             "geracao_input": 0,
             "geracao_output": 0,
@@ -170,12 +233,22 @@ def criar_topico_inicial(indice: int, nome: str, radical: str) -> dict:
             "revisao_output": 0
         },
         "tempo_decorrido_ms": 0,
-        "historico": [],
+        "historico": criar_historico_topico(),
         "ultimo_feedback": None,
         "erro": None
     }
 
 
+def liberar_conteudo_topico(topico: dict) -> None:
+    """
+    Descarta o HTML mantido em memória para o tópico.
+    
+    Chamado assim que o guia é salvo (ou falha em definitivo), para que
+    o state guarde apenas referências e o RSS não cresça com o projeto.
+    """
+    topico["html_gerado"] = ""
+
+
 def criar_estatisticas_iniciais(total_topicos: int) -> dict:
     """Cria estrutura inicial de estatísticas."""
     return {
@@ -0,0 +1,351 @@
+# backend/agents/mapas/batch.py
+"""
+Motor de lote para mapas mentais.
+
+Agenda as partes de TODOS os arquivos numa única fila global:
+1. Parse + divisão rodam concorrentemente, até
+   `mapas_max_concurrent_files` arquivos ao mesmo tempo
+2. Assim que um arquivo é dividido, seus mapas (partes, ou sub-blocos
+   de partes com estimativa_mapas > 1) entram na fila global
+3. Um único pool de `max_workers` workers processa as partes de todos
+   os arquivos
+4. Quando a última parte de um arquivo termina, o arquivo é salvo
+5. Com `max_retries`, arquivos que terminaram "parcial"/"erro" voltam
+   numa nova rodada só com as partes que faltam
+
+Com `mapas_revisao_em_lote`, os mapas de um arquivo precisam ser
+revisados juntos: o arquivo entra na fila global como um único item,
+que ocupa um slot e gera/revisa internamente até
+`mapas_max_workers_per_file` mapas ao mesmo tempo (ver revisao_lote.py).
+
+Assim os slots de worker ficam ocupados mesmo quando os arquivos têm
+números de partes muito diferentes (ex: um com 2, outro com 10).
+"""
+
+from typing import Callable, List, Optional
+import asyncio
+
+from .state import MindmapState, criar_estado_inicial
+from .nodes.parser_node import parse_html_node
+from .revisao_lote import processar_unidades_revisao_lote
+from .graph_parallel import (
+    processar_parte_completa,
+    consolidar_partes,
+    expandir_divisoes,
+    executar_divisao,
+    salvar_resultado
+)
+from backend.core.config import get_settings
+from backend.services.retry_policy import PoliticaRetry
+from backend.services.worker_pool import PoolTrabalho, executar_em_pool
+from backend.utils.logger import logger
+
+settings = get_settings()
+
+
+async def processar_lote_mapas(
+    html_files: List[str],
+    llm01_provider: str,
+    llm02_provider: str,
+    llm03_provider: str,
+    max_tentativas: int = 3,
+    max_workers: Optional[int] = None,
+    on_arquivo_concluido: Optional[Callable] = None,
+    especulativo: Optional[bool] = None,
+    fallbacks: Optional[dict] = None,
+    revisor_rapido: Optional[dict] = None,
+    modelos: Optional[dict] = None,
+    max_retries: int = 0
+) -> List[dict]:
+    """
+    Processa vários HTMLs com uma fila global de partes.
+
+    Args:
+        html_files: Nomes dos arquivos HTML
+        llm01_provider, llm02_provider, llm03_provider: Providers dos LLMs
+        max_tentativas: Máximo de tentativas de revisão por parte
+        max_workers: Limite de partes simultâneas (todas as
+                     partes de todos os arquivos). Padrão: settings.
+        on_arquivo_concluido: Callback (state, concluidos, total) chamado
+                              assim que cada arquivo é salvo
+        especulativo: 1ª tentativa best-of-N por mapa. Padrão: settings.
+        fallbacks: Cadeias de failover por papel (divisor/gerador/revisor)
+        revisor_rapido: Revisor rápido da revisão em cascata (None = só o LLM03)
+        modelos: Modelo/temperatura/max_tokens/raciocínio por papel
+        max_retries: Rodadas extras por arquivo (como no process_mapa_with_retry):
+                     arquivos "parcial"/"erro" voltam à fila só com as
+                     partes que faltam, sem refazer parse e divisão
+
+    Returns:
+        Lista de estados finais, na ordem de `html_files` (um arquivo que
+        falhe em qualquer etapa vem com status "erro", nunca None)
+    """
+    max_workers = max_workers or settings.mapas_max_workers
+    total_arquivos = len(html_files)
+
+    logger.info(
+        f"🚀 Lote de mapas: {total_arquivos} arquivo(s)\n"
+        f"   ⚙️ Workers globais de partes: {max_workers}\n"
+        f"   ✂️ Arquivos em preparo simultâneo: {settings.mapas_max_concurrent_files}"
+    )
+
+    estados: dict = {}
+    resultados_partes: dict = {}
+    pendentes: dict = {}
+    a_retomar: dict = {}
+    finais: List[Optional[dict]] = [None] * total_arquivos
+    concluidos = 0
+    rodada = 1
+
+    politica_arquivo = PoliticaRetry(max_tentativas=max_retries + 1)
+
+    def estado_erro(idx: int, erro_msg: str) -> MindmapState:
+        state = criar_estado_inicial(
+            html_files[idx], llm01_provider, llm02_provider, llm03_provider,
+            max_tentativas, especulativo, fallbacks, revisor_rapido, modelos
+        )
+        state["status"] = "erro"
+        state["erro_msg"] = erro_msg
+        return state
+
+    def retomavel(state: MindmapState) -> bool:
+        # Erro de leitura/parse não se resolve com retry
+        if not state.get("fundamentacao"):
+            return False
+        erro = Exception(state.get("erro_msg") or "Erro desconhecido")
+        return politica_arquivo.deve_retentar(erro, rodada)
+
+    # ============================================
+    # FINALIZAÇÃO DE UM ARQUIVO
+    # ============================================
+
+    async def finalizar(idx: int, state: MindmapState) -> None:
+        nonlocal concluidos
+
+        estados.pop(idx, None)
+        pendentes.pop(idx, None)
+
+        try:
+            if state["status"] not in ("erro",):
+                partes = resultados_partes.pop(idx, {})
+                state = consolidar_partes(state, [partes[i] for i in range(len(partes))])
+
+            if state["status"] != "concluido" and retomavel(state):
+                logger.warning(
+                    f"⚠️ [Lote] {state['html_filename']}: {state['status']}: "
+                    f"{state.get('erro_msg')} (será retomado)"
+                )
+                a_retomar[idx] = state
+                return
+
+            state = await salvar_resultado(state)
+        except Exception as e:
+            logger.error(f"❌ [Lote] Erro ao finalizar {html_files[idx]}: {e}")
+            state["status"] = "erro"
+            state["erro_msg"] = f"Falha ao finalizar: {e}"
+
+        finais[idx] = state
+        concluidos += 1
+
+        logger.info(
+            f"📁 [Lote] {concluidos}/{total_arquivos} arquivo(s): "
+            f"{state['html_filename']} → {state['status']}"
+        )
+
+        if on_arquivo_concluido:
+            retorno = on_arquivo_concluido(state, concluidos, total_arquivos)
+            if asyncio.iscoroutine(retorno):
+                await retorno
+
+    # ============================================
+    # FILA GLOBAL DE PARTES
+    # ============================================
+
+    async def processar_parte(item: tuple):
+        idx, i, parte_info = item
+
+        if i is None:
+            # Revisão em lote: todas as unidades pendentes do arquivo
+            return await processar_unidades_revisao_lote(
+                estados[idx],
+                [unidade for _i, unidade in parte_info],
+                max_workers=settings.mapas_max_workers_per_file,
+                max_tentativas=max_tentativas
+            )
+
+        return await processar_parte_completa(
+            parte_info=parte_info,
+            state=estados[idx],
+            parte_index=i,
+            max_tentativas=max_tentativas
+        )
+
+    async def ao_concluir_parte(_, item: tuple, resultado) -> None:
+        idx, i, parte_info = item
+
+        if i is None:
+            for j, (k, _unidade) in enumerate(parte_info):
+                resultados_partes[idx][k] = (
+                    resultado if isinstance(resultado, Exception) else resultado[j]
+                )
+            pendentes[idx] -= len(parte_info)
+        else:
+            resultados_partes[idx][i] = resultado
+            pendentes[idx] -= 1
+
+        if pendentes[idx] == 0:
+            await finalizar(idx, estados[idx])
+
+    # ============================================
+    # PARSE + DIVISÃO (CONCORRENTES)
+    # ============================================
+
+    async def preparar(idx: int) -> MindmapState:
+        state = a_retomar.pop(idx, None)
+
+        if state is not None:
+            # Retomada: parse e divisão já feitos são reaproveitados
+            state["erro_msg"] = None
+            if state["divisoes"]:
+                state["status"] = "gerando"
+                return state
+        else:
+            state = criar_estado_inicial(
+                html_filename=html_files[idx],
+                llm01_provider=llm01_provider,
+                llm02_provider=llm02_provider,
+                llm03_provider=llm03_provider,
+                max_tentativas=max_tentativas,
+                especulativo=especulativo,
+                fallbacks=fallbacks,
+                revisor_rapido=revisor_rapido,
+                modelos=modelos
+            )
+
+        # Retry por etapa: uma falha na divisão não refaz o parse
+        politica = PoliticaRetry(max_tentativas=max_tentativas)
+
+        for tentativa in range(1, max_tentativas + 1):
+            if not state["fundamentacao"]:
+                state = await parse_html_node(state)
+                if state["status"] == "erro":
+                    # Erro de leitura/parse não se resolve com retry
+                    return state
+
+            state = await executar_divisao(state)
+            if state["status"] != "erro":
+                return state
+
+            erro = Exception(state["erro_msg"] or "Erro na divisão")
+            if not politica.deve_retentar(erro, tentativa):
+                return state
+
+            await politica.aguardar(tentativa, erro)
+
+        return state
+
+    def enfileirar(idx: int, state: MindmapState) -> list:
+        """Registra o arquivo e devolve as unidades que faltam processar."""
+        unidades = expandir_divisoes(state["divisoes"])
+
+        # Mapas já obtidos numa rodada anterior são mantidos
+        anteriores = {
+            (p["parte_numero"], p.get("mapa_numero", 1)): p
+            for p in state.get("partes_processadas", [])
+            if not p.get("erro")
+        }
+        feitos = {
+            i: anteriores[(u["parte_numero"], u["mapa_numero"])]
+            for i, u in enumerate(unidades)
+            if (u["parte_numero"], u["mapa_numero"]) in anteriores
+        }
+        faltam = [(i, u) for i, u in enumerate(unidades) if i not in feitos]
+
+        estados[idx] = state
+        resultados_partes[idx] = feitos
+        pendentes[idx] = len(faltam)
+
+        logger.info(
+            f"✂️ [Lote] {state['html_filename']}: {len(faltam)} mapa(s) "
+            f"de {len(state['divisoes'])} parte(s) enfileirado(s)"
+        )
+        return faltam
+
+    async def rodar(indices: List[int]) -> None:
+        pool_partes = PoolTrabalho(
+            processar_parte,
+            max_workers=max_workers,
+            on_resultado=ao_concluir_parte,
+            nome="mapas-partes"
+        )
+
+        async def ao_preparar(_, idx: int, state) -> None:
+            if isinstance(state, Exception):
+                state = estado_erro(idx, str(state))
+
+            try:
+                if state["status"] == "erro" or not state["divisoes"]:
+                    if state["status"] != "erro":
+                        state["status"] = "erro"
+                        state["erro_msg"] = "Divisão não retornou partes"
+                    await finalizar(idx, state)
+                    return
+
+                faltam = enfileirar(idx, state)
+            except Exception as e:
+                logger.error(f"❌ [Lote] Erro ao enfileirar {html_files[idx]}: {e}")
+                state["status"] = "erro"
+                state["erro_msg"] = f"Falha ao enfileirar: {e}"
+                await finalizar(idx, state)
+                return
+
+            if not faltam:
+                await finalizar(idx, state)
+                return
+
+            # Revisão em lote (incompatível com o modo especulativo, que
+            # tem precedência): o arquivo entra na fila como um item só
+            if settings.mapas_revisao_em_lote and not state.get("especulativo"):
+                await pool_partes.adicionar((idx, None, faltam))
+                return
+
+            for i, unidade in faltam:
+                await pool_partes.adicionar((idx, i, unidade))
+
+        async with pool_partes:
+            await executar_em_pool(
+                indices,
+                preparar,
+                max_workers=settings.mapas_max_concurrent_files,
+                on_resultado=ao_preparar,
+                coletar=False,
+                nome="mapas-preparo"
+            )
+
+    indices = list(range(total_arquivos))
+
+    while True:
+        await rodar(indices)
+
+        indices = sorted(a_retomar)
+        if not indices:
+            break
+
+        logger.info(f"🔄 [Lote] Retomando {len(indices)} arquivo(s) (rodada {rodada + 1}/{max_retries + 1})")
+        await politica_arquivo.aguardar(rodada)
+        rodada += 1
+
+    # Garantia: todo arquivo tem estado final
+    for idx, state in enumerate(finais):
+        if state is None:
+            finais[idx] = estado_erro(idx, "Arquivo não finalizado")
+
+    total_sucesso = sum(1 for s in finais if s.get("status") == "concluido")
+
+    logger.success(
+        f"🎉 Lote de mapas concluído!\n"
+        f"   ✅ Sucesso: {total_sucesso}/{total_arquivos}\n"
+        f"   ❌ Erros/parciais: {total_arquivos - total_sucesso}/{total_arquivos}"
+    )
+
+    return finais
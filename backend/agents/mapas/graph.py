@@ -8,7 +8,7 @@ from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from typing import Literal
 
-from .state import MindmapState
+from .state import MindmapState, criar_estado_inicial
 from .nodes.parser_node import parse_html_node
 from .nodes.divisor_node import dividir_conteudo_node
 from .nodes.gerador_node import gerar_mindmap_node
@@ -107,22 +107,13 @@ async def execute_graph(
     
     graph = create_mindmap_graph()
     
-    initial_state: MindmapState = {
-        "html_filename": html_filename,
-        "ramo_direito": "",
-        "topico": "",
-        "fundamentacao": "",
-        "divisoes": [],
-        "partes_processadas": [],
-        "tentativas_revisao": 0,
-        "max_tentativas": max_tentativas,
-        "status": "parsing",
-        "erro_msg": None,
-        "llm01_provider": llm01_provider,
-        "llm02_provider": llm02_provider,
-        "llm03_provider": llm03_provider,
-        "logs": []
-    }
+    initial_state = criar_estado_inicial(
+        html_filename=html_filename,
+        llm01_provider=llm01_provider,
+        llm02_provider=llm02_provider,
+        llm03_provider=llm03_provider,
+        max_tentativas=max_tentativas
+    )
     
     config = {"configurable": {"thread_id": html_filename}}
     
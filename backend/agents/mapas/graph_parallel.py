@@ -10,20 +10,39 @@ from typing import Literal
 import asyncio
 from datetime import datetime
 
-from .state import MindmapState
+from .state import MindmapState, criar_estado_inicial, parametros_llm
 from .nodes.parser_node import parse_html_node
 from .nodes.divisor_node import dividir_conteudo_node
+from .nodes.fusao_node import dividir_e_gerar_node, usar_fusao
 from .nodes.salvar_node import salvar_mindmap_node
+from .nodes.revisor_node import RevisaoDeltaMapa, montar_prompt_delta
+from .nodes.gerador_node import montar_feedback_retry
+from backend.services.revisao_delta import aplicar_delta
 from backend.services.llm_factory import get_llm
 from .prompts.gerador_prompts import SYSTEM_PROMPT as GERADOR_SYSTEM
 from .prompts.gerador_prompts import USER_PROMPT_TEMPLATE as GERADOR_TEMPLATE
 from .prompts.revisor_prompts import SYSTEM_PROMPT as REVISOR_SYSTEM
 from .prompts.revisor_prompts import USER_PROMPT_TEMPLATE as REVISOR_TEMPLATE
 from backend.utils.logger import logger
+from backend.core.config import get_settings
+from backend.services.worker_pool import executar_em_pool
+from backend.services.retry_policy import PoliticaRetry, classificar_erro
+from backend.services.conversa_retry import montar_conversa
+from backend.services.revisao_cascata import criar_revisor
+from backend.services.content_linter import lintar, mesclar_achados, e_achado_lint
+from backend.services.mermaid_mindmap import corrigir_mindmap
+from backend.services.especulacao import (
+    chave_historico,
+    registrar_revisao,
+    escolher_num_candidatos,
+    disputar_candidatos
+)
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional, Callable
 import re
 
+settings = get_settings()
+
 
 # ============================================
 # MODELS PARA STRUCTURED OUTPUT (Revisor)
@@ -43,10 +62,383 @@ class AvaliacaoMapa(BaseModel):
     justificativa: str
 
 
+# ============================================
+# SUBDIVISÃO LOCAL (estimativa_mapas)
+# ============================================
+
+MIN_CHARS_POR_MAPA = 400
+
+
+def subdividir_conteudo(conteudo: str, num_mapas: int) -> List[str]:
+    """
+    Divide o conteúdo de uma parte em até `num_mapas` blocos contíguos.
+    
+    Corta apenas em quebras de parágrafo/linha, equilibrando o tamanho
+    dos blocos. Se o texto for curto demais para `num_mapas` mapas de
+    pelo menos MIN_CHARS_POR_MAPA, retorna menos blocos.
+    """
+    num_mapas = max(1, min(num_mapas, len(conteudo) // MIN_CHARS_POR_MAPA))
+    
+    if num_mapas == 1:
+        return [conteudo]
+    
+    paragrafos = [p for p in re.split(r'\n\s*\n', conteudo) if p.strip()]
+    if len(paragrafos) < num_mapas:
+        paragrafos = [p for p in conteudo.split('\n') if p.strip()]
+    if len(paragrafos) < num_mapas:
+        return [conteudo]
+    
+    alvo = sum(len(p) for p in paragrafos) / num_mapas
+    blocos = []
+    atual = []
+    acumulado = 0
+    
+    for i, paragrafo in enumerate(paragrafos):
+        atual.append(paragrafo)
+        acumulado += len(paragrafo)
+        
+        restantes = len(paragrafos) - i - 1
+        blocos_faltando = num_mapas - len(blocos) - 1
+        if blocos_faltando == 0 or restantes == 0:
+            continue
+        
+        # Corta quando o próximo parágrafo passaria do ponto de corte ideal
+        proximo = len(paragrafos[i + 1])
+        corte_ideal = alvo * (len(blocos) + 1)
+        
+        if acumulado + proximo / 2 >= corte_ideal or restantes == blocos_faltando:
+            blocos.append('\n\n'.join(atual))
+            atual = []
+    
+    if atual:
+        blocos.append('\n\n'.join(atual))
+    
+    return blocos
+
+
+def expandir_divisoes(divisoes: List[dict]) -> List[dict]:
+    """
+    Expande as divisões em unidades de trabalho (uma por mapa).
+    
+    Partes com estimativa_mapas > 1 são subdivididas localmente, e cada
+    bloco vira um mapa independente, processado em paralelo com os demais.
+    """
+    unidades = []
+    
+    for i, divisao in enumerate(divisoes):
+        blocos = subdividir_conteudo(
+            divisao.get("conteudo", ""),
+            divisao.get("estimativa_mapas", 1) or 1
+        )
+        
+        for j, bloco in enumerate(blocos, 1):
+            titulo = divisao["titulo"]
+            if len(blocos) > 1:
+                titulo = f"{titulo} - {j}/{len(blocos)}"
+            
+            unidade = {
+                "parte_numero": i + 1,
+                "mapa_numero": j,
+                "total_mapas": len(blocos),
+                "titulo": titulo,
+                "conteudo": bloco
+            }
+            
+            # Mapa já gerado na chamada única (divisão + geração)
+            if len(blocos) == 1 and divisao.get("mapa_inicial"):
+                unidade["mapa_inicial"] = divisao["mapa_inicial"]
+            
+            unidades.append(unidade)
+    
+    return unidades
+
+
 # ============================================
 # FUNÇÕES AUXILIARES PARA PROCESSAMENTO PARALELO
 # ============================================
 
+def identificar_parte(parte_info: dict, parte_index: int = 0) -> dict:
+    """Campos que identificam o mapa de uma unidade nos resultados."""
+    return {
+        "parte_numero": parte_info.get("parte_numero", parte_index + 1),
+        "mapa_numero": parte_info.get("mapa_numero", 1),
+        "total_mapas": parte_info.get("total_mapas", 1),
+        "parte_titulo": parte_info["titulo"]
+    }
+
+
+def rotulo_parte(identificacao: dict) -> str:
+    """Rótulo usado nos logs: "Parte 3" ou "Parte 3.2"."""
+    if identificacao["total_mapas"] == 1:
+        return f"Parte {identificacao['parte_numero']}"
+    return f"Parte {identificacao['parte_numero']}.{identificacao['mapa_numero']}"
+
+
+def limpar_mermaid(mapa: str, rotulo: str = "mapa") -> str:
+    """
+    Resposta do gerador → código mindmap canônico (cercas removidas e
+    erros mecânicos de sintaxe corrigidos localmente; ver mermaid_mindmap.py).
+    """
+    return corrigir_mindmap(mapa, rotulo)
+
+
+def feedback_avaliacao(avaliacao: "AvaliacaoMapa", tentativa: int, max_tentativas: int) -> str:
+    """Turno de feedback (retry conversacional) a partir de uma avaliação."""
+    return montar_feedback_retry(
+        [p.model_dump() for p in avaliacao.problemas],
+        avaliacao.sugestoes_melhoria,
+        avaliacao.nota_geral,
+        tentativa,
+        max_tentativas
+    )
+
+
+async def gerar_mapa_parte(
+    llm_gerador,
+    state: MindmapState,
+    parte_info: dict,
+    mapa_anterior: Optional[str] = None,
+    feedback: Optional[str] = None
+) -> str:
+    """
+    LLM02: gera o código Mermaid de uma unidade.
+    
+    Com `mapa_anterior` e `feedback` (mapa rejeitado), continua a
+    conversa da tentativa anterior em vez de reenviar o prompt do zero.
+    """
+    prompt_gerador = GERADOR_TEMPLATE.format(
+        ramo_direito=state["ramo_direito"],
+        topico=state["topico"],
+        parte_titulo=parte_info["titulo"],
+        conteudo_parte=parte_info.get("conteudo", "")
+    )
+    
+    response_gerador = await llm_gerador.ainvoke(montar_conversa(
+        GERADOR_SYSTEM, prompt_gerador,
+        saida_anterior=mapa_anterior,
+        feedback=feedback
+    ))
+    
+    return limpar_mermaid(
+        response_gerador.content,
+        rotulo_parte(identificar_parte(parte_info))
+    )
+
+
+async def revisar_mapa_parte(
+    structured_revisor,
+    state: MindmapState,
+    parte_info: dict,
+    mapa_gerado: str,
+    tentativa: int,
+    max_tentativas: int
+) -> "AvaliacaoMapa":
+    """
+    LLM03: revisa o mapa de uma unidade (chamada individual).
+    
+    O linter local roda em paralelo e os seus achados (sintaxe
+    Mermaid) entram nos problemas da avaliação.
+    """
+    prompt_revisor = REVISOR_TEMPLATE.format(
+        ramo_direito=state["ramo_direito"],
+        topico=state["topico"],
+        parte_titulo=parte_info["titulo"],
+        conteudo_original=parte_info.get("conteudo", ""),
+        mapa_gerado=mapa_gerado,
+        tentativa=tentativa,
+        max_tentativas=max_tentativas
+    )
+    
+    lint_mapa = asyncio.create_task(lintar("mapa", mapa_gerado))
+    
+    try:
+        avaliacao = await structured_revisor.ainvoke([
+            {"role": "system", "content": REVISOR_SYSTEM},
+            {"role": "user", "content": prompt_revisor}
+        ])
+        
+        return mesclar_achados(avaliacao, await lint_mapa)
+    finally:
+        # Revisor falhou (ou foi cancelado): o lint não fica solto
+        lint_mapa.cancel()
+
+
+async def revisar_delta_parte(
+    revisor_delta,
+    state: MindmapState,
+    parte_info: dict,
+    mapa_gerado: str,
+    problemas_anteriores: List[dict],
+    tentativa: int,
+    max_tentativas: int
+) -> "AvaliacaoMapa":
+    """
+    LLM03 em retry: só confere se os problemas anteriores foram
+    corrigidos e se surgiram regressões (prompt e schema enxutos).
+    """
+    lint_mapa = asyncio.create_task(lintar("mapa", mapa_gerado))
+    
+    try:
+        delta = await revisor_delta.ainvoke(montar_prompt_delta(
+            state, parte_info["titulo"], parte_info.get("conteudo", ""),
+            mapa_gerado, problemas_anteriores, tentativa, max_tentativas
+        ))
+        
+        avaliacao = aplicar_delta(
+            delta, problemas_anteriores, AvaliacaoMapa,
+            campo_nota="nota_geral", campo_texto="justificativa"
+        )
+        return mesclar_achados(avaliacao, await lint_mapa)
+    finally:
+        lint_mapa.cancel()
+
+
+def registrar_avaliacao(rotulo: str, avaliacao: "AvaliacaoMapa") -> None:
+    """Loga a decisão do revisor (e os principais problemas, se rejeitado)."""
+    logger.success(
+        f"{'✅' if avaliacao.aprovado else '⚠️'} [{rotulo}] "
+        f"{'APROVADO' if avaliacao.aprovado else 'REJEITADO'} "
+        f"(nota: {avaliacao.nota_geral:.1f}/10)"
+    )
+    
+    if not avaliacao.aprovado:
+        logger.warning(
+            f"⚠️ [{rotulo}] Rejeitado: "
+            f"{len(avaliacao.problemas)} problema(s)"
+        )
+        
+        for problema in avaliacao.problemas[:3]:
+            logger.warning(
+                f"   • [{problema.gravidade.upper()}] "
+                f"{problema.categoria}: {problema.descricao}"
+            )
+
+
+def resultado_aprovado(
+    identificacao: dict,
+    mapa_gerado: str,
+    avaliacao: "AvaliacaoMapa",
+    tentativa: int,
+    max_tentativas: int
+) -> dict:
+    """
+    Resultado de uma unidade aprovada pelo revisor, ou auto-aprovada
+    por ter esgotado as tentativas.
+    """
+    resultado = {
+        **identificacao,
+        "mapa_gerado": mapa_gerado,
+        "aprovado": True,
+        "nota_geral": avaliacao.nota_geral,
+        "tentativas": tentativa,
+        "problemas": [p.model_dump() for p in avaliacao.problemas],
+        "sugestoes_melhoria": avaliacao.sugestoes_melhoria,
+        "justificativa_revisao": avaliacao.justificativa
+    }
+    
+    if not avaliacao.aprovado:
+        # Auto-aprovado
+        resultado["nota_geral"] = 5.0
+        resultado["justificativa_revisao"] = (
+            f"Auto-aprovado após {max_tentativas} tentativas. "
+            f"Nota original: {avaliacao.nota_geral:.1f}"
+        )
+    
+    return resultado
+
+
+def resultado_erro(identificacao: dict, tentativa: int, erro: Exception) -> dict:
+    """Resultado de uma unidade que falhou por erro (será refeita num retry)."""
+    return {
+        **identificacao,
+        "erro": True,
+        "mapa_gerado": "",
+        "aprovado": False,
+        "nota_geral": 0.0,
+        "tentativas": tentativa,
+        "problemas": [],
+        "sugestoes_melhoria": [],
+        "justificativa_revisao": f"Erro após {tentativa} tentativas: {str(erro)}"
+    }
+
+
+def nota_mapa(avaliacao) -> float:
+    """Nota de uma avaliação (completa ou delta) do LLM03."""
+    return avaliacao.nota_geral
+
+
+def criar_llms_partes(state: MindmapState) -> tuple:
+    """
+    LLM02 (gerador), LLM03 (revisor estruturado) e LLM03 da re-revisão
+    delta das partes.
+    
+    Com `llm_revisor_rapido`, os dois revisores são em cascata (rápido →
+    LLM03 só na faixa de incerteza; ver revisao_cascata.py).
+    """
+    llm_gerador = get_llm(
+        **parametros_llm(state, "gerador", temperatura=0.4),
+        papel="mapas_gerador"
+    )
+    
+    llm_revisor = get_llm(
+        **parametros_llm(state, "revisor", temperatura=0.2),
+        papel="mapas_revisor"
+    )
+    
+    rapido = state.get("llm_revisor_rapido")
+    
+    return (
+        llm_gerador,
+        criar_revisor(llm_revisor, AvaliacaoMapa, nota_mapa, "mapas_revisor", rapido),
+        criar_revisor(llm_revisor, RevisaoDeltaMapa, nota_mapa, "mapas_revisor_delta", rapido)
+    )
+
+
+async def especular_parte(
+    llm_gerador,
+    structured_revisor,
+    state: MindmapState,
+    parte_info: dict,
+    rotulo: str,
+    max_tentativas: int
+):
+    """
+    1ª rodada especulativa: N gerações + revisões em paralelo.
+    
+    Returns:
+        Candidato vencedor (mapa e avaliação) ou None se todos falharam
+    """
+    chave = chave_historico("mapas", state["llm02_provider"])
+    num_candidatos = escolher_num_candidatos(chave)
+    politica = PoliticaRetry(max_tentativas=settings.llm_max_tentativas_chamada)
+    
+    logger.info(f"🎲 [{rotulo}] Geração especulativa: {num_candidatos} candidato(s) em paralelo")
+    
+    async def gerar(indice: int) -> str:
+        return await politica.executar(
+            lambda: gerar_mapa_parte(llm_gerador, state, parte_info),
+            descricao=f"LLM02 ({rotulo}, candidato {indice + 1})"
+        )
+    
+    async def revisar(mapa: str) -> "AvaliacaoMapa":
+        return await politica.executar(
+            lambda: revisar_mapa_parte(structured_revisor, state, parte_info, mapa, 1, max_tentativas),
+            descricao=f"LLM03 ({rotulo})"
+        )
+    
+    melhor, _concluidos = await disputar_candidatos(
+        num_candidatos,
+        gerar,
+        revisar,
+        aprovado=lambda avaliacao: avaliacao.aprovado,
+        nota=lambda avaliacao: avaliacao.nota_geral,
+        chave=chave,
+        descricao=rotulo
+    )
+    
+    return melhor
+
+
 async def processar_parte_completa(
     parte_info: dict,
     state: MindmapState,
@@ -56,213 +448,255 @@ async def processar_parte_completa(
     """
     Processa uma parte completa: geração + revisão com retry.
     
-    Esta função é chamada em paralelo para múltiplas partes.
+    Esta função é chamada em paralelo para múltiplas partes. Se
+    `parte_info` for uma unidade de `expandir_divisoes`, processa o
+    mapa `mapa_numero` daquela parte. Se trouxer `mapa_inicial` (chamada
+    única divisão + geração), a 1ª tentativa vai direto para a revisão.
+    
+    No modo especulativo (`state["especulativo"]`), a 1ª tentativa é
+    uma disputa best-of-N (ver services/especulacao.py); se nenhum
+    candidato for aprovado, o melhor segue para os retries normais.
     """
-    parte_numero = parte_index + 1
+    identificacao = identificar_parte(parte_info, parte_index)
+    rotulo = rotulo_parte(identificacao)
     
-    logger.info(f"🎯 [Parte {parte_numero}] Iniciando processamento: {parte_info['titulo']}")
+    logger.info(f"🎯 [{rotulo}] Iniciando processamento: {parte_info['titulo']}")
     
     # LLMs
-    llm_gerador = get_llm(
-        provider=state["llm02_provider"],
-        temperature=0.4,
-        max_tokens=12000
-    )
+    llm_gerador, structured_revisor, revisor_delta = criar_llms_partes(state)
     
-    llm_revisor = get_llm(
-        provider=state["llm03_provider"],
-        temperature=0.2,
-        max_tokens=12000
-    )
+    # Problemas da última rejeição (para a re-revisão delta)
+    problemas_anteriores: List[dict] = []
     
-    structured_revisor = llm_revisor.with_structured_output(AvaliacaoMapa)
+    # Mapa rejeitado + críticas do revisor (para o retry conversacional)
+    mapa_rejeitado: Optional[str] = None
+    feedback: Optional[str] = None
+    
+    # Backoff com jitter entre tentativas que falharam por erro
+    politica = PoliticaRetry(max_tentativas=max_tentativas)
+    
+    chave = chave_historico("mapas", state["llm02_provider"])
+    inicio = 1
+    
+    # ============================================
+    # 1ª TENTATIVA ESPECULATIVA (BEST-OF-N)
+    # ============================================
+    
+    if state.get("especulativo") and not parte_info.get("mapa_inicial"):
+        melhor = await especular_parte(
+            llm_gerador, structured_revisor, state, parte_info, rotulo, max_tentativas
+        )
+        
+        if melhor is not None:
+            avaliacao = melhor.avaliacao
+            registrar_avaliacao(rotulo, avaliacao)
+            
+            if avaliacao.aprovado or max_tentativas == 1:
+                return resultado_aprovado(identificacao, melhor.saida, avaliacao, 1, max_tentativas)
+            
+            # Nenhum aprovado: o melhor candidato segue para o retry
+            problemas_anteriores = [
+                p.model_dump() for p in avaliacao.problemas if not e_achado_lint(p)
+            ]
+            mapa_rejeitado = melhor.saida
+            feedback = feedback_avaliacao(avaliacao, 1, max_tentativas)
+            inicio = 2
     
     # Loop de tentativas
-    for tentativa in range(1, max_tentativas + 1):
+    for tentativa in range(inicio, max_tentativas + 1):
         try:
-            logger.info(f"📝 [Parte {parte_numero}] Tentativa {tentativa}/{max_tentativas}")
+            logger.info(f"📝 [{rotulo}] Tentativa {tentativa}/{max_tentativas}")
             
             # ============================================
             # GERAÇÃO (LLM02)
             # ============================================
             
-            logger.info(f"🎨 [Parte {parte_numero}] Gerando mapa mental...")
+            if tentativa == 1 and parte_info.get("mapa_inicial"):
+                mapa_gerado = parte_info["mapa_inicial"]
+                logger.info(f"⚡ [{rotulo}] Usando mapa da chamada única ({len(mapa_gerado)} chars)")
             
-            prompt_gerador = GERADOR_TEMPLATE.format(
-                ramo_direito=state["ramo_direito"],
-                topico=state["topico"],
-                parte_titulo=parte_info["titulo"],
-                conteudo_parte=parte_info.get("conteudo", "")
-            )
-            
-            response_gerador = await llm_gerador.ainvoke([
-                {"role": "system", "content": GERADOR_SYSTEM},
-                {"role": "user", "content": prompt_gerador}
-            ])
-            
-            mapa_gerado = response_gerador.content
-            
-            # Limpa código Mermaid
-            mapa_gerado = re.sub(r'^```mermaid\s*', '', mapa_gerado, flags=re.MULTILINE)
-            mapa_gerado = re.sub(r'\s*```$', '', mapa_gerado, flags=re.MULTILINE)
-            mapa_gerado = mapa_gerado.strip()
-            
-            logger.success(f"✅ [Parte {parte_numero}] Mapa gerado ({len(mapa_gerado)} chars)")
+            else:
+                logger.info(f"🎨 [{rotulo}] Gerando mapa mental...")
+                mapa_gerado = await gerar_mapa_parte(
+                    llm_gerador, state, parte_info, mapa_rejeitado, feedback
+                )
+                logger.success(f"✅ [{rotulo}] Mapa gerado ({len(mapa_gerado)} chars)")
             
             # ============================================
             # REVISÃO (LLM03)
             # ============================================
             
-            logger.info(f"🔍 [Parte {parte_numero}] Revisando mapa...")
-            
-            prompt_revisor = REVISOR_TEMPLATE.format(
-                ramo_direito=state["ramo_direito"],
-                topico=state["topico"],
-                parte_titulo=parte_info["titulo"],
-                conteudo_original=parte_info.get("conteudo", ""),
-                mapa_gerado=mapa_gerado,
-                tentativa=tentativa,
-                max_tentativas=max_tentativas
-            )
+            if settings.revisao_delta_em_retries and problemas_anteriores:
+                logger.info(f"🔍 [{rotulo}] Re-revisão delta ({len(problemas_anteriores)} problema(s))...")
+                
+                avaliacao = await revisar_delta_parte(
+                    revisor_delta, state, parte_info, mapa_gerado,
+                    problemas_anteriores, tentativa, max_tentativas
+                )
+            else:
+                logger.info(f"🔍 [{rotulo}] Revisando mapa...")
+                
+                avaliacao = await revisar_mapa_parte(
+                    structured_revisor, state, parte_info,
+                    mapa_gerado, tentativa, max_tentativas
+                )
             
-            avaliacao = await structured_revisor.ainvoke([
-                {"role": "system", "content": REVISOR_SYSTEM},
-                {"role": "user", "content": prompt_revisor}
-            ])
+            registrar_avaliacao(rotulo, avaliacao)
             
-            logger.success(
-                f"{'✅' if avaliacao.aprovado else '⚠️'} [Parte {parte_numero}] "
-                f"{'APROVADO' if avaliacao.aprovado else 'REJEITADO'} "
-                f"(nota: {avaliacao.nota_geral:.1f}/10)"
-            )
+            if tentativa == 1:
+                registrar_revisao(chave, avaliacao.aprovado)
             
             # ============================================
             # DECISÃO: APROVAR OU RETRY
             # ============================================
             
-            if avaliacao.aprovado:
-                # SUCESSO!
-                return {
-                    "parte_numero": parte_numero,
-                    "parte_titulo": parte_info["titulo"],
-                    "mapa_gerado": mapa_gerado,
-                    "aprovado": True,
-                    "nota_geral": avaliacao.nota_geral,
-                    "tentativas": tentativa,
-                    "problemas": [p.model_dump() for p in avaliacao.problemas],
-                    "sugestoes_melhoria": avaliacao.sugestoes_melhoria,
-                    "justificativa_revisao": avaliacao.justificativa
-                }
+            # Rejeição não é erro transitório: regenera sem espera
+            if not avaliacao.aprovado and tentativa < max_tentativas:
+                # Achados do linter não vão para a re-revisão: o lint é refeito
+                problemas_anteriores = [
+                    p.model_dump() for p in avaliacao.problemas if not e_achado_lint(p)
+                ]
+                mapa_rejeitado = mapa_gerado
+                feedback = feedback_avaliacao(avaliacao, tentativa, max_tentativas)
+                logger.info(f"🔄 [{rotulo}] Tentando novamente...")
+                continue
             
-            else:
-                # Rejeitado - mostra problemas
-                logger.warning(
-                    f"⚠️ [Parte {parte_numero}] Rejeitado: "
-                    f"{len(avaliacao.problemas)} problema(s)"
-                )
-                
-                for problema in avaliacao.problemas[:3]:
-                    logger.warning(
-                        f"   • [{problema.gravidade.upper()}] "
-                        f"{problema.categoria}: {problema.descricao}"
-                    )
-                
-                # Se não é a última tentativa, continua o loop
-                if tentativa < max_tentativas:
-                    logger.info(f"🔄 [Parte {parte_numero}] Tentando novamente...")
-                    await asyncio.sleep(1)  # Pequeno delay entre tentativas
-                    continue
-                
+            if not avaliacao.aprovado:
                 # Última tentativa - auto-aprova
                 logger.error(
-                    f"❌ [Parte {parte_numero}] Esgotadas {max_tentativas} tentativas. "
+                    f"❌ [{rotulo}] Esgotadas {max_tentativas} tentativas. "
                     "Auto-aprovando..."
                 )
-                
-                return {
-                    "parte_numero": parte_numero,
-                    "parte_titulo": parte_info["titulo"],
-                    "mapa_gerado": mapa_gerado,
-                    "aprovado": True,  # Auto-aprovado
-                    "nota_geral": 5.0,
-                    "tentativas": tentativa,
-                    "problemas": [p.model_dump() for p in avaliacao.problemas],
-                    "sugestoes_melhoria": avaliacao.sugestoes_melhoria,
-                    "justificativa_revisao": (
-                        f"Auto-aprovado após {max_tentativas} tentativas. "
-                        f"Nota original: {avaliacao.nota_geral:.1f}"
-                    )
-                }
+            
+            return resultado_aprovado(identificacao, mapa_gerado, avaliacao, tentativa, max_tentativas)
         
         except Exception as e:
-            logger.error(f"❌ [Parte {parte_numero}] Erro na tentativa {tentativa}: {e}")
+            logger.error(
+                f"❌ [{rotulo}] Erro na tentativa {tentativa} "
+                f"[{classificar_erro(e)}]: {e}"
+            )
             
-            if tentativa == max_tentativas:
-                # Última tentativa - retorna erro
-                return {
-                    "parte_numero": parte_numero,
-                    "parte_titulo": parte_info["titulo"],
-                    "mapa_gerado": "",
-                    "aprovado": False,
-                    "nota_geral": 0.0,
-                    "tentativas": tentativa,
-                    "problemas": [],
-                    "sugestoes_melhoria": [],
-                    "justificativa_revisao": f"Erro após {tentativa} tentativas: {str(e)}"
-                }
+            if not politica.deve_retentar(e, tentativa):
+                # Sem novo retry (última tentativa, erro não recuperável
+                # ou orçamento do job esgotado) - retorna erro
+                return resultado_erro(identificacao, tentativa, e)
             
-            await asyncio.sleep(2)  # Delay maior em caso de erro
+            await politica.aguardar(tentativa, e)
             continue
 
 
 async def processar_partes_paralelo(
     state: MindmapState,
-    max_workers: int = 3
+    max_workers: int = 3,
+    on_parte_concluida: Optional[Callable] = None
 ) -> MindmapState:
     """
     Processa múltiplas partes em paralelo.
     
+    Mapas já obtidos numa execução anterior (presentes em
+    `partes_processadas` e sem erro) são mantidos: só as partes que
+    faltam ou falharam são processadas de novo.
+    
+    Com `mapas_revisao_em_lote`, os mapas do arquivo são revisados em
+    lote (uma chamada ao LLM03 para vários mapas; ver revisao_lote.py).
+    
     Args:
         state: Estado atual
-        max_workers: Máximo de partes processadas simultaneamente
-                     (para não sobrecarregar APIs)
+        max_workers: Número fixo de workers (partes simultâneas,
+                     para não sobrecarregar APIs)
+        on_parte_concluida: Callback (indice, item, resultado) chamado
+                            assim que cada parte termina
     """
     
-    divisoes = state["divisoes"]
-    total_partes = len(divisoes)
+    unidades = expandir_divisoes(state["divisoes"])
+    
+    anteriores = {
+        (p["parte_numero"], p.get("mapa_numero", 1)): p
+        for p in state.get("partes_processadas", [])
+        if not p.get("erro")
+    }
+    resultados = [
+        anteriores.get((u["parte_numero"], u["mapa_numero"]))
+        for u in unidades
+    ]
+    pendentes = [(i, u) for i, u in enumerate(unidades) if resultados[i] is None]
+    total_partes = len(pendentes)
+    
+    if anteriores:
+        logger.info(
+            f"♻️ Reaproveitando {len(unidades) - total_partes} mapa(s) já aprovado(s); "
+            f"reprocessando {total_partes}"
+        )
     
     logger.info(
-        f"🚀 Iniciando processamento PARALELO de {total_partes} parte(s) "
-        f"(máx {max_workers} simultâneas)..."
+        f"🚀 Iniciando processamento PARALELO de {total_partes} mapa(s) "
+        f"em {len(state['divisoes'])} parte(s) (máx {max_workers} simultâneos)..."
     )
     
-    # Cria tasks para cada parte
-    tasks = []
-    for i, parte_info in enumerate(divisoes):
-        task = processar_parte_completa(
+    # O modo especulativo dispara N revisões individuais por mapa,
+    # incompatível com a revisão em lote: tem precedência sobre ela
+    if settings.mapas_revisao_em_lote and not state.get("especulativo"):
+        from .revisao_lote import processar_unidades_revisao_lote
+        
+        logger.info(f"📦 Revisão em lote ativada ({total_partes} mapa(s))")
+        
+        novos = await processar_unidades_revisao_lote(
+            state,
+            [u for _i, u in pendentes],
+            max_workers=max_workers,
+            max_tentativas=state["max_tentativas"],
+            on_parte_concluida=on_parte_concluida
+        )
+        
+        for (i, _unidade), resultado in zip(pendentes, novos):
+            resultados[i] = resultado
+        
+        return consolidar_partes(state, resultados)
+    
+    async def processar(item: tuple):
+        i, parte_info = item
+        return await processar_parte_completa(
             parte_info=parte_info,
             state=state,
             parte_index=i,
             max_tentativas=state["max_tentativas"]
         )
-        tasks.append(task)
     
-    # Processa em lotes (semaphore para limitar concorrência)
-    semaphore = asyncio.Semaphore(max_workers)
+    def ao_progredir(concluidas: int, total):
+        logger.info(f"📊 {concluidas}/{total} parte(s) finalizada(s)")
     
-    async def task_with_semaphore(task):
-        async with semaphore:
-            return await task
-    
-    # Executa todas as tasks
+    # Pool fixo de workers consumindo a fila de partes
     logger.info(f"⏳ Aguardando conclusão de {total_partes} parte(s)...")
     
-    resultados = await asyncio.gather(
-        *[task_with_semaphore(task) for task in tasks],
-        return_exceptions=True  # Não para se uma falhar
+    novos = await executar_em_pool(
+        pendentes,
+        processar,
+        max_workers=max_workers,
+        on_resultado=on_parte_concluida,
+        on_progresso=ao_progredir,
+        nome="partes"
     )
     
-    # Processa resultados
+    for (i, _unidade), resultado in zip(pendentes, novos):
+        resultados[i] = resultado
+    
+    return consolidar_partes(state, resultados)
+
+
+def consolidar_partes(state: MindmapState, resultados: List) -> MindmapState:
+    """
+    Incorpora ao estado os resultados das partes de um arquivo.
+    
+    Partes que falharam (exceção ou resultado com `erro`) ficam fora de
+    `partes_processadas`, para serem refeitas num retry, e o estado
+    fica com status "parcial".
+    
+    Args:
+        state: Estado do arquivo
+        resultados: Resultado de cada unidade, na ordem de `expandir_divisoes`
+                    (exceções aparecem no lugar do resultado)
+    """
+    total_partes = len(resultados)
     partes_processadas = []
     partes_com_erro = []
     
@@ -270,6 +704,9 @@ async def processar_partes_paralelo(
         if isinstance(resultado, Exception):
             logger.error(f"❌ Parte {i+1} falhou com exceção: {resultado}")
             partes_com_erro.append(i+1)
+        elif resultado.get("erro"):
+            logger.error(f"❌ Parte {i+1} falhou: {resultado['justificativa_revisao']}")
+            partes_com_erro.append(i+1)
         else:
             partes_processadas.append(resultado)
             
@@ -282,15 +719,16 @@ async def processar_partes_paralelo(
                 )
     
     # Atualiza estado
-    state["partes_processadas"] = sorted(partes_processadas, key=lambda x: x["parte_numero"])
+    state["partes_processadas"] = sorted(
+        partes_processadas,
+        key=lambda x: (x["parte_numero"], x.get("mapa_numero", 1))
+    )
     state["status"] = "concluido" if not partes_com_erro else "parcial"
-    
-    if partes_com_erro:
-        state["erro_msg"] = f"Partes com erro: {partes_com_erro}"
+    state["erro_msg"] = f"Partes com erro: {partes_com_erro}" if partes_com_erro else None
     
     # Log final
     logger.success(
-        f"🎉 Processamento paralelo concluído!\n"
+        f"🎉 Processamento paralelo concluído: {state['html_filename']}\n"
         f"   ✅ Sucesso: {len(partes_processadas)}/{total_partes}\n"
         f"   ❌ Erros: {len(partes_com_erro)}/{total_partes}"
     )
@@ -299,9 +737,101 @@ async def processar_partes_paralelo(
 
 
 # ============================================
-# GRAFO SIMPLIFICADO (SEM LANGGRAPH PARA PARTES)
+# EXECUÇÃO POR ETAPAS (RETOMÁVEL)
 # ============================================
 
+async def executar_divisao(state: MindmapState) -> MindmapState:
+    """
+    Etapa de divisão, escolhendo o caminho pelo tamanho do texto.
+    
+    Fundamentações curtas usam a chamada única divisão + geração (os
+    mapas já vêm prontos para revisão); se ela falhar, ou se o texto for
+    maior, usa o divisor tradicional (LLM01).
+    """
+    if usar_fusao(state):
+        state = await dividir_e_gerar_node(state)
+        
+        if state["status"] != "erro":
+            return state
+        
+        logger.info("↩️ Caindo para o divisor tradicional (LLM01)")
+        state["erro_msg"] = None
+    
+    return await dividir_conteudo_node(state)
+
+
+async def executar_etapas_mapa(
+    state: MindmapState,
+    max_workers: int = 3
+) -> MindmapState:
+    """
+    Executa (ou retoma) parse → divisão → partes de um arquivo, sem salvar.
+    
+    Etapas já concluídas no estado são reaproveitadas, o que permite
+    retry na granularidade da etapa que falhou:
+    - `fundamentacao` preenchida → não relê nem reparseia o HTML
+    - `divisoes` preenchidas → não chama o LLM01 de novo
+    - partes aprovadas → mantidas; só as que falharam são refeitas
+    
+    Returns:
+        Estado com status "concluido", "parcial" ou "erro"
+    """
+    state["status"] = "parsing"
+    state["erro_msg"] = None
+    
+    # 1. PARSE
+    if not state["fundamentacao"]:
+        logger.info("📄 1/3: Parsing HTML...")
+        state = await parse_html_node(state)
+        
+        if state["status"] == "erro":
+            return state
+    else:
+        logger.info("♻️ 1/3: Parse reaproveitado")
+    
+    # 2. DIVISÃO (LLM01, ou chamada única divisão + geração)
+    if not state["divisoes"]:
+        logger.info("✂️ 2/3: Dividindo conteúdo...")
+        state = await executar_divisao(state)
+        
+        if state["status"] == "erro":
+            return state
+        
+        logger.info(f"📊 Conteúdo dividido em {len(state['divisoes'])} parte(s)")
+    else:
+        logger.info(f"♻️ 2/3: Divisão reaproveitada ({len(state['divisoes'])} parte(s))")
+    
+    # 3. PARTES (LLM02 + LLM03, PARALELO)
+    logger.info("🚀 3/3: Processando partes EM PARALELO...")
+    return await processar_partes_paralelo(state, max_workers=max_workers)
+
+
+async def salvar_resultado(state: MindmapState) -> MindmapState:
+    """
+    Salva os mapas obtidos, inclusive de um processamento parcial.
+    
+    Se o estado estava "parcial", continua "parcial" após salvar
+    (os mapas aprovados vão para disco; as partes com erro, não).
+    """
+    status = state["status"]
+    erro_msg = state["erro_msg"]
+    
+    if status == "erro" or not state["partes_processadas"]:
+        if status != "erro":
+            state["status"] = "erro"
+            state["erro_msg"] = erro_msg or "Nenhum mapa gerado"
+        return state
+    
+    logger.info("💾 Salvando arquivos...")
+    state = await salvar_mindmap_node(state)
+    
+    if status == "parcial" and state["status"] == "concluido":
+        state["status"] = "parcial"
+        state["erro_msg"] = erro_msg
+    
+    return state
+
+
 async def execute_graph_parallel(
     html_filename: str,
     llm01_provider: str,
@@ -327,64 +857,21 @@ async def execute_graph_parallel(
     logger.info(f"⚙️ Max workers: {max_workers}")
     
     # Estado inicial
-    state: MindmapState = {
-        "html_filename": html_filename,
-        "ramo_direito": "",
-        "topico": "",
-        "fundamentacao": "",
-        "divisoes": [],
-        "partes_processadas": [],
-        "tentativas_revisao": 0,
-        "max_tentativas": max_tentativas,
-        "status": "parsing",
-        "erro_msg": None,
-        "llm01_provider": llm01_provider,
-        "llm02_provider": llm02_provider,
-        "llm03_provider": llm03_provider,
-        "logs": []
-    }
+    state = criar_estado_inicial(
+        html_filename=html_filename,
+        llm01_provider=llm01_provider,
+        llm02_provider=llm02_provider,
+        llm03_provider=llm03_provider,
+        max_tentativas=max_tentativas
+    )
     
     try:
-        # ============================================
-        # 1. PARSE (Sequencial)
-        # ============================================
-        
-        logger.info("📄 1/4: Parsing HTML...")
-        state = await parse_html_node(state)
-        
-        if state["status"] == "erro":
-            raise Exception(state["erro_msg"])
-        
-        # ============================================
-        # 2. DIVISÃO (Sequencial - LLM01)
-        # ============================================
-        
-        logger.info("✂️ 2/4: Dividindo conteúdo...")
-        state = await dividir_conteudo_node(state)
+        state = await executar_etapas_mapa(state, max_workers=max_workers)
+        state = await salvar_resultado(state)
         
         if state["status"] == "erro":
             raise Exception(state["erro_msg"])
         
-        num_partes = len(state["divisoes"])
-        logger.info(f"📊 Conteúdo dividido em {num_partes} parte(s)")
-        
-        # ============================================
-        # 3. PROCESSAMENTO PARALELO (LLM02 + LLM03)
-        # ============================================
-        
-        logger.info("🚀 3/4: Processando partes EM PARALELO...")
-        state = await processar_partes_paralelo(state, max_workers=max_workers)
-        
-        if state["status"] == "erro":
-            raise Exception(state["erro_msg"])
-        
-        # ============================================
-        # 4. SALVAMENTO (Sequencial)
-        # ============================================
-        
-        logger.info("💾 4/4: Salvando arquivos...")
-        state = await salvar_mindmap_node(state)
-        
         logger.success(f"✅ Processamento concluído: {html_filename}")
         
         return state
@@ -412,33 +899,21 @@ async def processar_multiplos_htmls_paralelo(
     """
     Processa múltiplos HTMLs em paralelo.
     
+    Mantido por compatibilidade: delega ao motor de lote
+    (`processar_lote_mapas`), que usa uma única fila global de partes.
+    O limite global equivale ao antigo produto dos dois limites.
+    
     Args:
         max_workers_por_arquivo: Quantas partes processar em paralelo por arquivo
         max_arquivos_simultaneos: Quantos arquivos processar simultaneamente
     """
-    
-    logger.info(
-        f"🚀 Processando {len(html_files)} arquivo(s) em paralelo\n"
-        f"   📁 Max arquivos simultâneos: {max_arquivos_simultaneos}\n"
-        f"   📝 Max partes simultâneas por arquivo: {max_workers_por_arquivo}"
+    from .batch import processar_lote_mapas
+    
+    return await processar_lote_mapas(
+        html_files=html_files,
+        llm01_provider=llm01_provider,
+        llm02_provider=llm02_provider,
+        llm03_provider=llm03_provider,
+        max_tentativas=max_tentativas,
+        max_workers=max_workers_por_arquivo * max_arquivos_simultaneos
     )
-    
-    semaphore = asyncio.Semaphore(max_arquivos_simultaneos)
-    
-    async def process_with_semaphore(filename):
-        async with semaphore:
-            return await execute_graph_parallel(
-                html_filename=filename,
-                llm01_provider=llm01_provider,
-                llm02_provider=llm02_provider,
-                llm03_provider=llm03_provider,
-                max_tentativas=max_tentativas,
-                max_workers=max_workers_por_arquivo
-            )
-    
-    resultados = await asyncio.gather(
-        *[process_with_semaphore(f) for f in html_files],
-        return_exceptions=True
-    )
-    
-    return resultados
\ No newline at end of file
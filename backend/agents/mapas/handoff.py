@@ -0,0 +1,56 @@
+# backend/agents/mapas/handoff.py
+"""
+Aplicação do handoff do pipeline de guias ao estado de mapas.
+
+O handoff (ver services/handoff_guias.py) é só a referência ao guia
+recém-salvo; a extração dele já está no cache do html_extractor. O
+estado de mapas é semeado com ramo, tópico e fundamentação lidos desse
+cache e a etapa de parse é pulada.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from .state import MindmapState
+from .nodes.parser_node import interpretar_guia
+from backend.services.html_extractor import extrair_guia_async
+from backend.utils.logger import logger
+
+
+async def aplicar_handoff(state: MindmapState, handoff: Optional[dict]) -> MindmapState:
+    """
+    Semeia o estado de mapas com o handoff (equivale a um parse concluído).
+
+    Sem handoff, se ele for de outro arquivo ou se o guia não puder ser
+    lido, o estado fica intacto e o parse é feito do disco.
+    """
+    if not handoff or handoff.get("html_filename") != state["html_filename"]:
+        return state
+
+    try:
+        dados = interpretar_guia(await extrair_guia_async(handoff["caminho"]))
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Handoff ignorado para {state['html_filename']}: {e}")
+        return state
+
+    state["ramo_direito"] = dados["ramo_direito"]
+    state["topico"] = dados["topico"]
+    state["fundamentacao"] = dados["fundamentacao"]
+    state["status"] = "dividindo"
+
+    state["logs"].append({
+        "timestamp": datetime.now().isoformat(),
+        "node": "handoff",
+        "level": "success",
+        "message": f"Estado semeado pelo pipeline de guias: {state['html_filename']}",
+        "data": {
+            "ramo": dados["ramo_direito"],
+            "topico": dados["topico"],
+            "tamanho_fundamentacao": len(dados["fundamentacao"]),
+            "sha256": handoff.get("sha256")
+        }
+    })
+
+    logger.info(f"♻️ Handoff de guias: {state['html_filename']} (parse do disco evitado)")
+
+    return state
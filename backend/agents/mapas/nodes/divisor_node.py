@@ -2,15 +2,30 @@
 """
 Node do LLM01 - Divisor de Conteúdo.
 VERSÃO COM IMPORTS CORRIGIDOS
+
+Fundamentações maiores que `mapas_divisor_max_chars` não são truncadas:
+são fatiadas em blocos nas fronteiras de seção/linha, cada bloco é
+dividido por uma chamada ao LLM01 (todas em paralelo) e as partes são
+unidas e rebalanceadas até `mapas_divisor_max_partes` (map-reduce).
 """
 
-from ..state import MindmapState
+from ..state import MindmapState, parametros_llm
 from backend.services.llm_factory import get_llm  # ✅ Path absoluto
-from backend.agents.mapas.prompts.divisor_prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE  # ✅ Path absoluto
+from backend.agents.mapas.prompts.divisor_prompts import (  # ✅ Path absoluto
+    SYSTEM_PROMPT,
+    USER_PROMPT_TEMPLATE,
+    BLOCO_PROMPT_TEMPLATE
+)
 from backend.utils.logger import logger  # ✅ Path absoluto
+from backend.services.retry_policy import PoliticaRetry
+from backend.services.worker_pool import executar_em_pool
+from backend.core.config import get_settings
 from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import List
+import math
+
+settings = get_settings()
 
 
 # ============================================
@@ -32,6 +47,121 @@ class DivisaoConteudo(BaseModel):
     partes: List[ParteDivisao] = Field(description="Lista das partes com conteúdo completo")
 
 
+class DivisaoBloco(BaseModel):
+    """Resposta estruturada do LLM01 para um bloco de fundamentação longa."""
+    num_partes: int = Field(ge=1, le=10, description="Número de partes do bloco (1-10)")
+    justificativa: str = Field(description="Razão da divisão escolhida")
+    partes: List[ParteDivisao] = Field(description="Lista das partes com conteúdo completo")
+
+
+# ============================================
+# MAP-REDUCE PARA FUNDAMENTAÇÕES LONGAS
+# ============================================
+
+MIN_CHARS_PARTE_BLOCO = 300
+
+
+def _parece_titulo(linha: str) -> bool:
+    """Linha curta sem pontuação final: provável título de seção."""
+    linha = linha.strip()
+    return 0 < len(linha) <= 80 and not linha.endswith((".", ";", ",", ")", '"'))
+
+
+def fatiar_fundamentacao(texto: str, max_chars: int) -> List[str]:
+    """
+    Fatia a fundamentação em blocos de até `max_chars`.
+    
+    Corta apenas entre linhas, preferindo cortar antes de um título de
+    seção quando o bloco já passou de 60% do limite. Linhas maiores que
+    o limite são cortadas no último ". " antes dele.
+    
+    Returns:
+        Lista de blocos (um só, se o texto couber no limite)
+    """
+    if len(texto) <= max_chars:
+        return [texto]
+    
+    linhas = []
+    for linha in texto.split("\n"):
+        while len(linha) > max_chars:
+            corte = linha.rfind(". ", 0, max_chars)
+            corte = corte + 1 if corte > max_chars // 2 else max_chars
+            linhas.append(linha[:corte])
+            linha = linha[corte:].lstrip()
+        linhas.append(linha)
+    
+    blocos = []
+    atual: List[str] = []
+    tamanho = 0
+    
+    for linha in linhas:
+        estoura = tamanho + len(linha) + 1 > max_chars
+        secao_nova = _parece_titulo(linha) and tamanho >= max_chars * 0.6
+        
+        if atual and (estoura or secao_nova):
+            blocos.append("\n".join(atual))
+            atual, tamanho = [], 0
+        
+        atual.append(linha)
+        tamanho += len(linha) + 1
+    
+    if atual:
+        blocos.append("\n".join(atual))
+    
+    return [b for b in blocos if b.strip()]
+
+
+def rebalancear_partes(divisoes: List[dict], max_partes: int) -> List[dict]:
+    """
+    Une partes adjacentes até no máximo `max_partes`.
+    
+    Primeiro absorve partes muito pequenas (< MIN_CHARS_PARTE_BLOCO) no
+    vizinho menor; depois junta sempre o par adjacente de menor tamanho
+    combinado. A ordem do texto é preservada e as partes são renumeradas.
+    """
+    partes = [dict(p) for p in divisoes]
+    
+    def unir(i: int) -> None:
+        a, b = partes[i], partes[i + 1]
+        partes[i:i + 2] = [{
+            "numero": a["numero"],
+            "titulo": f"{a['titulo']} / {b['titulo']}",
+            "conteudo": f"{a['conteudo']}\n{b['conteudo']}",
+            "estimativa_mapas": min(3, a["estimativa_mapas"] + b["estimativa_mapas"])
+        }]
+    
+    # Partes muito pequenas
+    i = 0
+    while len(partes) > 1 and i < len(partes):
+        if len(partes[i]["conteudo"]) >= MIN_CHARS_PARTE_BLOCO:
+            i += 1
+            continue
+        
+        if i == 0:
+            unir(0)
+        elif i == len(partes) - 1:
+            unir(i - 1)
+            i -= 1
+        elif len(partes[i - 1]["conteudo"]) <= len(partes[i + 1]["conteudo"]):
+            unir(i - 1)
+            i -= 1
+        else:
+            unir(i)
+    
+    # Limite global de partes
+    while len(partes) > max_partes:
+        i = min(
+            range(len(partes) - 1),
+            key=lambda k: len(partes[k]["conteudo"]) + len(partes[k + 1]["conteudo"])
+        )
+        unir(i)
+    
+    for numero, parte in enumerate(partes, 1):
+        parte["numero"] = numero
+    
+    return partes
+
+
 # ============================================
 # NODE FUNCTION
 # ============================================
@@ -50,73 +180,113 @@ async def dividir_conteudo_node(state: MindmapState) -> MindmapState:
         # ============================================
         
         llm = get_llm(
-            provider=state["llm01_provider"],
-            temperature=0.3,
-            max_tokens=12000
+            **parametros_llm(state, "divisor", temperatura=0.3),
+            papel="mapas_divisor"
         )
         
         logger.debug(f"LLM configurado: {state['llm01_provider']}")
         
         # ============================================
-        # PREPARA CONTEÚDO
+        # PREPARA CONTEÚDO (MAP-REDUCE SE FOR LONGO)
         # ============================================
         
         fundamentacao = state["fundamentacao"]
+        max_partes = settings.mapas_divisor_max_partes
         
-        max_chars_input = 15000
+        blocos = fatiar_fundamentacao(fundamentacao, settings.mapas_divisor_max_chars)
         
-        if len(fundamentacao) > max_chars_input:
-            logger.warning(
-                f"⚠️ Fundamentação muito longa ({len(fundamentacao)} chars). "
-                f"Truncando para {max_chars_input} chars."
-            )
-            fundamentacao_para_analise = fundamentacao[:max_chars_input] + "\n\n[...conteúdo truncado...]"
-        else:
-            fundamentacao_para_analise = fundamentacao
+        logger.info(f"📏 Tamanho da fundamentação: {len(fundamentacao)} chars")
         
-        logger.info(f"📏 Tamanho da fundamentação: {len(fundamentacao_para_analise)} chars")
+        politica = PoliticaRetry(max_tentativas=settings.llm_max_tentativas_chamada)
         
-        # ============================================
-        # PREPARA PROMPT
-        # ============================================
-        
-        user_prompt = USER_PROMPT_TEMPLATE.format(
-            ramo_direito=state["ramo_direito"],
-            topico=state["topico"],
-            fundamentacao=fundamentacao_para_analise
-        )
-        
-        logger.debug(f"Prompt preparado ({len(user_prompt)} chars)")
+        async def dividir(texto: str, modelo, sufixo: str = "", descricao: str = "LLM01 (divisor)"):
+            user_prompt = USER_PROMPT_TEMPLATE.format(
+                ramo_direito=state["ramo_direito"],
+                topico=state["topico"],
+                fundamentacao=texto
+            ) + sufixo
+            
+            logger.debug(f"Prompt preparado ({len(user_prompt)} chars)")
+            
+            structured_llm = llm.with_structured_output(modelo)
+            
+            return await politica.executar(
+                lambda: structured_llm.ainvoke([
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ]),
+                descricao=descricao
+            )
         
         # ============================================
         # CHAMA LLM COM STRUCTURED OUTPUT
         # ============================================
         
-        logger.info("📞 Chamando LLM01...")
-        
-        structured_llm = llm.with_structured_output(DivisaoConteudo)
-        
-        response = await structured_llm.ainvoke([
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ])
+        if len(blocos) == 1:
+            logger.info("📞 Chamando LLM01...")
+            
+            response = await dividir(fundamentacao, DivisaoConteudo)
+            
+            logger.success(f"✅ LLM01 respondeu: {response.num_partes} partes")
+            
+            if not response.partes:
+                raise ValueError("LLM01 não retornou nenhuma parte na divisão")
+            
+            if len(response.partes) != response.num_partes:
+                logger.warning(
+                    f"⚠️ Inconsistência: num_partes={response.num_partes} "
+                    f"mas len(partes)={len(response.partes)}"
+                )
+            
+            partes = list(response.partes)
+            justificativa = response.justificativa
         
-        logger.success(f"✅ LLM01 respondeu: {response.num_partes} partes")
+        else:
+            logger.info(
+                f"🧩 Fundamentação longa: {len(blocos)} blocos de até "
+                f"{settings.mapas_divisor_max_chars} chars (LLM01 em paralelo)"
+            )
+            
+            async def dividir_bloco(item: tuple):
+                indice, bloco = item
+                partes_bloco = max(
+                    2, min(10, math.ceil(max_partes * len(bloco) / len(fundamentacao)))
+                )
+                sufixo = BLOCO_PROMPT_TEMPLATE.format(
+                    bloco=indice,
+                    total_blocos=len(blocos),
+                    max_partes=partes_bloco
+                )
+                return await dividir(
+                    bloco, DivisaoBloco, sufixo,
+                    descricao=f"LLM01 (divisor, bloco {indice}/{len(blocos)})"
+                )
+            
+            respostas = await executar_em_pool(
+                list(enumerate(blocos, 1)),
+                dividir_bloco,
+                max_workers=min(len(blocos), settings.mapas_divisor_max_paralelo),
+                nome="divisor-blocos"
+            )
+            
+            for indice, resposta in enumerate(respostas, 1):
+                if isinstance(resposta, Exception):
+                    raise ValueError(f"Bloco {indice}/{len(blocos)} falhou: {resposta}")
+                if not resposta.partes:
+                    raise ValueError(f"LLM01 não retornou partes para o bloco {indice}/{len(blocos)}")
+            
+            partes = [parte for resposta in respostas for parte in resposta.partes]
+            justificativa = f"Divisão em {len(blocos)} blocos (map-reduce): " + " | ".join(
+                resposta.justificativa for resposta in respostas
+            )
+            
+            logger.success(f"✅ LLM01 respondeu: {len(partes)} partes em {len(blocos)} blocos")
         
         # ============================================
         # VALIDA RESPOSTA
         # ============================================
         
-        if not response.partes:
-            raise ValueError("LLM01 não retornou nenhuma parte na divisão")
-        
-        if len(response.partes) != response.num_partes:
-            logger.warning(
-                f"⚠️ Inconsistência: num_partes={response.num_partes} "
-                f"mas len(partes)={len(response.partes)}"
-            )
-        
-        for i, parte in enumerate(response.partes, 1):
+        for i, parte in enumerate(partes, 1):
             if not parte.conteudo_completo or len(parte.conteudo_completo) < 50:
                 logger.error(
                     f"❌ Parte {i} tem conteúdo insuficiente ({len(parte.conteudo_completo)} chars)"
@@ -130,25 +300,32 @@ async def dividir_conteudo_node(state: MindmapState) -> MindmapState:
         # PROCESSA DIVISÕES
         # ============================================
         
-        divisoes_processadas = []
-        
-        for parte in response.partes:
-            divisoes_processadas.append({
+        divisoes_processadas = [
+            {
                 "numero": parte.numero,
                 "titulo": parte.titulo,
                 "conteudo": parte.conteudo_completo,
                 "estimativa_mapas": parte.estimativa_mapas
-            })
-            
+            }
+            for parte in partes
+        ]
+        
+        if len(blocos) > 1:
+            divisoes_processadas = rebalancear_partes(divisoes_processadas, max_partes)
+        
+        for parte in divisoes_processadas:
             logger.info(
-                f"  📝 Parte {parte.numero}: {parte.titulo}\n"
-                f"     └─ Tamanho: {len(parte.conteudo_completo)} chars, "
-                f"~{parte.estimativa_mapas} mapa(s)"
+                f"  📝 Parte {parte['numero']}: {parte['titulo']}\n"
+                f"     └─ Tamanho: {len(parte['conteudo'])} chars, "
+                f"~{parte['estimativa_mapas']} mapa(s)"
             )
             
-            preview = parte.conteudo_completo[:100].replace('\n', ' ')
+            preview = parte["conteudo"][:100].replace('\n', ' ')
             logger.debug(f"     └─ Preview: {preview}...")
         
+        num_partes = len(divisoes_processadas)
+        total_mapas_estimados = sum(p["estimativa_mapas"] for p in divisoes_processadas)
+        
         # ============================================
         # VALIDAÇÃO FINAL
         # ============================================
@@ -175,21 +352,22 @@ async def dividir_conteudo_node(state: MindmapState) -> MindmapState:
             "timestamp": datetime.now().isoformat(),
             "node": "dividir_conteudo",
             "level": "success",
-            "message": f"Conteúdo dividido em {response.num_partes} partes",
+            "message": f"Conteúdo dividido em {num_partes} partes",
             "data": {
                 "llm": state["llm01_provider"],
-                "num_partes": response.num_partes,
-                "justificativa": response.justificativa,
-                "total_mapas_estimados": sum(p.estimativa_mapas for p in response.partes),
+                "num_partes": num_partes,
+                "num_blocos": len(blocos),
+                "justificativa": justificativa,
+                "total_mapas_estimados": total_mapas_estimados,
                 "total_chars_partes": total_chars_partes,
-                "tamanho_medio_parte": total_chars_partes // response.num_partes
+                "tamanho_medio_parte": total_chars_partes // num_partes
             }
         })
         
         logger.success(
-            f"✅ Divisão concluída: {response.num_partes} partes, "
-            f"~{sum(p.estimativa_mapas for p in response.partes)} mapas estimados\n"
-            f"📋 Justificativa: {response.justificativa}"
+            f"✅ Divisão concluída: {num_partes} partes, "
+            f"~{total_mapas_estimados} mapas estimados\n"
+            f"📋 Justificativa: {justificativa}"
         )
         
         return state
@@ -0,0 +1,176 @@
+# backend/agents/mapas/nodes/fusao_node.py
+"""
+Node de divisão + geração numa única chamada (LLM02).
+
+Para fundamentações curtas (até `mapas_fusao_max_chars`), uma chamada
+estruturada devolve as partes e o mapa Mermaid de cada uma. Isso elimina
+a ida e volta serial do LLM01 antes das gerações: as partes seguem direto
+para a revisão (LLM03), em paralelo. Os mapas chegam em
+`divisao["mapa_inicial"]` e são usados na 1ª tentativa de cada parte.
+"""
+
+from ..state import MindmapState, parametros_llm
+from .divisor_node import ParteDivisao
+from backend.services.llm_factory import get_llm
+from backend.agents.mapas.prompts.fusao_prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
+from backend.utils.logger import logger
+from backend.services.retry_policy import PoliticaRetry
+from backend.services.mermaid_mindmap import parse_mindmap
+from backend.core.config import get_settings
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List
+
+settings = get_settings()
+
+MAX_PARTES_FUSAO = 4
+
+
+# ============================================
+# MODELS PARA STRUCTURED OUTPUT
+# ============================================
+
+class ParteComMapa(ParteDivisao):
+    """Parte da divisão já acompanhada do seu mapa mental."""
+    mapa_mermaid: str = Field(description="Código Mermaid (mindmap) do mapa desta parte")
+
+
+class DivisaoComMapas(BaseModel):
+    """Resposta estruturada da chamada única divisão + geração."""
+    num_partes: int = Field(ge=1, le=MAX_PARTES_FUSAO, description=f"Número de partes (1-{MAX_PARTES_FUSAO})")
+    justificativa: str = Field(description="Razão da divisão escolhida")
+    partes: List[ParteComMapa] = Field(description="Partes com conteúdo completo e mapa mental")
+
+
+def usar_fusao(state: MindmapState) -> bool:
+    """Indica se a fundamentação é curta o bastante para a chamada única."""
+    limite = settings.mapas_fusao_max_chars
+    return limite > 0 and len(state["fundamentacao"]) <= limite
+
+
+# ============================================
+# NODE FUNCTION
+# ============================================
+
+async def dividir_e_gerar_node(state: MindmapState) -> MindmapState:
+    """
+    LLM02: Divide o conteúdo e gera os mapas de todas as partes.
+    
+    Em caso de erro, o estado volta com status "erro" e `divisoes`
+    vazias; o chamador pode cair para o caminho tradicional (LLM01).
+    """
+    
+    logger.info(
+        f"⚡ Divisão + geração em chamada única "
+        f"({len(state['fundamentacao'])} chars, provider: {state['llm02_provider']})"
+    )
+    
+    try:
+        llm = get_llm(
+            **parametros_llm(state, "gerador", temperatura=0.4),
+            papel="mapas_fusao"
+        )
+        
+        user_prompt = USER_PROMPT_TEMPLATE.format(
+            ramo_direito=state["ramo_direito"],
+            topico=state["topico"],
+            fundamentacao=state["fundamentacao"],
+            max_partes=MAX_PARTES_FUSAO
+        )
+        
+        structured_llm = llm.with_structured_output(DivisaoComMapas)
+        
+        politica = PoliticaRetry(max_tentativas=settings.llm_max_tentativas_chamada)
+        
+        response = await politica.executar(
+            lambda: structured_llm.ainvoke([
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ]),
+            descricao="LLM02 (divisão + geração)"
+        )
+        
+        # ============================================
+        # VALIDA RESPOSTA
+        # ============================================
+        
+        if not response.partes:
+            raise ValueError("Chamada única não retornou nenhuma parte")
+        
+        divisoes = []
+        
+        for i, parte in enumerate(response.partes, 1):
+            if not parte.conteudo_completo or len(parte.conteudo_completo) < 50:
+                raise ValueError(f"Parte {i} não tem conteúdo adequado")
+            
+            arvore = parse_mindmap(parte.mapa_mermaid)
+            
+            if arvore.raiz is None:
+                raise ValueError(f"Parte {i} sem mapa Mermaid válido")
+            
+            # Erros mecânicos de sintaxe corrigidos localmente
+            mapa = arvore.serializar()
+            if arvore.correcoes:
+                logger.info(f"🔧 Parte {i}: {len(arvore.correcoes)} correção(ões) automática(s) no Mermaid")
+            
+            # Um mapa por parte: o mapa já gerado cobre a parte inteira
+            divisoes.append({
+                "numero": i,
+                "titulo": parte.titulo,
+                "conteudo": parte.conteudo_completo,
+                "estimativa_mapas": 1,
+                "mapa_inicial": mapa
+            })
+            
+            logger.info(
+                f"  📝 Parte {i}: {parte.titulo}\n"
+                f"     └─ Tamanho: {len(parte.conteudo_completo)} chars, mapa: {len(mapa)} chars"
+            )
+        
+        # ============================================
+        # ATUALIZA ESTADO
+        # ============================================
+        
+        state["divisoes"] = divisoes
+        state["status"] = "gerando"
+        state["partes_processadas"] = []
+        
+        state["logs"].append({
+            "timestamp": datetime.now().isoformat(),
+            "node": "dividir_e_gerar",
+            "level": "success",
+            "message": f"Conteúdo dividido em {len(divisoes)} partes com mapas (chamada única)",
+            "data": {
+                "llm": state["llm02_provider"],
+                "num_partes": len(divisoes),
+                "justificativa": response.justificativa,
+                "tamanho_fundamentacao": len(state["fundamentacao"])
+            }
+        })
+        
+        logger.success(
+            f"✅ Chamada única concluída: {len(divisoes)} parte(s) com mapa\n"
+            f"📋 Justificativa: {response.justificativa}"
+        )
+        
+        return state
+    
+    except Exception as e:
+        logger.warning(f"⚠️ Chamada única falhou: {str(e)}")
+        
+        state["divisoes"] = []
+        state["status"] = "erro"
+        state["erro_msg"] = f"Erro na divisão + geração: {str(e)}"
+        
+        state["logs"].append({
+            "timestamp": datetime.now().isoformat(),
+            "node": "dividir_e_gerar",
+            "level": "warning",
+            "message": f"Erro na chamada única: {str(e)}",
+            "data": {
+                "llm": state["llm02_provider"],
+                "error_type": type(e).__name__
+            }
+        })
+        
+        return state
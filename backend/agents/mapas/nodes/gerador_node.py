@@ -4,12 +4,40 @@ Node do LLM02 - Gerador de Mapas Mentais.
 VERSÃO FINAL - TODOS OS IMPORTS ABSOLUTOS
 """
 
-from ..state import MindmapState
+from ..state import MindmapState, parametros_llm
 from backend.services.llm_factory import get_llm
-from backend.agents.mapas.prompts.gerador_prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
+from backend.agents.mapas.prompts.gerador_prompts import (
+    SYSTEM_PROMPT,
+    USER_PROMPT_TEMPLATE,
+    FEEDBACK_RETRY_TEMPLATE
+)
+from backend.services.revisao_delta import formatar_problemas
+from backend.services.conversa_retry import montar_conversa, formatar_sugestoes
+from backend.services.mermaid_mindmap import corrigir_mindmap
 from backend.utils.logger import logger
+from backend.services.retry_policy import PoliticaRetry
+from backend.core.config import get_settings
 from datetime import datetime
-import re
+from typing import List, Optional
+
+settings = get_settings()
+
+
+def montar_feedback_retry(
+    problemas: List[dict],
+    sugestoes: List[str],
+    nota: Optional[float],
+    tentativa: int,
+    max_tentativas: int
+) -> str:
+    """Turno user com as críticas do revisor, para o retry conversacional."""
+    return FEEDBACK_RETRY_TEMPLATE.format(
+        tentativa=tentativa,
+        max_tentativas=max_tentativas,
+        nota=nota or 0.0,
+        problemas=formatar_problemas(problemas) or "- (não detalhados)",
+        sugestoes=formatar_sugestoes(sugestoes)
+    )
 
 
 async def gerar_mindmap_node(state: MindmapState) -> MindmapState:
@@ -65,6 +93,21 @@ async def gerar_mindmap_node(state: MindmapState) -> MindmapState:
         
         parte_atual = state["divisoes"][parte_index]
         
+        # Retry conversacional: mapa rejeitado + críticas do revisor
+        mapa_anterior = None
+        feedback = None
+        
+        if is_retry:
+            anterior = state["partes_processadas"][-1]
+            mapa_anterior = anterior.get("mapa_gerado")
+            feedback = montar_feedback_retry(
+                anterior.get("problemas", []),
+                anterior.get("sugestoes_melhoria", []),
+                anterior.get("nota_geral"),
+                anterior.get("tentativas", 1),
+                state["max_tentativas"]
+            )
+        
         logger.info(f"🎯 Processando: Parte {parte_index + 1} - {parte_atual['titulo']}")
         
         # ============================================
@@ -72,9 +115,8 @@ async def gerar_mindmap_node(state: MindmapState) -> MindmapState:
         # ============================================
         
         llm = get_llm(
-            provider=state["llm02_provider"],
-            temperature=0.4,
-            max_tokens=12000
+            **parametros_llm(state, "gerador", temperatura=0.4),
+            papel="mapas_gerador"
         )
         
         logger.debug(f"LLM configurado: {state['llm02_provider']}")
@@ -96,10 +138,18 @@ async def gerar_mindmap_node(state: MindmapState) -> MindmapState:
         
         logger.info("📞 Chamando LLM02...")
         
-        response = await llm.ainvoke([
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ])
+        mensagens = montar_conversa(
+            SYSTEM_PROMPT, user_prompt,
+            saida_anterior=mapa_anterior,
+            feedback=feedback
+        )
+        
+        politica = PoliticaRetry(max_tentativas=settings.llm_max_tentativas_chamada)
+        
+        response = await politica.executar(
+            lambda: llm.ainvoke(mensagens),
+            descricao="LLM02 (gerador)"
+        )
         
         mapa_gerado = response.content
         
@@ -107,9 +157,8 @@ async def gerar_mindmap_node(state: MindmapState) -> MindmapState:
         # LIMPA CÓDIGO MERMAID
         # ============================================
         
-        mapa_gerado = re.sub(r'^```mermaid\s*', '', mapa_gerado, flags=re.MULTILINE)
-        mapa_gerado = re.sub(r'\s*```$', '', mapa_gerado, flags=re.MULTILINE)
-        mapa_gerado = mapa_gerado.strip()
+        # Cercas e erros mecânicos de sintaxe corrigidos localmente
+        mapa_gerado = corrigir_mindmap(mapa_gerado, f"Parte {parte_index + 1}")
         
         logger.success(f"✅ Mapa gerado ({len(mapa_gerado)} chars)")
         
@@ -4,10 +4,14 @@ Node responsável por extrair informações dos arquivos HTML.
 VERSÃO FINAL - TODOS OS IMPORTS ABSOLUTOS
 """
 
-from bs4 import BeautifulSoup
 from ..state import MindmapState
 from backend.utils.logger import logger
 from backend.core.config import get_settings
+from backend.services.html_extractor import (
+    ExtracaoHTML,
+    extrair_guia_async,
+    normalizar_fundamentacao
+)
 import re
 from pathlib import Path
 from datetime import datetime
@@ -15,6 +19,88 @@ from datetime import datetime
 settings = get_settings()
 
 
+def interpretar_guia(extracao: ExtracaoHTML) -> dict:
+    """
+    Valida a extração de um guia e separa ramo, tópico e fundamentação.
+    
+    Usado tanto no parse a partir do disco quanto no handoff em memória
+    vindo do pipeline de guias.
+    
+    Raises:
+        ValueError: Title fora do padrão ou fundamentação ausente/curta
+    """
+    # ============================================
+    # EXTRAI O TITLE
+    # ============================================
+    
+    if extracao.titulo is None:
+        raise ValueError("Tag <title> não encontrada no HTML")
+    
+    title = extracao.titulo
+    logger.debug(f"Title encontrado: {title}")
+    
+    # ============================================
+    # PARSE DO TITLE
+    # ============================================
+    
+    pattern = r'^\[(.+?)\]\s*-\s*\[(.+?)\]\s*-'
+    match = re.match(pattern, title)
+    
+    if not match:
+        pattern_alt = r'^(.+?)\s*-\s*(.+?)\s*-'
+        match = re.match(pattern_alt, title)
+    
+        if not match:
+            raise ValueError(
+                f"Title não segue o padrão esperado.\n"
+                f"Esperado: [RAMO DO DIREITO] - [TÓPICO] - Guia Completo para Concursos\n"
+                f"Recebido: {title}"
+            )
+    
+    ramo_direito = match.group(1).strip()
+    topico = match.group(2).strip()
+    
+    logger.info(f"✅ Ramo: {ramo_direito}")
+    logger.info(f"✅ Tópico: {topico}")
+    
+    # ============================================
+    # EXTRAI FUNDAMENTAÇÃO TEÓRICA
+    # ============================================
+    
+    if extracao.fundamentacao is None:
+        raise ValueError(
+            "Section com id='fundamentacao' não encontrada no HTML.\n"
+            "Certifique-se de que existe: <section id=\"fundamentacao\">...</section>"
+        )
+    
+    fundamentacao = normalizar_fundamentacao(extracao.fundamentacao)
+    
+    logger.info(f"✅ Fundamentação: {len(fundamentacao)} caracteres ({extracao.metodo})")
+    logger.debug(f"Primeiros 200 chars: {fundamentacao[:200]}...")
+    
+    # ============================================
+    # VALIDAÇÕES
+    # ============================================
+    
+    if len(fundamentacao) < 100:
+        raise ValueError(
+            f"Fundamentação muito curta ({len(fundamentacao)} chars). "
+            "Conteúdo insuficiente para gerar mapas mentais."
+        )
+    
+    if len(fundamentacao) > 100000:
+        logger.warning(
+            f"⚠️ Fundamentação muito longa ({len(fundamentacao)} chars). "
+            "A divisão será feita em blocos (map-reduce)."
+        )
+    
+    return {
+        "ramo_direito": ramo_direito,
+        "topico": topico,
+        "fundamentacao": fundamentacao
+    }
+
+
 async def parse_html_node(state: MindmapState) -> MindmapState:
     """
     Extrai informações do arquivo HTML.
@@ -23,6 +109,13 @@ async def parse_html_node(state: MindmapState) -> MindmapState:
     1. Ramo do Direito (do title)
     2. Tópico (do title)
     3. Fundamentação Teórica (da section#fundamentacao)
+    
+    A extração roda numa thread (lxml em streaming, com fallback para
+    BeautifulSoup), sem bloquear o event loop, e é cacheada por
+    (caminho, mtime, tamanho).
+    
+    Estados semeados por handoff (ver mapas/handoff.py) já chegam com
+    a fundamentação e não passam por este node.
     """
     
     logger.info(f"📄 Iniciando parsing: {state['html_filename']}")
@@ -40,82 +133,13 @@ async def parse_html_node(state: MindmapState) -> MindmapState:
         if not filepath.exists():
             raise FileNotFoundError(f"Arquivo não encontrado: {filepath}")
         
-        # Lê o conteúdo do arquivo
-        with open(filepath, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        # Parse com BeautifulSoup
-        soup = BeautifulSoup(html_content, 'lxml')
+        # Extrai apenas <title> e section#fundamentacao, fora do event loop
+        extracao = await extrair_guia_async(filepath)
         
-        # ============================================
-        # EXTRAI O TITLE
-        # ============================================
-        
-        title_tag = soup.find('title')
-        if not title_tag:
-            raise ValueError("Tag <title> não encontrada no HTML")
-        
-        title = title_tag.get_text(strip=True)
-        logger.debug(f"Title encontrado: {title}")
-        
-        # ============================================
-        # PARSE DO TITLE
-        # ============================================
-        
-        pattern = r'^\[(.+?)\]\s*-\s*\[(.+?)\]\s*-'
-        match = re.match(pattern, title)
-        
-        if not match:
-            pattern_alt = r'^(.+?)\s*-\s*(.+?)\s*-'
-            match = re.match(pattern_alt, title)
-            
-            if not match:
-                raise ValueError(
-                    f"Title não segue o padrão esperado.\n"
-                    f"Esperado: [RAMO DO DIREITO] - [TÓPICO] - Guia Completo para Concursos\n"
-                    f"Recebido: {title}"
-                )
-        
-        ramo_direito = match.group(1).strip()
-        topico = match.group(2).strip()
-        
-        logger.info(f"✅ Ramo: {ramo_direito}")
-        logger.info(f"✅ Tópico: {topico}")
-        
-        # ============================================
-        # EXTRAI FUNDAMENTAÇÃO TEÓRICA
-        # ============================================
-        
-        fundamentacao_section = soup.find('section', id='fundamentacao')
-        
-        if not fundamentacao_section:
-            raise ValueError(
-                "Section com id='fundamentacao' não encontrada no HTML.\n"
-                "Certifique-se de que existe: <section id=\"fundamentacao\">...</section>"
-            )
-        
-        fundamentacao = fundamentacao_section.get_text(separator='\n', strip=True)
-        fundamentacao = re.sub(r'\n{3,}', '\n\n', fundamentacao)
-        fundamentacao = re.sub(r' {2,}', ' ', fundamentacao)
-        
-        logger.info(f"✅ Fundamentação: {len(fundamentacao)} caracteres")
-        logger.debug(f"Primeiros 200 chars: {fundamentacao[:200]}...")
-        
-        # ============================================
-        # VALIDAÇÕES
-        # ============================================
-        
-        if len(fundamentacao) < 100:
-            raise ValueError(
-                f"Fundamentação muito curta ({len(fundamentacao)} chars). "
-                "Conteúdo insuficiente para gerar mapas mentais."
-            )
-        
-        if len(fundamentacao) > 100000:
-            logger.warning(
-                f"⚠️ Fundamentação muito longa ({len(fundamentacao)} chars). "
-                "Pode haver problemas com limites de contexto dos LLMs."
-            )
+        dados = interpretar_guia(extracao)
+        ramo_direito = dados["ramo_direito"]
+        topico = dados["topico"]
+        fundamentacao = dados["fundamentacao"]
         
         # ============================================
         # ATUALIZA ESTADO
@@ -4,14 +4,27 @@ Node do LLM03 - Revisor de Mapas Mentais.
 VERSÃO FINAL - TODOS OS IMPORTS ABSOLUTOS
 """
 
-from ..state import MindmapState
+from ..state import MindmapState, parametros_llm
 from backend.services.llm_factory import get_llm
-from backend.agents.mapas.prompts.revisor_prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
+from backend.agents.mapas.prompts.revisor_prompts import (
+    SYSTEM_PROMPT,
+    USER_PROMPT_TEMPLATE,
+    DELTA_SYSTEM_PROMPT,
+    DELTA_USER_PROMPT_TEMPLATE
+)
 from backend.utils.logger import logger
+from backend.services.retry_policy import PoliticaRetry
+from backend.services.revisao_cascata import criar_revisor
+from backend.services.content_linter import lintar, mesclar_achados, e_achado_lint
+from backend.services.revisao_delta import formatar_problemas, aplicar_delta
+from backend.core.config import get_settings
 from datetime import datetime
+import asyncio
 from pydantic import BaseModel, Field
 from typing import List, Literal
 
+settings = get_settings()
+
 
 # ============================================
 # MODELS PARA STRUCTURED OUTPUT
@@ -34,6 +47,45 @@ class AvaliacaoMapa(BaseModel):
     justificativa: str
 
 
+class RevisaoDeltaMapa(BaseModel):
+    """Re-revisão: só confere correções e regressões (schema enxuto)."""
+    problemas_corrigidos: List[int] = Field(description="Números dos problemas anteriores que foram corrigidos")
+    regressoes: List[Problema] = Field(default_factory=list, description="Problemas graves novos")
+    aprovado: bool
+    nota_geral: float = Field(ge=0, le=10)
+    comentario: str
+
+
+# ============================================
+# REVISÃO DELTA (RETRIES)
+# ============================================
+
+def montar_prompt_delta(
+    state: MindmapState,
+    parte_titulo: str,
+    conteudo_original: str,
+    mapa_gerado: str,
+    problemas_anteriores: List[dict],
+    tentativa: int,
+    max_tentativas: int
+) -> list:
+    """Mensagens da re-revisão delta de um mapa."""
+    user_prompt = DELTA_USER_PROMPT_TEMPLATE.format(
+        parte_titulo=parte_titulo,
+        topico=state["topico"],
+        tentativa=tentativa,
+        max_tentativas=max_tentativas,
+        problemas_anteriores=formatar_problemas(problemas_anteriores),
+        conteudo_original=conteudo_original,
+        mapa_gerado=mapa_gerado
+    )
+    
+    return [
+        {"role": "system", "content": DELTA_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
 # ============================================
 # NODE FUNCTION
 # ============================================
@@ -72,9 +124,8 @@ async def revisar_mindmap_node(state: MindmapState) -> MindmapState:
         # ============================================
         
         llm = get_llm(
-            provider=state["llm03_provider"],
-            temperature=0.2,
-            max_tokens=12000
+            **parametros_llm(state, "revisor", temperatura=0.2),
+            papel="mapas_revisor"
         )
         
         logger.debug(f"LLM configurado: {state['llm03_provider']}")
@@ -86,6 +137,14 @@ async def revisar_mindmap_node(state: MindmapState) -> MindmapState:
         divisao_original = state["divisoes"][parte_num - 1]
         conteudo_original = divisao_original.get("conteudo", "")
         
+        # Retry de parte rejeitada: re-revisão delta (só correções/regressões)
+        # (achados do linter ficam de fora: o lint é refeito)
+        problemas_anteriores = [
+            p for p in parte_atual.get("problemas") or []
+            if not e_achado_lint(p)
+        ] if parte_atual.get("aprovado") is False else []
+        modo_delta = settings.revisao_delta_em_retries and bool(problemas_anteriores)
+        
         user_prompt = USER_PROMPT_TEMPLATE.format(
             ramo_direito=state["ramo_direito"],
             topico=state["topico"],
@@ -100,14 +159,44 @@ async def revisar_mindmap_node(state: MindmapState) -> MindmapState:
         # CHAMA LLM COM STRUCTURED OUTPUT
         # ============================================
         
-        logger.info("📞 Chamando LLM03...")
+        logger.info(f"📞 Chamando LLM03{' (delta)' if modo_delta else ''}...")
+        
+        politica = PoliticaRetry(max_tentativas=settings.llm_max_tentativas_chamada)
         
-        structured_llm = llm.with_structured_output(AvaliacaoMapa)
+        if modo_delta:
+            structured_llm = criar_revisor(
+                llm, RevisaoDeltaMapa, lambda a: a.nota_geral,
+                "mapas_revisor_delta", state.get("llm_revisor_rapido")
+            )
+            mensagens = montar_prompt_delta(
+                state, parte_atual["parte_titulo"], conteudo_original,
+                parte_atual["mapa_gerado"], problemas_anteriores, tentativa, max_tentativas
+            )
+        else:
+            structured_llm = criar_revisor(
+                llm, AvaliacaoMapa, lambda a: a.nota_geral,
+                "mapas_revisor", state.get("llm_revisor_rapido")
+            )
+            mensagens = [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ]
+        
+        # Linter local em paralelo com o LLM03 (verificações mecânicas)
+        lint_mapa = asyncio.create_task(lintar("mapa", parte_atual["mapa_gerado"]))
+        
+        avaliacao = await politica.executar(
+            lambda: structured_llm.ainvoke(mensagens),
+            descricao="LLM03 (revisor)"
+        )
+        
+        if modo_delta:
+            avaliacao = aplicar_delta(
+                avaliacao, problemas_anteriores, AvaliacaoMapa,
+                campo_nota="nota_geral", campo_texto="justificativa"
+            )
         
-        avaliacao = await structured_llm.ainvoke([
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt}
-        ])
+        avaliacao = mesclar_achados(avaliacao, await lint_mapa)
         
         logger.success(f"✅ LLM03 respondeu: {'APROVADO' if avaliacao.aprovado else 'REJEITADO'}")
         
@@ -4,9 +4,10 @@ Node responsável por salvar arquivos .mmd gerados.
 VERSÃO FINAL - TODOS OS IMPORTS ABSOLUTOS
 """
 
-from ..state import MindmapState
+from ..state import MindmapState, liberar_conteudo_estado
 from backend.utils.logger import logger
 from backend.core.config import get_settings
+from backend.services.file_manager import referencia_artefato
 from pathlib import Path
 from datetime import datetime
 import json
@@ -62,7 +63,11 @@ async def salvar_mindmap_node(state: MindmapState) -> MindmapState:
         # Salva cada parte processada
         for parte in state["partes_processadas"]:
             # Nome do arquivo: base_parte01.mmd, base_parte02.mmd, etc
-            filename = f"{html_base}_parte{parte['parte_numero']:02d}.mmd"
+            # Partes com vários mapas: base_parte01_01.mmd, base_parte01_02.mmd
+            filename = f"{html_base}_parte{parte['parte_numero']:02d}"
+            if parte.get("total_mapas", 1) > 1:
+                filename += f"_{parte['mapa_numero']:02d}"
+            filename += ".mmd"
             
             filepath = save_mmd_file(
                 filename=filename,
@@ -72,6 +77,8 @@ async def salvar_mindmap_node(state: MindmapState) -> MindmapState:
                     "topico": state["topico"],
                     "parte_titulo": parte["parte_titulo"],
                     "parte_numero": parte["parte_numero"],
+                    "mapa_numero": parte.get("mapa_numero", 1),
+                    "total_mapas": parte.get("total_mapas", 1),
                     "aprovado": parte["aprovado"],
                     "nota_geral": parte.get("nota_geral"),
                     "tentativas": parte["tentativas"],
@@ -79,9 +86,16 @@ async def salvar_mindmap_node(state: MindmapState) -> MindmapState:
                 }
             )
             
+            referencia = referencia_artefato(filepath, parte["mapa_gerado"])
+            parte["arquivo"] = referencia["caminho"]
+            parte["sha256"] = referencia["sha256"]
+            
             arquivos_salvos.append(filepath)
             logger.success(f"💾 Salvo: {filename}")
         
+        # Mapas já estão em disco: mantém só as referências no estado
+        liberar_conteudo_estado(state)
+        
         state["status"] = "concluido"
         state["logs"].append({
             "timestamp": datetime.now().isoformat(),
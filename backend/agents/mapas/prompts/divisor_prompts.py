@@ -54,4 +54,15 @@ INSTRUÇÕES:
 4. Retorne no formato JSON estruturado conforme especificado
 
 Faça uma análise cuidadosa e retorne a divisão proposta em formato estruturado.
+"""
+
+# Acrescentado ao USER_PROMPT_TEMPLATE quando a fundamentação é longa e
+# dividida em blocos (map-reduce): cada bloco é dividido separadamente.
+BLOCO_PROMPT_TEMPLATE = """
+---
+
+⚠️ ATENÇÃO: o texto acima é o BLOCO {bloco} de {total_blocos} de uma fundamentação longa.
+- Divida APENAS este bloco, cobrindo todo o seu texto
+- Use entre 1 e {max_partes} partes para este bloco
+- Não invente transições nem resuma o que estaria em outros blocos
 """
\ No newline at end of file
@@ -0,0 +1,45 @@
+# backend/agents/prompts/fusao_prompts.py
+"""
+Prompts da chamada única divisão + geração (fundamentações curtas).
+
+Reaproveita as regras do divisor (LLM01) e do gerador (LLM02): o modelo
+divide o texto e já devolve o mapa Mermaid de cada parte.
+"""
+
+from .divisor_prompts import SYSTEM_PROMPT as DIVISOR_SYSTEM
+from .gerador_prompts import SYSTEM_PROMPT as GERADOR_SYSTEM
+
+SYSTEM_PROMPT = DIVISOR_SYSTEM + """
+
+---
+
+ALÉM DE DIVIDIR, GERE O MAPA MENTAL DE CADA PARTE.
+
+Para cada parte, preencha também o campo "mapa_mermaid" com o código
+Mermaid do mapa mental daquela parte, seguindo TODAS as regras abaixo:
+
+""" + GERADOR_SYSTEM + """
+
+⚠️ No campo "mapa_mermaid", retorne APENAS o código (começando por "mindmap"),
+sem cercas ```mermaid e sem explicações.
+"""
+
+USER_PROMPT_TEMPLATE = """Analise o seguinte conteúdo, divida-o em partes lógicas e gere o mapa mental de cada parte:
+
+**RAMO DO DIREITO:** {ramo_direito}
+**TÓPICO:** {topico}
+
+**FUNDAMENTAÇÃO TEÓRICA (TEXTO COMPLETO A DIVIDIR):**
+{fundamentacao}
+
+---
+
+INSTRUÇÕES:
+1. O texto é curto: use de 1 a {max_partes} partes
+2. Para cada parte, COPIE o texto completo correspondente no campo "conteudo_completo"
+3. Crie títulos específicos e descritivos para cada parte
+4. Gere o mapa mental Mermaid de cada parte no campo "mapa_mermaid"
+   - Título do mapa: {{{{**{topico} - Título da Parte**}}}}
+   - NUNCA utilizar parênteses "()" e colchetes "[]" no texto dos ramos
+5. Retorne no formato JSON estruturado conforme especificado
+"""
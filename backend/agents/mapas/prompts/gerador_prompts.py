@@ -73,4 +73,16 @@ ATENÇÃO:
 
 Gere APENAS o código Mermaid seguindo rigorosamente o formato do exemplo.
 Não adicione explicações, markdown ou texto fora do bloco mermaid.
-"""
\ No newline at end of file
+"""
+FEEDBACK_RETRY_TEMPLATE = """O revisor REJEITOU o mapa acima (tentativa {tentativa} de {max_tentativas}, nota {nota:.1f}/10).
+
+**PROBLEMAS APONTADOS:**
+{problemas}
+
+**SUGESTÕES DO REVISOR:**
+{sugestoes}
+
+Corrija TODOS os problemas apontados, mantendo o que já estava correto.
+Gere novamente o mapa COMPLETO, APENAS o código Mermaid, no mesmo formato.
+Não adicione explicações, markdown ou texto fora do bloco mermaid.
+"""
@@ -1,5 +1,12 @@
 # backend/agents/prompts/revisor_prompts.py
 
+from backend.services.revisao_delta import (
+    DELTA_INSTRUCAO,
+    DELTA_CRITERIO_APROVACAO,
+    DELTA_PROBLEMAS_ANTERIORES,
+    DELTA_PEDIDO
+)
+
 SYSTEM_PROMPT = """Você é um revisor técnico especializado em:
 1. Validação de conteúdo jurídico
 2. Verificação de sintaxe Mermaid
@@ -25,17 +32,11 @@ Ao avaliar "Cobertura do Conteúdo" e "Precisão Técnica", você deve considera
 CRITÉRIOS DE AVALIAÇÃO:
 
 1. **Sintaxe Mermaid (CRÍTICO)**
-   - Formato mindmap correto
-   - Título com {{**texto**}}
-   - Ícones com ::icon(fa fa-nome)
-   - NUNCA utilizar parênteses "()" e colchetes "[]"  no texto dos ramos
-        -ERRADO E PROIBIDO: **Princípios Norteadores (Lei 14.133/21)**
-        -CORRETO: **Princípios Norteadores: Lei 14.133/21**
-        -ERRADO E PROIBIDO: Exceção: atos vinculados (ex: CNH)
-        -CORRETO: **Princípios Norteadores: Exceção: atos vinculados -ex: CNH-
-   - Indentação consistente (múltiplos de 2 espaços)
-   - Sem caracteres especiais problemáticos
-   - Máximo 4 níveis de profundidade
+   ℹ️ Cabeçalho mindmap, título {{**texto**}}, parênteses/colchetes nos
+   ramos, indentação e profundidade são verificados AUTOMATICAMENTE por
+   um linter: NÃO os avalie. Aponte apenas o que ele não vê:
+   - Ícones com ::icon(fa fa-nome) malformados
+   - Caracteres especiais que quebrem o Mermaid
    ⚠️ Se houver erro de sintaxe → REJEITAR (gravidade: critica)
 
 2. **Alucinações (CRÍTICO)**
@@ -142,12 +143,107 @@ INSTRUÇÕES DE AVALIAÇÃO:
 5. Verifique se os conceitos DESTE TRECHO estão corretos
 6. NÃO penalize por não cobrir aspectos de outras partes do tópico
 
-ATENÇÃO:
-   - NUNCA SE PODE utilizar parênteses "()" e colchetes "[]"  no texto dos ramos
-        -ERRADO E PROIBIDO: **Princípios Norteadores (Lei 14.133/21)**
-        -CORRETO: **Princípios Norteadores: Lei 14.133/21**
-        -ERRADO E PROIBIDO: Exceção: atos vinculados (ex: CNH)
-        -CORRETO: **Princípios Norteadores: Exceção: atos vinculados -ex: CNH-
+Forneça sua avaliação em formato JSON estruturado.
+"""
+
+# ============================================
+# REVISÃO EM LOTE (VÁRIOS MAPAS NUMA CHAMADA)
+# ============================================
+
+LOTE_SYSTEM_COMPLEMENTO = """
+
+---
+
+⚠️ MODO LOTE: você receberá VÁRIOS mapas mentais do mesmo tópico, cada um
+com o TRECHO ORIGINAL da sua parte e identificado por PARTE e MAPA.
+
+- Avalie CADA mapa de forma independente, com os critérios acima,
+  comparando-o APENAS com o seu próprio trecho original
+- Não deixe a qualidade de um mapa influenciar a nota de outro
+- Retorne um objeto JSON com a lista "avaliacoes", com UMA avaliação por
+  mapa recebido, cada uma contendo também "parte_numero" e "mapa_numero"
+  exatamente como informados
+"""
+
+LOTE_USER_PROMPT_TEMPLATE = """Revise os {total} mapas mentais abaixo:
+
+**CONTEXTO GERAL:**
+- Ramo do Direito: {ramo_direito}
+- Tópico Geral: {topico}
+
+**TENTATIVA:** {tentativa} de {max_tentativas}
+
+{itens}
+
+---
+
+INSTRUÇÕES DE AVALIAÇÃO:
+
+1. Compare cada mapa com o CONTEÚDO ORIGINAL DA SUA PARTE (não com todo o tópico)
+2. Verifique se a sintaxe Mermaid está correta
+3. Confirme que não há informações inventadas (alucinações)
+4. Retorne exatamente {total} avaliação(ões), uma por mapa, com parte_numero e mapa_numero
 
 Forneça sua avaliação em formato JSON estruturado.
-"""
\ No newline at end of file
+"""
+
+LOTE_ITEM_TEMPLATE = """==================================================
+**PARTE {parte_numero} · MAPA {mapa_numero}: {parte_titulo}**
+
+**CONTEÚDO ORIGINAL DESTA PARTE:**
+```
+{conteudo_original}
+```
+
+**MAPA MENTAL GERADO PARA ESTA PARTE:**
+```mermaid
+{mapa_gerado}
+```
+"""
+
+
+# ============================================
+# REVISÃO DELTA (RETRIES)
+# ============================================
+# Na re-revisão de um mapa rejeitado não se reaplica a rubrica inteira:
+# o revisor só confere se os problemas apontados foram corrigidos e se
+# o novo mapa introduziu algum problema grave.
+
+DELTA_SYSTEM_PROMPT = """Você é um revisor de mapas mentais Mermaid fazendo uma RE-REVISÃO.
+
+O mapa já foi avaliado e rejeitado. """ + DELTA_INSTRUCAO + """
+1. Quais dos problemas listados foram corrigidos no novo mapa
+2. Se o novo mapa introduziu algum problema NOVO de gravidade alta ou crítica
+   (alucinação em relação ao trecho original, erro conceitual, conteúdo
+   removido) — as "regressões". A sintaxe Mermaid é verificada por um linter.
+
+""" + DELTA_CRITERIO_APROVACAO + """
+
+Retorne um objeto JSON estruturado:
+{
+  "problemas_corrigidos": [1, 3],
+  "regressoes": [
+    {"categoria": "sintaxe|alucinacao|cobertura|precisao|portugues", "gravidade": "alta", "descricao": "...", "localizacao": "..."}
+  ],
+  "aprovado": true,
+  "nota_geral": 8.0,
+  "comentario": "uma frase"
+}
+"""
+
+DELTA_USER_PROMPT_TEMPLATE = """Re-revisão do mapa "{parte_titulo}" ({topico}) — tentativa {tentativa} de {max_tentativas}.
+
+""" + DELTA_PROBLEMAS_ANTERIORES + """
+
+**TRECHO ORIGINAL (para checar alucinações):**
+```
+{conteudo_original}
+```
+
+**NOVO MAPA:**
+```mermaid
+{mapa_gerado}
+```
+
+""" + DELTA_PEDIDO + """ e forneça a resposta em JSON estruturado.
+"""
@@ -0,0 +1,336 @@
+# backend/agents/mapas/revisao_lote.py
+"""
+Revisão em lote dos mapas de um arquivo (LLM03).
+
+No modo padrão cada mapa tem a sua chamada ao revisor, e cada uma reenvia
+o contexto (ramo/tópico) e o REVISOR_SYSTEM inteiro. No modo lote
+(`mapas_revisao_em_lote`), o processamento é feito em rodadas:
+
+1. Gera (LLM02) os mapas pendentes, em paralelo
+2. Envia os pares (mapa, trecho original) numa única chamada estruturada
+   por lote de até `mapas_revisao_lote_max_partes` mapas
+3. Aprovados saem; só os rejeitados são regenerados (continuando a
+   conversa com o mapa rejeitado e as críticas) e revisados de novo na
+   rodada seguinte. Com `revisao_delta_em_retries`, a partir da 2ª
+   rodada cada rejeitado passa pela re-revisão delta (só os problemas
+   anteriores e regressões, ver services/revisao_delta.py), como no
+   modo padrão, em vez de voltar ao lote com a rubrica inteira
+
+Mapas que o revisor em lote não devolver (ou lotes cuja chamada falhar)
+são revisados individualmente, como no modo padrão.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+
+from pydantic import BaseModel, Field
+
+from .state import MindmapState, parametros_llm
+from .graph_parallel import (
+    AvaliacaoMapa,
+    identificar_parte,
+    rotulo_parte,
+    criar_llms_partes,
+    gerar_mapa_parte,
+    feedback_avaliacao,
+    revisar_mapa_parte,
+    revisar_delta_parte,
+    registrar_avaliacao,
+    resultado_aprovado,
+    resultado_erro
+)
+from .prompts.revisor_prompts import SYSTEM_PROMPT as REVISOR_SYSTEM
+from .prompts.revisor_prompts import (
+    LOTE_SYSTEM_COMPLEMENTO,
+    LOTE_USER_PROMPT_TEMPLATE,
+    LOTE_ITEM_TEMPLATE
+)
+from backend.core.config import get_settings
+from backend.services.llm_factory import get_llm
+from backend.services.retry_policy import PoliticaRetry
+from backend.services.especulacao import chave_historico, registrar_revisao
+from backend.services.worker_pool import executar_em_pool
+from backend.services.content_linter import lintar_varios, mesclar_achados, e_achado_lint
+from backend.utils.logger import logger
+
+settings = get_settings()
+
+
+# ============================================
+# MODELS PARA STRUCTURED OUTPUT (Revisor em lote)
+# ============================================
+
+class AvaliacaoParte(AvaliacaoMapa):
+    """Avaliação de um mapa dentro do lote, identificada pela parte."""
+    parte_numero: int = Field(description="Número da parte avaliada")
+    mapa_numero: int = Field(default=1, description="Número do mapa dentro da parte")
+
+
+class AvaliacaoLote(BaseModel):
+    """Resposta estruturada do LLM03 no modo lote."""
+    avaliacoes: List[AvaliacaoParte] = Field(description="Uma avaliação por mapa recebido")
+
+
+Chave = Tuple[int, int]
+
+
+def _chave(parte_info: dict) -> Chave:
+    return (parte_info.get("parte_numero", 1), parte_info.get("mapa_numero", 1))
+
+
+# ============================================
+# CHAMADA EM LOTE
+# ============================================
+
+async def revisar_lote(
+    revisor_lote,
+    state: MindmapState,
+    itens: List[Tuple[dict, str]],
+    tentativa: int,
+    max_tentativas: int
+) -> Dict[Chave, AvaliacaoMapa]:
+    """
+    Revisa vários mapas numa única chamada.
+
+    Args:
+        revisor_lote: LLM03 com structured output `AvaliacaoLote`
+        itens: Pares (unidade, mapa gerado)
+
+    Returns:
+        Avaliações por (parte_numero, mapa_numero). Mapas que o revisor
+        não devolveu ficam de fora.
+    """
+    blocos = "\n".join(
+        LOTE_ITEM_TEMPLATE.format(
+            parte_numero=parte_info.get("parte_numero", 1),
+            mapa_numero=parte_info.get("mapa_numero", 1),
+            parte_titulo=parte_info["titulo"],
+            conteudo_original=parte_info.get("conteudo", ""),
+            mapa_gerado=mapa
+        )
+        for parte_info, mapa in itens
+    )
+
+    prompt = LOTE_USER_PROMPT_TEMPLATE.format(
+        total=len(itens),
+        ramo_direito=state["ramo_direito"],
+        topico=state["topico"],
+        tentativa=tentativa,
+        max_tentativas=max_tentativas,
+        itens=blocos
+    )
+
+    politica = PoliticaRetry(max_tentativas=settings.llm_max_tentativas_chamada)
+
+    resposta = await politica.executar(
+        lambda: revisor_lote.ainvoke([
+            {"role": "system", "content": REVISOR_SYSTEM + LOTE_SYSTEM_COMPLEMENTO},
+            {"role": "user", "content": prompt}
+        ]),
+        descricao=f"LLM03 (revisor em lote, {len(itens)} mapas)"
+    )
+
+    esperadas = {_chave(parte_info) for parte_info, _mapa in itens}
+
+    return {
+        (av.parte_numero, av.mapa_numero): AvaliacaoMapa(
+            **av.model_dump(exclude={"parte_numero", "mapa_numero"})
+        )
+        for av in resposta.avaliacoes
+        if (av.parte_numero, av.mapa_numero) in esperadas
+    }
+
+
+# ============================================
+# PROCESSAMENTO EM RODADAS
+# ============================================
+
+async def processar_unidades_revisao_lote(
+    state: MindmapState,
+    unidades: List[dict],
+    max_workers: int = 3,
+    max_tentativas: int = 3,
+    on_parte_concluida: Optional[Callable] = None
+) -> List[dict]:
+    """
+    Gera e revisa as unidades de um arquivo com revisão em lote.
+
+    Args:
+        state: Estado do arquivo
+        unidades: Unidades de `expandir_divisoes` a processar
+        max_workers: Gerações (e lotes de revisão) simultâneos
+        max_tentativas: Máximo de rodadas geração → revisão por mapa
+        on_parte_concluida: Callback (indice, unidade, resultado)
+
+    Returns:
+        Resultados na ordem de `unidades`
+    """
+    llm_gerador, structured_revisor, revisor_delta = criar_llms_partes(state)
+
+    revisor_lote = get_llm(
+        **parametros_llm(state, "revisor", temperatura=0.2),
+        papel="mapas_revisor_lote"
+    ).with_structured_output(AvaliacaoLote)
+
+    politica = PoliticaRetry(max_tentativas=settings.llm_max_tentativas_chamada)
+    tamanho_lote = max(1, settings.mapas_revisao_lote_max_partes)
+
+    resultados: List[Optional[dict]] = [None] * len(unidades)
+    ativos = list(range(len(unidades)))
+    
+    # Mapa rejeitado + feedback por unidade (retry conversacional)
+    anteriores: Dict[int, Tuple[str, str]] = {}
+    
+    # Problemas da revisão anterior por unidade (re-revisão delta)
+    problemas: Dict[int, List[dict]] = {}
+
+    async def concluir(i: int, resultado: dict) -> None:
+        resultados[i] = resultado
+        if on_parte_concluida:
+            retorno = on_parte_concluida(i, unidades[i], resultado)
+            if asyncio.iscoroutine(retorno):
+                await retorno
+
+    for tentativa in range(1, max_tentativas + 1):
+        logger.info(
+            f"🔁 Rodada {tentativa}/{max_tentativas}: "
+            f"{len(ativos)} mapa(s) para gerar e revisar em lote"
+        )
+
+        # ============================================
+        # GERAÇÃO (LLM02, PARALELO)
+        # ============================================
+
+        async def gerar(i: int) -> str:
+            parte_info = unidades[i]
+            if tentativa == 1 and parte_info.get("mapa_inicial"):
+                return parte_info["mapa_inicial"]
+            mapa_anterior, feedback = anteriores.get(i, (None, None))
+            return await politica.executar(
+                lambda: gerar_mapa_parte(llm_gerador, state, parte_info, mapa_anterior, feedback),
+                descricao=f"LLM02 ({rotulo_parte(identificar_parte(parte_info, i))})"
+            )
+
+        gerados = await executar_em_pool(ativos, gerar, max_workers=max_workers, nome="lote-geracao")
+
+        mapas: Dict[int, str] = {}
+        for i, mapa in zip(ativos, gerados):
+            if isinstance(mapa, Exception):
+                await concluir(i, resultado_erro(identificar_parte(unidades[i], i), tentativa, mapa))
+            else:
+                mapas[i] = mapa
+
+        # ============================================
+        # REVISÃO (LLM03, EM LOTE)
+        # ============================================
+
+        indices = list(mapas)
+        
+        # Rejeitados de rodadas anteriores: re-revisão delta individual
+        em_delta = [
+            i for i in indices
+            if settings.revisao_delta_em_retries and problemas.get(i)
+        ]
+        no_lote = [i for i in indices if i not in em_delta]
+        lotes = [no_lote[k:k + tamanho_lote] for k in range(0, len(no_lote), tamanho_lote)]
+
+        async def revisar(lote: List[int]) -> Dict[Chave, AvaliacaoMapa]:
+            return await revisar_lote(
+                revisor_lote, state,
+                [(unidades[i], mapas[i]) for i in lote],
+                tentativa, max_tentativas
+            )
+
+        async def revisar_delta(i: int) -> AvaliacaoMapa:
+            return await politica.executar(
+                lambda: revisar_delta_parte(
+                    revisor_delta, state, unidades[i], mapas[i],
+                    problemas[i], tentativa, max_tentativas
+                ),
+                descricao="LLM03 (re-revisão delta)"
+            )
+
+        # Linter local em paralelo com a revisão em lote
+        lint_lote = asyncio.create_task(lintar_varios("mapa", [mapas[i] for i in no_lote]))
+
+        try:
+            respostas, deltas = await asyncio.gather(
+                executar_em_pool(lotes, revisar, max_workers=max_workers, nome="lote-revisao"),
+                executar_em_pool(em_delta, revisar_delta, max_workers=max_workers, nome="lote-revisao-delta")
+            )
+            achados = dict(zip(no_lote, await lint_lote))
+        finally:
+            # Revisão falhou (ou foi cancelada): o lint não fica solto
+            lint_lote.cancel()
+
+        avaliacoes: Dict[int, AvaliacaoMapa] = {}
+        for i, avaliacao in zip(em_delta, deltas):
+            if isinstance(avaliacao, Exception):
+                await concluir(i, resultado_erro(identificar_parte(unidades[i], i), tentativa, avaliacao))
+            else:
+                avaliacoes[i] = avaliacao
+
+        for lote, resposta in zip(lotes, respostas):
+            if isinstance(resposta, Exception):
+                logger.warning(f"⚠️ Revisão em lote falhou ({len(lote)} mapas): {resposta}")
+                continue
+            for i in lote:
+                avaliacao = resposta.get(_chave(unidades[i]))
+                if avaliacao is not None:
+                    avaliacoes[i] = mesclar_achados(avaliacao, achados[i])
+
+        # Fallback: revisão individual do que o lote não cobriu
+        faltantes = [i for i in no_lote if i not in avaliacoes]
+        if faltantes:
+            logger.info(f"🔍 Revisando individualmente {len(faltantes)} mapa(s) fora do lote")
+
+            async def revisar_individual(i: int) -> AvaliacaoMapa:
+                return await politica.executar(
+                    lambda: revisar_mapa_parte(
+                        structured_revisor, state, unidades[i],
+                        mapas[i], tentativa, max_tentativas
+                    ),
+                    descricao="LLM03 (revisor)"
+                )
+
+            individuais = await executar_em_pool(
+                faltantes, revisar_individual, max_workers=max_workers, nome="lote-revisao-individual"
+            )
+            for i, avaliacao in zip(faltantes, individuais):
+                if isinstance(avaliacao, Exception):
+                    await concluir(i, resultado_erro(identificar_parte(unidades[i], i), tentativa, avaliacao))
+                else:
+                    avaliacoes[i] = avaliacao
+
+        # ============================================
+        # DECISÃO: APROVADOS SAEM, REJEITADOS VOLTAM
+        # ============================================
+
+        rejeitados = []
+
+        for i in indices:
+            if i not in avaliacoes:
+                continue
+
+            identificacao = identificar_parte(unidades[i], i)
+            avaliacao = avaliacoes[i]
+            registrar_avaliacao(rotulo_parte(identificacao), avaliacao)
+            
+            if tentativa == 1:
+                registrar_revisao(chave_historico("mapas", state["llm02_provider"]), avaliacao.aprovado)
+
+            if avaliacao.aprovado or tentativa == max_tentativas:
+                await concluir(
+                    i, resultado_aprovado(identificacao, mapas[i], avaliacao, tentativa, max_tentativas)
+                )
+            else:
+                anteriores[i] = (mapas[i], feedback_avaliacao(avaliacao, tentativa, max_tentativas))
+                # Achados do linter não vão para a re-revisão: o lint é refeito
+                problemas[i] = [p.model_dump() for p in avaliacao.problemas if not e_achado_lint(p)]
+                rejeitados.append(i)
+
+        ativos = rejeitados
+        if not ativos:
+            break
+
+    return resultados
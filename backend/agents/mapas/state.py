@@ -1,5 +1,7 @@
 # backend/agents/state.py
-from typing import TypedDict, List, Literal, Optional
+from typing import TypedDict, List, Literal, Optional, Annotated
+from backend.core.config import get_settings
+from backend.utils.logger import criar_buffer_logs, limitar_logs
 
 class MindmapState(TypedDict):
     """
@@ -47,6 +49,8 @@ class MindmapState(TypedDict):
     Cada item é um dict:
     {
         "parte_numero": 1,
+        "mapa_numero": 1,
+        "total_mapas": 1,
         "parte_titulo": "Controle Interno",
         "mapa_gerado": "mindmap...",
         "aprovado": True/False,
@@ -54,8 +58,13 @@ class MindmapState(TypedDict):
         "tentativas": 2,
         "problemas": [...],
         "sugestoes_melhoria": [...],
-        "justificativa_revisao": "..."
+        "justificativa_revisao": "...",
+        "arquivo": "output/mapas/base_parte01.mmd",
+        "sha256": "..."
     }
+    
+    Após o salvamento, `mapa_gerado` é esvaziado: o mapa fica apenas
+    em disco e a parte guarda `arquivo` e `sha256`.
     """
     
     # ============================================
@@ -88,12 +97,25 @@ class MindmapState(TypedDict):
     llm03_provider: str
     """Provider do LLM03 - Revisor (openai|anthropic|gemini|deepseek)"""
     
+    especulativo: bool
+    """Se True, a 1ª tentativa de cada mapa é uma disputa best-of-N"""
+    
+    llm_fallbacks: dict
+    """Cadeias de failover por papel: {"divisor"|"gerador"|"revisor": [{provedor, modelo}]}"""
+    
+    llm_modelos: dict
+    """Parâmetros por papel: {"divisor"|"gerador"|"revisor": {modelo, temperatura, max_tokens, raciocinio}}"""
+    
+    llm_revisor_rapido: Optional[dict]
+    """Revisor rápido da revisão em cascata (None = só o LLM03)"""
+    
     # ============================================
     # LOGS E TELEMETRIA
     # ============================================
-    logs: List[dict]
+    logs: Annotated[List[dict], limitar_logs]
     """
-    Lista de eventos de log.
+    Buffer circular (deque com maxlen, reaplicado pelo reducer
+    `limitar_logs` a cada atualização) de eventos de log.
     Cada item é um dict:
     {
         "timestamp": "2025-09-30T14:30:00",
@@ -102,4 +124,141 @@ class MindmapState(TypedDict):
         "message": "...",
         "data": {...}
     }
-    """
\ No newline at end of file
+    """
+
+# ============================================
+# HELPER FUNCTIONS
+# ============================================
+
+def criar_estado_inicial(
+    html_filename: str,
+    llm01_provider: str,
+    llm02_provider: str,
+    llm03_provider: str,
+    max_tentativas: int = 3,
+    especulativo: Optional[bool] = None,
+    fallbacks: Optional[dict] = None,
+    revisor_rapido: Optional[dict] = None,
+    modelos: Optional[dict] = None
+) -> MindmapState:
+    """
+    Cria o estado inicial de processamento de um arquivo HTML.
+    
+    `especulativo=None` usa o padrão `especulacao_ativa` das settings;
+    papéis sem cadeia em `fallbacks` usam `llm_fallback_padrao`;
+    `revisor_rapido` ativa a revisão em cascata do LLM03;
+    `modelos` traz modelo/temperatura/max_tokens/raciocínio por papel.
+    """
+    if especulativo is None:
+        especulativo = get_settings().especulacao_ativa
+    
+    return {
+        "html_filename": html_filename,
+        "ramo_direito": "",
+        "topico": "",
+        "fundamentacao": "",
+        "divisoes": [],
+        "partes_processadas": [],
+        "tentativas_revisao": 0,
+        "max_tentativas": max_tentativas,
+        "status": "parsing",
+        "erro_msg": None,
+        "llm01_provider": llm01_provider,
+        "llm02_provider": llm02_provider,
+        "llm03_provider": llm03_provider,
+        "especulativo": especulativo,
+        "llm_fallbacks": fallbacks or {},
+        "llm_revisor_rapido": revisor_rapido,
+        "llm_modelos": modelos or {},
+        "logs": criar_buffer_logs()
+    }
+
+
+PROVIDER_POR_PAPEL = {
+    "divisor": "llm01_provider",
+    "gerador": "llm02_provider",
+    "revisor": "llm03_provider"
+}
+
+
+def parametros_llm(
+    state: MindmapState,
+    papel: str,
+    temperatura: float,
+    max_tokens: int = 12000
+) -> dict:
+    """
+    Argumentos do `get_llm` para um papel (divisor, gerador ou revisor).
+    
+    Modelo, temperatura, max_tokens e raciocínio do YAML (`modelos_mapas`)
+    têm precedência sobre os padrões do node.
+    """
+    modelo = state.get("llm_modelos", {}).get(papel, {})
+    
+    return {
+        "provider": state[PROVIDER_POR_PAPEL[papel]],
+        "model": modelo.get("modelo"),
+        "temperature": modelo.get("temperatura", temperatura),
+        "max_tokens": modelo.get("max_tokens", max_tokens),
+        "raciocinio": modelo.get("raciocinio"),
+        "fallbacks": state.get("llm_fallbacks", {}).get(papel)
+    }
+
+
+def liberar_conteudo_estado(state: MindmapState) -> None:
+    """
+    Descarta os textos volumosos do estado após o salvamento.
+    
+    Fundamentação, conteúdo das divisões e código dos mapas já estão
+    em disco (ou não são mais necessários); o estado mantém apenas
+    títulos, referências aos arquivos, hashes e notas.
+    """
+    state["fundamentacao"] = ""
+    
+    for divisao in state.get("divisoes", []):
+        divisao["conteudo"] = ""
+        divisao.pop("mapa_inicial", None)
+    
+    for parte in state.get("partes_processadas", []):
+        if parte.get("arquivo"):
+            parte["mapa_gerado"] = ""
+
+
+def resumir_estado_mapa(state: Optional[dict], html_filename: Optional[str] = None) -> dict:
+    """
+    Gera resumo compacto do processamento de um arquivo.
+    
+    É o que as rotas acumulam e devolvem por arquivo, em vez do
+    estado completo (com fundamentação, divisões e logs). Sem estado
+    (arquivo que nem chegou a ser finalizado), o resumo é de erro.
+    """
+    if state is None:
+        return {
+            "html_file": html_filename,
+            "status": "erro",
+            "erro_msg": "Processamento não retornou estado",
+            "ramo_direito": "",
+            "topico": "",
+            "partes_processadas": []
+        }
+    
+    return {
+        "html_file": state.get("html_filename") or state.get("html_file"),
+        "status": state.get("status"),
+        "erro_msg": state.get("erro_msg"),
+        "ramo_direito": state.get("ramo_direito", ""),
+        "topico": state.get("topico", ""),
+        "partes_processadas": [
+            {
+                "parte_numero": parte.get("parte_numero"),
+                "parte_titulo": parte.get("parte_titulo"),
+                "mapa_numero": parte.get("mapa_numero", 1),
+                "aprovado": parte.get("aprovado"),
+                "nota_geral": parte.get("nota_geral"),
+                "tentativas": parte.get("tentativas"),
+                "arquivo": parte.get("arquivo"),
+                "sha256": parte.get("sha256")
+            }
+            for parte in state.get("partes_processadas", [])
+        ]
+    }
@@ -1,15 +1,35 @@
 from fastapi import APIRouter
-from ..agents.mapas.graph import execute_graph
+from ..agents.mapas.batch import processar_lote_mapas
+from ..agents.mapas.state import resumir_estado_mapa
+from ..services.retry_policy import com_orcamento_job
 
 router = APIRouter()
 
 @router.post("/process")
-async def process_mapas(html_files: list[str]):
-    """Processa apenas mapas."""
-    resultados = []
+@com_orcamento_job
+async def process_mapas(
+    html_files: list[str],
+    llm01_provider: str = "anthropic",
+    llm02_provider: str = "anthropic",
+    llm03_provider: str = "anthropic"
+):
+    """
+    Processa apenas mapas (fila global de partes para todos os arquivos).
     
-    for html_file in html_files:
-        resultado = await execute_graph(html_filename=html_file)
-        resultados.append(resultado)
+    Como no /process-mapas-only, arquivos que terminam "parcial" ou
+    "erro" são retomados até 2 vezes, só com as partes que faltam.
+    """
+    estados = await processar_lote_mapas(
+        html_files=html_files,
+        llm01_provider=llm01_provider,
+        llm02_provider=llm02_provider,
+        llm03_provider=llm03_provider,
+        max_retries=2
+    )
     
-    return {"status": "completed", "resultados": resultados}
\ No newline at end of file
+    resultados = [
+        resumir_estado_mapa(state, html_file)
+        for html_file, state in zip(html_files, estados)
+    ]
+    
+    return {"status": "completed", "resultados": resultados}
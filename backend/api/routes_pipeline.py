@@ -6,14 +6,23 @@ VERSÃO CORRIGIDA - Fix erro de argumentos e tratamento robusto
 
 from fastapi import APIRouter, HTTPException, File, UploadFile
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import asyncio
 
 from ..core.config import get_settings
-from ..services.config_parser import parse_yaml_config
+from ..services.config_parser import (
+    parse_yaml_config,
+    extrair_fallbacks,
+    extrair_modelos,
+    extrair_revisor_rapido
+)
 from ..agents.guias.graph import execute_graph_guias
-from ..agents.mapas.graph import execute_graph  # ✅ Nome correto!
+from ..agents.mapas.graph_parallel import executar_etapas_mapa, salvar_resultado
+from ..agents.mapas.handoff import aplicar_handoff
+from ..agents.mapas.state import criar_estado_inicial, resumir_estado_mapa
+from ..agents.mapas.batch import processar_lote_mapas
 from ..api.websocket import manager
+from ..services.retry_policy import PoliticaRetry, com_orcamento_job
 from ..utils.logger import logger
 
 router = APIRouter()
@@ -24,6 +33,9 @@ def extract_llm_providers(config: dict) -> tuple:
     """
     Extrai providers dos LLMs do config.
     
+    Modelo, temperatura, max_tokens e raciocínio de cada papel vêm de
+    `extrair_modelos(config, "modelos_mapas")`.
+    
     Returns:
         tuple: (llm01_provider, llm02_provider, llm03_provider)
     """
@@ -44,89 +56,113 @@ def extract_llm_providers(config: dict) -> tuple:
         return "anthropic", "anthropic", "anthropic"
 
 
+def extract_llm_fallbacks(config: dict) -> dict:
+    """
+    Extrai as cadeias de failover dos LLMs de mapas do config.
+    
+    Returns:
+        dict: {"divisor"|"gerador"|"revisor": [{"provedor", "modelo"}, ...]}
+    """
+    return extrair_fallbacks(config, "modelos_mapas")
+
+
 async def process_mapa_with_retry(
     html_file: str, 
     llm01: str, 
     llm02: str, 
     llm03: str,
     max_tentativas: int = 3,
-    max_retries: int = 2
+    max_retries: int = 2,
+    handoff: Optional[dict] = None,
+    especulativo: Optional[bool] = None,
+    fallbacks: Optional[dict] = None,
+    revisor_rapido: Optional[dict] = None,
+    modelos: Optional[dict] = None
 ) -> dict:
     """
-    Processa mapa com retry robusto em caso de falha.
+    Processa mapa com retry na granularidade da etapa/parte que falhou.
+    
+    O estado é criado uma única vez e reaproveitado entre as tentativas:
+    parse e divisão já concluídos não são refeitos, e só as partes que
+    falharam voltam para o LLM. Se as tentativas se esgotarem, os mapas
+    aprovados são salvos mesmo assim (status "parcial").
     
     Args:
         html_file: Nome do arquivo HTML
         llm01, llm02, llm03: Providers dos LLMs
         max_tentativas: Max tentativas de revisão por parte
-        max_retries: Max retries em caso de erro crítico
+        max_retries: Max retries da etapa que falhou
+        handoff: Dados do guia já extraídos pelo pipeline de guias
+                 (pula a leitura e o parse do HTML)
+        especulativo: 1ª tentativa best-of-N por mapa (padrão: settings)
+        fallbacks: Cadeias de failover por papel (divisor/gerador/revisor)
+        revisor_rapido: Revisor rápido da revisão em cascata (None = só o LLM03)
+        modelos: Modelo/temperatura/max_tokens/raciocínio por papel
         
     Returns:
         dict: Resultado do processamento
     """
     
+    politica = PoliticaRetry(max_tentativas=max_retries + 1)
+    
+    state = criar_estado_inicial(
+        html_filename=html_file,
+        llm01_provider=llm01,
+        llm02_provider=llm02,
+        llm03_provider=llm03,
+        max_tentativas=max_tentativas,
+        especulativo=especulativo,
+        fallbacks=fallbacks,
+        revisor_rapido=revisor_rapido,
+        modelos=modelos
+    )
+    state = await aplicar_handoff(state, handoff)
+    
     for retry in range(max_retries + 1):
         try:
             logger.info(f"🗺️ Processando {html_file} (tentativa {retry + 1}/{max_retries + 1})...")
             
-            resultado = await execute_graph(
-                html_filename=html_file,
-                llm01_provider=llm01,
-                llm02_provider=llm02,
-                llm03_provider=llm03,
-                max_tentativas=max_tentativas
+            state = await executar_etapas_mapa(
+                state,
+                max_workers=settings.mapas_max_workers_per_file
             )
             
-            # Validação do resultado
-            if not isinstance(resultado, dict):
-                raise ValueError(f"Resultado inválido: não é um dict, é {type(resultado)}")
+            if state["status"] == "concluido":
+                break
             
-            if resultado.get("status") == "erro":
-                erro_msg = resultado.get("erro_msg", "Erro desconhecido")
-                logger.warning(f"⚠️ {html_file}: processamento retornou erro: {erro_msg}")
-                
-                # Se não é a última tentativa, tenta novamente
-                if retry < max_retries:
-                    logger.info(f"🔄 Tentando novamente {html_file}...")
-                    await asyncio.sleep(2 * (retry + 1))  # Backoff exponencial
-                    continue
-                
-                # Última tentativa - retorna o erro
-                return resultado
+            erro_msg = state.get("erro_msg") or "Erro desconhecido"
+            logger.warning(f"⚠️ {html_file}: {state['status']}: {erro_msg}")
             
-            # Sucesso!
-            num_partes = len(resultado.get("partes_processadas", []))
-            logger.success(f"✅ {html_file}: {num_partes} mapa(s) gerado(s)")
+            # Se ainda há tentativas (e orçamento), retoma da etapa que falhou
+            if not politica.deve_retentar(Exception(erro_msg), retry + 1):
+                break
             
-            return resultado
+            logger.info(f"🔄 Retomando {html_file}...")
+            await politica.aguardar(retry + 1)
             
         except Exception as e:
             logger.error(f"❌ Erro ao processar {html_file}: {str(e)}")
+            state["status"] = "erro"
+            state["erro_msg"] = f"Falha na tentativa {retry + 1}: {str(e)}"
             
-            # Se não é a última tentativa, tenta novamente
-            if retry < max_retries:
-                logger.info(f"🔄 Tentando novamente {html_file}...")
-                await asyncio.sleep(2 * (retry + 1))
-                continue
+            if not politica.deve_retentar(e, retry + 1):
+                break
             
-            # Última tentativa - retorna erro estruturado
-            return {
-                "html_file": html_file,
-                "status": "erro",
-                "erro_msg": f"Falha após {max_retries + 1} tentativas: {str(e)}",
-                "partes_processadas": []
-            }
+            logger.info(f"🔄 Retomando {html_file}...")
+            await politica.aguardar(retry + 1, e)
+    
+    # Salva o que foi aprovado (tudo, ou parcial)
+    state = await salvar_resultado(state)
     
-    # Não deve chegar aqui, mas por segurança
-    return {
-        "html_file": html_file,
-        "status": "erro",
-        "erro_msg": "Erro desconhecido no retry",
-        "partes_processadas": []
-    }
+    if state["status"] != "erro":
+        num_partes = len(state.get("partes_processadas", []))
+        logger.success(f"✅ {html_file}: {num_partes} mapa(s) gerado(s) ({state['status']})")
+    
+    return state
 
 
 @router.post("/process-full")
+@com_orcamento_job
 async def process_full_pipeline(
     config_file: UploadFile = File(...),
     modo: str = "sequencial"
@@ -184,16 +220,36 @@ async def process_full_pipeline(
             "message": f"📚 Gerando {len(config['topicos'])} guia(s)..."
         })
         
+        async def ao_concluir_topico(topico: dict, concluidos: int, total: int):
+            """Reporta cada guia assim que termina (não só no final)."""
+            ok = topico.get("status") == "concluido"
+            await manager.send_log({
+                "level": "success" if ok else "error",
+                "message": (
+                    f"{'✅' if ok else '❌'} Guia {concluidos}/{total}: "
+                    f"{topico.get('nome_arquivo') or topico.get('nome_completo')}"
+                )
+            })
+            await manager.send_progress({
+                "stage": "guias",
+                "pipeline": "full",
+                "message": f"Guias: {concluidos}/{total}",
+                "percentage": 5 + int(45 * concluidos / max(total, 1))
+            })
+        
         # Executa graph de guias
         resultado_guias = await execute_graph_guias(
             config=config,
-            modo=modo
+            modo=modo,
+            on_topico_concluido=ao_concluir_topico,
+            gerar_handoff_mapas=True
         )
         
         if resultado_guias["status_geral"] != "concluido":
             raise Exception(f"Falha na geração de guias: {resultado_guias.get('erro_msg')}")
         
         arquivos_html = resultado_guias.get("arquivos_gerados", [])
+        handoffs = resultado_guias.get("handoffs", {})
         
         logger.success(f"✅ {len(arquivos_html)} guia(s) gerado(s)")
         
@@ -219,8 +275,12 @@ async def process_full_pipeline(
         
         # Extrai providers do config
         llm01, llm02, llm03 = extract_llm_providers(config)
+        fallbacks = extract_llm_fallbacks(config)
+        revisor_rapido = extrair_revisor_rapido(config, "modelos_mapas")
+        modelos = extrair_modelos(config, "modelos_mapas")
         
         max_tentativas_revisao = config.get("processamento", {}).get("max_tentativas_revisao", 3)
+        especulativo = config.get("processamento", {}).get("especulativo")
         
         # Executa graph de mapas para cada HTML (COM RETRY)
         resultados_mapas = []
@@ -242,13 +302,20 @@ async def process_full_pipeline(
                 llm02=llm02,
                 llm03=llm03,
                 max_tentativas=max_tentativas_revisao,
-                max_retries=2  # 3 tentativas totais
+                max_retries=2,  # 3 tentativas totais
+                handoff=handoffs.pop(html_file, None),
+                especulativo=especulativo,
+                fallbacks=fallbacks,
+                revisor_rapido=revisor_rapido,
+                modelos=modelos
             )
             
+            # Guarda só o resumo (referências aos .mmd), não o estado completo
+            resultado_mapa = resumir_estado_mapa(resultado_mapa)
             resultados_mapas.append(resultado_mapa)
             
             # Log do resultado
-            if resultado_mapa.get("status") == "concluido":
+            if resultado_mapa.get("status") in ("concluido", "parcial"):
                 num_partes = len(resultado_mapa.get("partes_processadas", []))
                 await manager.send_log({
                     "level": "success",
@@ -273,7 +340,7 @@ async def process_full_pipeline(
         total_mmds = sum(
             len(r.get("partes_processadas", []))
             for r in resultados_mapas
-            if r.get("status") == "concluido"
+            if r.get("status") in ("concluido", "parcial")
         )
         
         # Conta erros
@@ -331,6 +398,7 @@ async def process_full_pipeline(
 
 
 @router.post("/process-guias-only")
+@com_orcamento_job
 async def process_guias_only(config_file: UploadFile = File(...)):
     """Processa apenas geração de guias (sem mapas)."""
     try:
@@ -351,13 +419,18 @@ async def process_guias_only(config_file: UploadFile = File(...)):
 
 
 @router.post("/process-mapas-only")
+@com_orcamento_job
 async def process_mapas_only(
     html_files: List[str],
     config_file: UploadFile = File(...)
 ):
     """
     Processa apenas geração de mapas (de HTMLs existentes).
-    VERSÃO CORRIGIDA com retry.
+    
+    Usa o motor de lote: parse e divisão de todos os arquivos rodam
+    concorrentemente e todas as partes de todos os arquivos dividem
+    uma única fila global de workers. Arquivos que terminam "parcial"
+    ou "erro" são retomados até 2 vezes, só com as partes que faltam.
     
     Args:
         html_files: Lista de nomes de arquivos HTML em output/guias/
@@ -369,21 +442,41 @@ async def process_mapas_only(
         
         # Extrai providers
         llm01, llm02, llm03 = extract_llm_providers(config)
-        max_tentativas = config.get("processamento", {}).get("max_tentativas_revisao", 3)
+        processamento = config.get("processamento", {})
+        max_tentativas = processamento.get("max_tentativas_revisao", 3)
+        max_workers = processamento.get("max_workers_mapas", settings.mapas_max_workers)
         
-        resultados = []
+        async def ao_concluir_arquivo(state: dict, concluidos: int, total: int):
+            if state.get("status") == "concluido":
+                num_mapas = len(state.get("partes_processadas", []))
+                await manager.send_log({
+                    "level": "success",
+                    "message": f"✅ {state['html_filename']} ({concluidos}/{total}): {num_mapas} mapa(s)"
+                })
+            else:
+                await manager.send_log({
+                    "level": "error",
+                    "message": f"❌ {state['html_filename']} ({concluidos}/{total}): {state.get('erro_msg')}"
+                })
         
-        for html_file in html_files:
-            # ✅ Usa função com retry
-            resultado = await process_mapa_with_retry(
-                html_file=html_file,
-                llm01=llm01,
-                llm02=llm02,
-                llm03=llm03,
-                max_tentativas=max_tentativas,
-                max_retries=2
-            )
-            resultados.append(resultado)
+        estados = await processar_lote_mapas(
+            html_files=html_files,
+            llm01_provider=llm01,
+            llm02_provider=llm02,
+            llm03_provider=llm03,
+            max_tentativas=max_tentativas,
+            max_workers=max_workers,
+            on_arquivo_concluido=ao_concluir_arquivo,
+            especulativo=processamento.get("especulativo"),
+            fallbacks=extract_llm_fallbacks(config),
+            revisor_rapido=extrair_revisor_rapido(config, "modelos_mapas"),
+            modelos=extrair_modelos(config, "modelos_mapas"),
+            max_retries=2
+        )
+        resultados = [
+            resumir_estado_mapa(state, html_file)
+            for html_file, state in zip(html_files, estados)
+        ]
         
         total_sucesso = sum(1 for r in resultados if r.get("status") == "concluido")
         total_erros = sum(1 for r in resultados if r.get("status") == "erro")
@@ -35,6 +35,13 @@ class Settings(BaseSettings):
     google_api_key: str = ""
     deepseek_api_key: str = ""
     
+    # Chaves adicionais por provider (JSON no .env: OPENAI_API_KEYS='["sk-...", "sk-..."]'),
+    # somadas à chave principal no pool de chaves
+    openai_api_keys: list[str] = []
+    anthropic_api_keys: list[str] = []
+    google_api_keys: list[str] = []
+    deepseek_api_keys: list[str] = []
+    
     # === PROCESSAMENTO - GUIAS ===
     guias_max_paralelo: int = 3
     guias_max_tentativas_revisao: int = 3
@@ -44,12 +51,87 @@ class Settings(BaseSettings):
     mapas_max_tentativas_revisao: int = 3
     mapas_max_workers_per_file: int = 3
     mapas_max_concurrent_files: int = 2
+    mapas_max_workers: int = 6
+    mapas_divisor_max_chars: int = 15000
+    mapas_divisor_max_partes: int = 10
+    mapas_divisor_max_paralelo: int = 8
+    mapas_fusao_max_chars: int = 6000
+    mapas_revisao_em_lote: bool = False
+    mapas_revisao_lote_max_partes: int = 8
     
     # === LIMITES ===
     max_files_per_upload: int = 20
     max_file_size_mb: int = 10
     llm_timeout: int = 300
     
+    # === RETRY (BACKOFF EXPONENCIAL COM JITTER) ===
+    retry_base_segundos: float = 1.0
+    retry_max_segundos: float = 60.0
+    retry_orcamento_por_job: int = 50
+    llm_max_tentativas_chamada: int = 3
+    revisao_delta_em_retries: bool = True
+    retry_conversacional: bool = True
+    
+    # === HEDGING (LATÊNCIA DE CAUDA DAS CHAMADAS) ===
+    hedge_ativo: bool = True
+    hedge_percentil: float = 0.95
+    hedge_min_amostras: int = 20
+    hedge_min_segundos: float = 10.0
+    hedge_max_fracao_extra: float = 0.05
+    hedge_janela: int = 500
+    hedge_provedor_secundario: str = ""
+    
+    # === TRUNCAMENTO (CONTINUAÇÃO E DIMENSIONAMENTO DE max_tokens) ===
+    continuacao_max_chamadas: int = 2
+    continuacao_cauda_chars: int = 800
+    max_tokens_dinamico: bool = True
+    max_tokens_percentil: float = 0.95
+    max_tokens_margem: float = 1.25
+    max_tokens_min_amostras: int = 10
+    max_tokens_janela: int = 50
+    
+    # === STRUCTURED OUTPUT (ESTRATÉGIA POR PROVIDER) ===
+    saida_estruturada_estrategia: dict[str, str] = {}
+    saida_estruturada_benchmark: bool = False
+    
+    # === COALESCÊNCIA (SINGLE-FLIGHT DE CHAMADAS IDÊNTICAS) ===
+    coalescencia_ativa: bool = True
+    
+    # === FAILOVER (CADEIAS DE PROVIDERS E DISJUNTORES) ===
+    llm_fallback_padrao: list[str] = []
+    circuito_janela_segundos: float = 120.0
+    circuito_min_amostras: int = 5
+    circuito_limiar_erro: float = 0.5
+    circuito_limiar_lentidao: float = 0.8
+    circuito_lento_segundos: float = 180.0
+    circuito_espera_segundos: float = 30.0
+    circuito_max_sondas: int = 1
+    
+    # === POOL DE API KEYS (VÁRIAS CHAVES POR PROVIDER) ===
+    pool_quarentena_429_segundos: float = 30.0
+    pool_quarentena_auth_segundos: float = 600.0
+    
+    # === GERAÇÃO ESPECULATIVA (BEST-OF-N) ===
+    especulacao_ativa: bool = False
+    especulacao_min_candidatos: int = 2
+    especulacao_max_candidatos: int = 4
+    especulacao_confianca: float = 0.9
+    especulacao_taxa_rejeicao_inicial: float = 0.5
+    especulacao_janela: int = 200
+    especulacao_min_amostras: int = 10
+    
+    # === REVISÃO EM CASCATA (REVISOR RÁPIDO → FORTE) ===
+    cascata_ativa: bool = True
+    cascata_aprovar_acima: float = 8.5
+    cascata_reprovar_abaixo: float = 5.0
+    
+    # === LINTER LOCAL (VERIFICAÇÕES MECÂNICAS) ===
+    lint_processos: int = 2
+    
+    # === MEMÓRIA (ESTADO DOS PIPELINES) ===
+    max_logs_estado: int = 200
+    max_historico_topico: int = 20
+    
     # === LOGGING ===
     log_level: str = "INFO"
     log_rotation: str = "100 MB"
@@ -80,10 +162,22 @@ class Settings(BaseSettings):
         }
         return key_mapping.get(provider)
     
+    def get_provider_keys(self, provider: str) -> list[str]:
+        """Chave principal + chaves adicionais do provider (sem repetições)."""
+        provider = provider.lower()
+        extras = {
+            "openai": self.openai_api_keys,
+            "anthropic": self.anthropic_api_keys,
+            "gemini": self.google_api_keys,
+            "google": self.google_api_keys,
+            "deepseek": self.deepseek_api_keys,
+        }.get(provider, [])
+        chaves = [self.get_provider_key(provider) or ""] + list(extras)
+        return list(dict.fromkeys(c for c in chaves if len(c) > 10))
+    
     def is_provider_configured(self, provider: str) -> bool:
         """Verifica se provider está configurado."""
-        key = self.get_provider_key(provider)
-        return key is not None and len(key) > 10
+        return bool(self.get_provider_keys(provider))
     
     def list_configured_providers(self) -> list[str]:
         """Lista providers configurados."""
@@ -18,6 +18,13 @@ from .api.routes_mapas import router as mapas_router
 from .api.routes_pipeline import router as pipeline_router
 from .api.websocket import manager
 from .services.file_manager import ensure_directories
+from .services.disjuntor import estado_disjuntores
+from .services.revisao_cascata import estatisticas_cascata
+from .services.saida_estruturada import estatisticas_saida_estruturada
+from .services.coalescencia import estatisticas_coalescencia
+from .services.pool_chaves import estado_pools
+from .services.content_linter import encerrar_pool_lint
+from .agents.guias.graph import obter_grafo_guias
 
 settings = get_settings()
 
@@ -38,10 +45,14 @@ async def lifespan(app: FastAPI):
     print(f"📁 Output Mapas: {settings.output_mapas_dir}")
     print("="*70 + "\n")
     
+    # Grafo de guias compilado uma vez, fora do caminho crítico dos jobs
+    obter_grafo_guias()
+    
     yield
     
     # === SHUTDOWN ===
     print("\n🛑 Encerrando aplicação...")
+    encerrar_pool_lint()
 
 
 # === CRIAR APP ===
@@ -113,6 +124,11 @@ async def health_check():
         "status": "healthy",
         "version": settings.app_version,
         "providers": settings.list_configured_providers(),
+        "disjuntores": estado_disjuntores(),
+        "pools_chaves": estado_pools(),
+        "revisao_cascata": estatisticas_cascata(),
+        "saida_estruturada": estatisticas_saida_estruturada(),
+        "coalescencia": estatisticas_coalescencia(),
         "features": {
             "guias": True,
             "mapas": True,
@@ -0,0 +1,158 @@
+# backend/services/coalescencia.py
+"""
+Coalescência (single-flight) de chamadas idênticas a LLMs.
+
+Chamadas simultâneas com a mesma chave canônica (modelo + parâmetros +
+schema + mensagens) compartilham uma única chamada em voo: a primeira
+dispara a tarefa, as demais aguardam o mesmo resultado (ou erro).
+Ex.: o mesmo YAML enviado duas vezes, ou projetos com tópicos em comum.
+
+- A chamada roda numa tarefa própria: cancelar um dos interessados
+  (inclusive o primeiro) não afeta os demais; a tarefa só é cancelada
+  quando nenhum interessado resta
+- Voo compartilhado: cada interessado recebe sua própria cópia do
+  resultado (os nodes alteram as avaliações/mensagens recebidas)
+- Só deduplica o que está em voo: terminada (ou cancelada) a chamada,
+  a chave sai da tabela (não é cache)
+- A chamada compartilhada roda no contexto (contextvars) de quem a
+  disparou, o dono do voo. Os retries ficam fora dela (a PoliticaRetry
+  de cada node): um erro compartilhado é retentado por cada
+  interessado e cobrado do orçamento de retries do job de cada um
+
+Geração especulativa (best-of-N) pede candidatos idênticos de propósito,
+por isso roda dentro de `sem_coalescencia()`.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from ..core.config import get_settings
+from ..utils.logger import logger
+
+settings = get_settings()
+
+_desativada: ContextVar[bool] = ContextVar("coalescencia_desativada", default=False)
+
+
+@contextmanager
+def sem_coalescencia():
+    """Chamadas deste contexto nunca são coalescidas."""
+    token = _desativada.set(True)
+    try:
+        yield
+    finally:
+        _desativada.reset(token)
+
+
+def coalescencia_ativa() -> bool:
+    return settings.coalescencia_ativa and not _desativada.get()
+
+
+# ============================================
+# CHAVE CANÔNICA
+# ============================================
+
+def _mensagem_canonica(mensagem) -> Any:
+    if isinstance(mensagem, dict):
+        return {"role": mensagem.get("role"), "content": mensagem.get("content")}
+    if hasattr(mensagem, "content"):
+        return {"role": getattr(mensagem, "type", None), "content": mensagem.content}
+    return mensagem
+
+
+def chave_requisicao(assinatura: str, entrada) -> str:
+    """Hash da requisição: assinatura do modelo + mensagens (role, content)."""
+    if isinstance(entrada, (list, tuple)):
+        mensagens = [_mensagem_canonica(m) for m in entrada]
+    else:
+        mensagens = _mensagem_canonica(entrada)
+
+    canonica = json.dumps([assinatura, mensagens], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonica.encode("utf-8")).hexdigest()
+
+
+# ============================================
+# SINGLE-FLIGHT
+# ============================================
+
+class _Voo:
+    def __init__(self, tarefa: asyncio.Task):
+        self.tarefa = tarefa
+        self.interessados = 0
+        self.compartilhado = False
+
+
+class Coalescedor:
+    """Tabela de chamadas em voo por (event loop, chave)."""
+
+    def __init__(self):
+        self._voos: Dict[Tuple[int, str], _Voo] = {}
+        self._coalescidas = 0
+        self._lock = threading.Lock()
+
+    async def executar(self, chave: str, operacao: Callable[[], Awaitable[Any]], rotulo: str = ""):
+        """
+        Resultado de `operacao()`, compartilhado com chamadas simultâneas
+        de mesma chave.
+
+        `operacao()` roda numa tarefa criada no contexto (contextvars)
+        do primeiro interessado, o dono do voo.
+        """
+        id_voo = (id(asyncio.get_running_loop()), chave)
+
+        voo = self._voos.get(id_voo)
+        dono = voo is None
+
+        if dono:
+            voo = _Voo(asyncio.ensure_future(operacao()))
+            self._voos[id_voo] = voo
+            voo.tarefa.add_done_callback(lambda _: self._encerrar(id_voo, voo))
+        else:
+            voo.compartilhado = True
+            with self._lock:
+                self._coalescidas += 1
+            logger.info(f"🔗 Coalescência: {rotulo or 'chamada'} idêntica já em voo; aguardando a mesma resposta")
+
+        voo.interessados += 1
+
+        try:
+            resultado = await asyncio.shield(voo.tarefa)
+        except asyncio.CancelledError:
+            if not voo.tarefa.done() and voo.interessados == 1:
+                # Sai da tabela já: quem chegar agora abre um voo novo em
+                # vez de herdar o cancelamento
+                self._remover(id_voo, voo)
+                voo.tarefa.cancel()
+            raise
+        finally:
+            voo.interessados -= 1
+
+        return copy.deepcopy(resultado) if voo.compartilhado else resultado
+
+    def _remover(self, id_voo, voo: _Voo) -> None:
+        if self._voos.get(id_voo) is voo:
+            del self._voos[id_voo]
+
+    def _encerrar(self, id_voo, voo: _Voo) -> None:
+        self._remover(id_voo, voo)
+        if voo.tarefa.cancelled():
+            return
+        # Evita "exception was never retrieved" quando ninguém mais aguardava
+        voo.tarefa.exception()
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {"em_voo": len(self._voos), "coalescidas": self._coalescidas}
+
+
+coalescedor = Coalescedor()
+
+
+def estatisticas_coalescencia() -> dict:
+    return coalescedor.estatisticas()
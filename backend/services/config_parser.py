@@ -1,6 +1,6 @@
 import yaml
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 def parse_yaml_config(content: bytes) -> Dict[str, Any]:
     """Parse configuração YAML."""
@@ -17,4 +17,81 @@ def parse_yaml_config(content: bytes) -> Dict[str, Any]:
 def load_yaml_file(filepath: Path) -> Dict[str, Any]:
     """Carrega YAML de arquivo."""
     with open(filepath, 'rb') as f:
-        return parse_yaml_config(f.read())
\ No newline at end of file
+        return parse_yaml_config(f.read())
+
+def normalizar_cadeia(valor) -> List[Dict[str, Any]]:
+    """
+    Normaliza a cadeia de fallback de um papel.
+    
+    Aceita itens como dict ({provedor, modelo, ...}) ou apenas o nome
+    do provider ("anthropic").
+    """
+    if not valor:
+        return []
+    
+    if isinstance(valor, (str, dict)):
+        valor = [valor]
+    
+    cadeia = []
+    for item in valor:
+        if isinstance(item, str):
+            item = {"provedor": item}
+        if not isinstance(item, dict) or not item.get("provedor"):
+            raise ValueError(f"Item de fallback inválido: {item!r}")
+        cadeia.append(item)
+    
+    return cadeia
+
+def extrair_fallbacks(config: Dict[str, Any], secao: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Cadeias de fallback por papel de uma seção de modelos.
+    
+    Ex.: extrair_fallbacks(config, "modelos_mapas") →
+         {"gerador": [{"provedor": "anthropic", "modelo": "..."}], ...}
+    
+    Papéis sem `fallback` no YAML ficam de fora (usam o padrão das settings).
+    """
+    modelos = config.get(secao) or {}
+    return {
+        papel: normalizar_cadeia(dados["fallback"])
+        for papel, dados in modelos.items()
+        if isinstance(dados, dict) and "fallback" in dados
+    }
+
+CAMPOS_MODELO = ("modelo", "temperatura", "max_tokens", "raciocinio")
+
+def extrair_modelos(config: Dict[str, Any], secao: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Parâmetros de modelo por papel de uma seção de modelos.
+    
+    Ex.: extrair_modelos(config, "modelos_mapas") →
+         {"revisor": {"modelo": "gemini-2.5-flash", "temperatura": 0.2, "raciocinio": 0}, ...}
+    
+    Só entram os campos presentes no YAML (os demais usam o padrão do node).
+    """
+    modelos = config.get(secao) or {}
+    return {
+        papel: {campo: dados[campo] for campo in CAMPOS_MODELO if dados.get(campo) is not None}
+        for papel, dados in modelos.items()
+        if isinstance(dados, dict) and papel != "revisor_rapido"
+    }
+
+def extrair_revisor_rapido(config: Dict[str, Any], secao: str) -> Optional[Dict[str, Any]]:
+    """
+    Revisor rápido (1º nível da revisão em cascata) de uma seção de modelos.
+    
+    Ex.: modelos_guias.revisor_rapido →
+         {"provedor": "gemini", "modelo": "gemini-2.5-flash", "aprovar_acima": 8.5}
+    
+    Sem `revisor_rapido` no YAML, retorna None (só o revisor forte).
+    """
+    rapido = (config.get(secao) or {}).get("revisor_rapido")
+    if not rapido:
+        return None
+    
+    if isinstance(rapido, str):
+        rapido = {"provedor": rapido}
+    if not isinstance(rapido, dict) or not rapido.get("provedor"):
+        raise ValueError(f"revisor_rapido inválido em {secao}: {rapido!r}")
+    
+    return rapido
@@ -0,0 +1,385 @@
+# backend/services/content_linter.py
+"""
+Linter local (por regras) dos guias HTML e mapas Mermaid.
+
+Parte da rubrica dos revisores é mecânica: um programa confere melhor e
+de graça. Essas verificações saem do prompt do LLM e ficam aqui:
+
+- Guias: <section id="fundamentacao">, seções obrigatórias, mínimo de
+  palavras da fundamentação, HTML completo (sem truncamento) e
+  anglicismos desnecessários
+- Mapas: cabeçalho `mindmap`, título {{...}}, cercas ``` esquecidas,
+  parênteses/colchetes no texto dos ramos, indentação em múltiplos de 2
+  e profundidade máxima
+
+As regras são pré-compiladas (regex no import) em conjuntos por tipo de
+artefato. `lintar` roda num pool de processos (`lint_processos`; 0 =
+no próprio processo), fora do event loop.
+
+Os achados têm o formato dos problemas do revisor ({categoria, gravidade,
+descricao, localizacao}) e são mesclados à avaliação por
+`mesclar_achados`: um achado crítico/alto reprova o artefato mesmo que o
+LLM tenha aprovado.
+"""
+
+import asyncio
+import html
+import re
+import threading
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..core.config import get_settings
+from ..utils.logger import logger
+
+settings = get_settings()
+
+
+# Prefixo que identifica os achados do linter entre os problemas
+PREFIXO_LINT = "[lint]"
+
+GRAVIDADES_REPROVAM = {"critica", "alta"}
+
+Achado = Tuple[str, str]  # (descricao, localizacao)
+
+
+@dataclass(frozen=True)
+class Regra:
+    """Uma verificação determinística."""
+    codigo: str
+    categoria: str
+    gravidade: str
+    verificar: Callable[[dict], List[Achado]]
+
+
+def _sem_acentos(texto: str) -> str:
+    return unicodedata.normalize("NFD", texto).encode("ascii", "ignore").decode().lower()
+
+
+def _linhas_resumidas(numeros: List[int], limite: int = 5) -> str:
+    texto = ", ".join(str(n) for n in numeros[:limite])
+    if len(numeros) > limite:
+        texto += f" (+{len(numeros) - limite})"
+    return f"linha(s) {texto}"
+
+
+# ============================================
+# GUIAS (HTML)
+# ============================================
+
+RE_HEAD = re.compile(r"<head\b.*?</head\s*>", re.IGNORECASE | re.DOTALL)
+RE_NAO_VISIVEL = re.compile(r"<(script|style|template)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+RE_TAG = re.compile(r"<[^>]+>")
+RE_PALAVRA = re.compile(r"\w+", re.UNICODE)
+RE_TITULO_SECAO = re.compile(r"<h([1-4])\b[^>]*>(.*?)</h\1\s*>", re.IGNORECASE | re.DOTALL)
+RE_SECTION = re.compile(r"<(/?)section\b[^>]*>", re.IGNORECASE)
+RE_FUNDAMENTACAO = re.compile(
+    r"<section\b[^>]*\bid\s*=\s*[\"']fundamentacao[\"'][^>]*>", re.IGNORECASE
+)
+RE_FIM_HTML = re.compile(r"</html\s*>\s*$", re.IGNORECASE)
+
+MIN_PALAVRAS_FUNDAMENTACAO = 1500
+
+# Seções exigidas pelo prompt do gerador: (nome, termos aceitos no título)
+SECOES_OBRIGATORIAS = [
+    ("Introdução", ("introducao",)),
+    ("Fundamentação Teórica", ("fundamentacao",)),
+    ("Estratégias de Memorização", ("memorizacao",)),
+    ("Armadilhas e Pegadinhas", ("armadilha", "pegadinha")),
+    ("Questões Comentadas", ("questoes", "questao")),
+    ("Resumo Estratégico", ("resumo",)),
+    ("Aplicação Prática", ("aplicacao pratica", "casos praticos", "caso pratico")),
+]
+
+# Anglicismos com equivalente consagrado em português
+ANGLICISMOS = (
+    "feedback", "insight", "insights", "deadline", "performance", "mindset",
+    "overview", "background", "know-how", "expertise", "briefing", "budget",
+    "workshop", "input", "inputs", "output", "outputs", "target", "benchmark",
+    "framework", "update", "updates", "tips", "highlight", "highlights",
+    "spoiler", "case", "cases", "hack", "hacks", "skill", "skills", "gap"
+)
+RE_ANGLICISMO = re.compile(
+    r"(?<![\w-])(" + "|".join(re.escape(a) for a in ANGLICISMOS) + r")(?![\w-])",
+    re.IGNORECASE
+)
+
+
+def _texto_visivel(trecho: str) -> str:
+    trecho = RE_NAO_VISIVEL.sub(" ", trecho)
+    return html.unescape(RE_TAG.sub(" ", trecho))
+
+
+def _conteudo_section(documento: str, inicio: int) -> str:
+    """HTML interno da <section> aberta em `inicio` (respeita aninhamento)."""
+    profundidade = 0
+    for tag in RE_SECTION.finditer(documento, inicio):
+        profundidade += -1 if tag.group(1) else 1
+        if profundidade == 0:
+            return documento[inicio:tag.start()]
+    return documento[inicio:]
+
+
+def preparar_guia(documento: str) -> dict:
+    corpo = RE_HEAD.sub(" ", documento)
+    fundamentacao = RE_FUNDAMENTACAO.search(corpo)
+    return {
+        "html": documento,
+        "texto": _texto_visivel(corpo),
+        "titulos": [
+            _sem_acentos(_texto_visivel(m.group(2)))
+            for m in RE_TITULO_SECAO.finditer(corpo)
+        ],
+        "fundamentacao": (
+            _texto_visivel(_conteudo_section(corpo, fundamentacao.start()))
+            if fundamentacao else None
+        )
+    }
+
+
+def _regra_fundamentacao(guia: dict) -> List[Achado]:
+    if guia["fundamentacao"] is None:
+        return [('Falta a <section id="fundamentacao"> exigida', "estrutura do HTML")]
+    return []
+
+
+def _regra_palavras_fundamentacao(guia: dict) -> List[Achado]:
+    if guia["fundamentacao"] is None:
+        return []
+    palavras = len(RE_PALAVRA.findall(guia["fundamentacao"]))
+    if palavras < MIN_PALAVRAS_FUNDAMENTACAO:
+        return [(
+            f"Fundamentação teórica com {palavras} palavras "
+            f"(mínimo {MIN_PALAVRAS_FUNDAMENTACAO})",
+            'section#fundamentacao'
+        )]
+    return []
+
+
+def _regra_secoes(guia: dict) -> List[Achado]:
+    faltando = [
+        nome for nome, termos in SECOES_OBRIGATORIAS
+        if not any(termo in titulo for titulo in guia["titulos"] for termo in termos)
+    ]
+    if faltando:
+        return [(f"Seções obrigatórias ausentes: {', '.join(faltando)}", "títulos <h1>–<h4>")]
+    return []
+
+
+def _regra_html_completo(guia: dict) -> List[Achado]:
+    if not RE_FIM_HTML.search(guia["html"].strip()):
+        return [("HTML incompleto (sem </html> no fim): saída possivelmente truncada", "fim do documento")]
+    return []
+
+
+def _regra_anglicismos(guia: dict) -> List[Achado]:
+    contagem: Dict[str, int] = {}
+    for m in RE_ANGLICISMO.finditer(guia["texto"]):
+        termo = m.group(1).lower()
+        contagem[termo] = contagem.get(termo, 0) + 1
+    if contagem:
+        termos = ", ".join(f"{t} ({n}x)" for t, n in sorted(contagem.items()))
+        return [(f"Anglicismos desnecessários: {termos}", "texto do guia")]
+    return []
+
+
+REGRAS_GUIA = [
+    Regra("guia-fundamentacao", "estrutura", "alta", _regra_fundamentacao),
+    Regra("guia-secoes", "cobertura", "media", _regra_secoes),
+    Regra("guia-palavras", "cobertura", "media", _regra_palavras_fundamentacao),
+    Regra("guia-truncado", "estrutura", "alta", _regra_html_completo),
+    Regra("guia-anglicismos", "portugues", "baixa", _regra_anglicismos),
+]
+
+
+# ============================================
+# MAPAS (MERMAID)
+# ============================================
+
+RE_TITULO_MAPA = re.compile(r"\{\{.*?\}\}")
+RE_ICONE = re.compile(r"::icon\([^)]*\)")
+RE_PROIBIDOS_RAMO = re.compile(r"[()\[\]]")
+
+MAX_NIVEIS_MAPA = 4
+
+
+def preparar_mapa(codigo: str) -> dict:
+    linhas = [
+        (numero, linha.rstrip())
+        for numero, linha in enumerate(codigo.split("\n"), 1)
+        if linha.strip()
+    ]
+    return {"codigo": codigo, "linhas": linhas}
+
+
+def _nos(mapa: dict) -> List[Tuple[int, str]]:
+    """Linhas de nós (sem o cabeçalho `mindmap` e sem as de ícone)."""
+    return [
+        (numero, linha) for numero, linha in mapa["linhas"][1:]
+        if not linha.strip().startswith("::icon")
+    ]
+
+
+def _regra_cabecalho(mapa: dict) -> List[Achado]:
+    if not mapa["linhas"] or mapa["linhas"][0][1].strip() != "mindmap":
+        return [("O código não começa com 'mindmap'", "linha 1")]
+    return []
+
+
+def _regra_cercas(mapa: dict) -> List[Achado]:
+    numeros = [n for n, linha in mapa["linhas"] if "```" in linha]
+    if numeros:
+        return [("Cercas de código ``` dentro do mapa", _linhas_resumidas(numeros))]
+    return []
+
+
+def _regra_titulo(mapa: dict) -> List[Achado]:
+    nos = _nos(mapa)
+    if not nos or not RE_TITULO_MAPA.search(nos[0][1]):
+        return [("Título central {{**...**}} ausente na raiz", "raiz do mapa")]
+    return []
+
+
+def _regra_parenteses(mapa: dict) -> List[Achado]:
+    numeros = [
+        n for n, linha in _nos(mapa)
+        if RE_PROIBIDOS_RAMO.search(RE_ICONE.sub("", linha))
+    ]
+    if numeros:
+        return [(
+            f"Parênteses/colchetes no texto de {len(numeros)} ramo(s) "
+            "(use ':' ou '-' no lugar)",
+            _linhas_resumidas(numeros)
+        )]
+    return []
+
+
+def _regra_indentacao(mapa: dict) -> List[Achado]:
+    numeros = [
+        n for n, linha in mapa["linhas"][1:]
+        if (len(linha) - len(linha.lstrip())) % 2 != 0
+    ]
+    if numeros:
+        return [("Indentação fora de múltiplos de 2 espaços", _linhas_resumidas(numeros))]
+    return []
+
+
+def _regra_profundidade(mapa: dict) -> List[Achado]:
+    recuos = sorted({len(linha) - len(linha.lstrip()) for _n, linha in _nos(mapa)})
+    niveis = len(recuos) - 1  # abaixo da raiz
+    if niveis > MAX_NIVEIS_MAPA:
+        return [(f"{niveis} níveis de profundidade (máximo {MAX_NIVEIS_MAPA})", "estrutura do mapa")]
+    return []
+
+
+REGRAS_MAPA = [
+    Regra("mapa-cabecalho", "sintaxe", "critica", _regra_cabecalho),
+    Regra("mapa-cercas", "sintaxe", "critica", _regra_cercas),
+    Regra("mapa-titulo", "sintaxe", "critica", _regra_titulo),
+    Regra("mapa-parenteses", "sintaxe", "critica", _regra_parenteses),
+    Regra("mapa-indentacao", "sintaxe", "alta", _regra_indentacao),
+    Regra("mapa-profundidade", "sintaxe", "media", _regra_profundidade),
+]
+
+
+CONJUNTOS: Dict[str, Tuple[Callable[[str], dict], List[Regra]]] = {
+    "guia": (preparar_guia, REGRAS_GUIA),
+    "mapa": (preparar_mapa, REGRAS_MAPA),
+}
+
+
+# ============================================
+# EXECUÇÃO
+# ============================================
+
+def lint(tipo: str, conteudo: str) -> List[dict]:
+    """
+    Aplica o conjunto de regras de `tipo` ("guia" | "mapa").
+
+    Returns:
+        Achados no formato dos problemas do revisor
+    """
+    preparar, regras = CONJUNTOS[tipo]
+    artefato = preparar(conteudo or "")
+
+    achados = []
+    for regra in regras:
+        for descricao, localizacao in regra.verificar(artefato):
+            achados.append({
+                "categoria": regra.categoria,
+                "gravidade": regra.gravidade,
+                "descricao": f"{PREFIXO_LINT} {descricao}",
+                "localizacao": localizacao
+            })
+    return achados
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _obter_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if settings.lint_processos <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=settings.lint_processos)
+        return _pool
+
+
+def encerrar_pool_lint() -> None:
+    """Encerra o pool de processos do linter (shutdown da aplicação)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def lintar(tipo: str, conteudo: str) -> List[dict]:
+    """`lint` fora do event loop (pool de processos); nunca levanta."""
+    try:
+        pool = _obter_pool()
+        if pool is None:
+            return lint(tipo, conteudo)
+        return await asyncio.get_running_loop().run_in_executor(pool, lint, tipo, conteudo)
+    except Exception as e:
+        logger.warning(f"⚠️ Linter indisponível ({e}); seguindo só com o revisor")
+        return []
+
+
+async def lintar_varios(tipo: str, conteudos: List[str]) -> List[List[dict]]:
+    """Lint de vários artefatos em paralelo no pool."""
+    return list(await asyncio.gather(*(lintar(tipo, c) for c in conteudos)))
+
+
+# ============================================
+# MESCLA COM A AVALIAÇÃO DO REVISOR
+# ============================================
+
+def e_achado_lint(problema) -> bool:
+    descricao = problema.get("descricao", "") if isinstance(problema, dict) else problema.descricao
+    return descricao.startswith(PREFIXO_LINT)
+
+
+def mesclar_achados(avaliacao, achados: List[dict]):
+    """
+    Avaliação do revisor + achados do linter.
+
+    Achados de lint de rodadas anteriores (vindos da re-revisão delta)
+    são descartados: o lint da versão atual os substitui. Um achado
+    crítico/alto reprova o artefato.
+    """
+    dados = avaliacao.model_dump()
+    problemas = [p for p in dados["problemas"] if not e_achado_lint(p)]
+
+    dados["problemas"] = achados + problemas
+
+    if dados["aprovado"] and any(a["gravidade"] in GRAVIDADES_REPROVAM for a in achados):
+        dados["aprovado"] = False
+        logger.info(f"🧹 Linter reprovou o artefato ({len(achados)} achado(s) mecânico(s))")
+
+    return type(avaliacao)(**dados)
@@ -0,0 +1,109 @@
+# backend/services/conversa_retry.py
+"""
+Retries conversacionais dos geradores (guias e mapas).
+
+Quando o revisor rejeita um guia/mapa, a tentativa seguinte não reenvia
+um prompt "do zero" (o modelo não veria a própria saída nem as críticas e
+tenderia a repetir os mesmos erros). Em vez disso, continua a conversa:
+
+    [system, user]                          ← 1ª tentativa
+    [system, user, assistant, feedback]     ← tentativas seguintes
+
+O prefixo [system, user] é byte a byte idêntico em todas as tentativas,
+então o cache de prefixo dos provedores cobre a parte repetida:
+automático em OpenAI, DeepSeek e Gemini; no Anthropic, marcado com
+`cache_control` no fim do prefixo.
+
+A marcação depende do provider que de fato atende a chamada, que só o
+gateway conhece (failover, hedge no secundário): `montar_conversa` só
+indica o fim do prefixo e o gateway aplica `preparar_para_provider`
+a cada chamada.
+
+Desligável com `retry_conversacional=False` (volta ao prompt fresco).
+"""
+
+from typing import List, Optional
+
+from ..core.config import get_settings
+
+
+# Provedores que exigem marcação explícita do prefixo a cachear
+PROVEDORES_CACHE_EXPLICITO = {"anthropic"}
+
+# Chave (interna, removida pelo gateway) do turno que fecha o prefixo
+FIM_DO_PREFIXO = "fim_do_prefixo"
+
+
+def montar_conversa(
+    system_prompt: str,
+    user_prompt: str,
+    saida_anterior: Optional[str] = None,
+    feedback: Optional[str] = None
+) -> List[dict]:
+    """
+    Mensagens de uma chamada do gerador.
+
+    Args:
+        system_prompt: Prompt de sistema (fixo)
+        user_prompt: Pedido original (fixo entre tentativas)
+        saida_anterior: Saída rejeitada da tentativa anterior
+        feedback: Turno com as críticas do revisor
+
+    Returns:
+        [system, user] ou, em retry, [system, user, assistant, feedback]
+    """
+    settings = get_settings()
+
+    if not settings.retry_conversacional:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    mensagens = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt, FIM_DO_PREFIXO: True}
+    ]
+
+    if saida_anterior and feedback:
+        mensagens.append({"role": "assistant", "content": saida_anterior})
+        mensagens.append({"role": "user", "content": feedback})
+
+    return mensagens
+
+
+def preparar_para_provider(entrada, provider: str):
+    """
+    Mensagens no formato do provider que vai atender a chamada.
+
+    No Anthropic o turno que fecha o prefixo vira um bloco com
+    `cache_control`; nos demais a marca é só removida (OpenAI e DeepSeek
+    rejeitam o bloco e cacheiam o prefixo sozinhos).
+    """
+    if isinstance(entrada, str) or not any(
+        isinstance(m, dict) and FIM_DO_PREFIXO in m for m in entrada
+    ):
+        return entrada
+
+    explicito = provider.lower() in PROVEDORES_CACHE_EXPLICITO
+    mensagens = []
+
+    for mensagem in entrada:
+        if isinstance(mensagem, dict) and FIM_DO_PREFIXO in mensagem:
+            mensagem = {k: v for k, v in mensagem.items() if k != FIM_DO_PREFIXO}
+            if explicito:
+                mensagem["content"] = [{
+                    "type": "text",
+                    "text": mensagem["content"],
+                    "cache_control": {"type": "ephemeral"}
+                }]
+        mensagens.append(mensagem)
+
+    return mensagens
+
+
+def formatar_sugestoes(sugestoes: List[str]) -> str:
+    """Lista de sugestões do revisor, uma por linha."""
+    if not sugestoes:
+        return "- (nenhuma)"
+    return "\n".join(f"- {s}" for s in sugestoes)
@@ -0,0 +1,196 @@
+# backend/services/disjuntor.py
+"""
+Circuit breakers (disjuntores) por provider de LLM.
+
+Cada provider tem um disjuntor que acompanha, numa janela deslizante de
+`circuito_janela_segundos`, a taxa de erros de infraestrutura (rate
+limit, timeout, 5xx) e a taxa de chamadas lentas:
+
+- FECHADO: chamadas passam normalmente
+- ABERTO: alguma taxa passou do limite (com `circuito_min_amostras`);
+  o gateway desvia as chamadas para o próximo provider da cadeia, sem
+  esperar timeout nem retries
+- MEIO_ABERTO: após `circuito_espera_segundos`, uma chamada de sonda é
+  liberada; sucesso fecha o disjuntor, falha reabre
+
+Erros do cliente (validação, 4xx) não contam: dizem respeito ao pedido,
+não à saúde do provider.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from ..core.config import get_settings
+from ..utils.logger import logger
+
+settings = get_settings()
+
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio_aberto"
+
+
+class Disjuntor:
+    """Circuit breaker de um provider."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.estado = FECHADO
+        self._eventos: deque = deque()  # (instante, sucesso, lenta)
+        self._aberto_ate = 0.0
+        self._sondas = 0
+        self._lock = threading.Lock()
+
+    # ============================================
+    # CONSULTA
+    # ============================================
+
+    def permitir(self) -> bool:
+        """
+        A chamada pode ir para este provider?
+
+        No estado MEIO_ABERTO, reserva a vaga de sonda: quem recebe True
+        deve depois chamar `registrar_sucesso`, `registrar_falha` ou
+        `liberar`.
+        """
+        with self._lock:
+            if self.estado == FECHADO:
+                return True
+
+            if self.estado == ABERTO:
+                if time.monotonic() < self._aberto_ate:
+                    return False
+                self.estado = MEIO_ABERTO
+                self._sondas = 0
+                logger.info(f"🔌 Disjuntor {self.provider}: meio-aberto (sondando)")
+
+            if self._sondas < settings.circuito_max_sondas:
+                self._sondas += 1
+                return True
+
+            return False
+
+    def segundos_para_sonda(self) -> float:
+        """Tempo até o disjuntor aceitar uma sonda (0 se já aceita)."""
+        with self._lock:
+            if self.estado != ABERTO:
+                return 0.0
+            return max(0.0, self._aberto_ate - time.monotonic())
+
+    def resumo(self) -> dict:
+        with self._lock:
+            self._podar(time.monotonic())
+            total = len(self._eventos)
+            return {
+                "estado": self.estado,
+                "amostras": total,
+                "taxa_erro": round(sum(1 for _t, ok, _l in self._eventos if not ok) / total, 3) if total else 0.0,
+                "taxa_lenta": round(sum(1 for _t, _ok, lenta in self._eventos if lenta) / total, 3) if total else 0.0
+            }
+
+    # ============================================
+    # REGISTRO
+    # ============================================
+
+    def registrar_sucesso(self, latencia: float) -> None:
+        with self._lock:
+            if self.estado == MEIO_ABERTO:
+                self._fechar()
+                return
+
+            agora = time.monotonic()
+            self._eventos.append((agora, True, latencia >= settings.circuito_lento_segundos))
+            self._avaliar(agora)
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            if self.estado == MEIO_ABERTO:
+                self._abrir("sonda falhou")
+                return
+
+            agora = time.monotonic()
+            self._eventos.append((agora, False, False))
+            self._avaliar(agora)
+
+    def liberar(self) -> None:
+        """Devolve a vaga de sonda de uma chamada que não contou."""
+        with self._lock:
+            if self.estado == MEIO_ABERTO and self._sondas > 0:
+                self._sondas -= 1
+
+    # ============================================
+    # TRANSIÇÕES (com o lock já adquirido)
+    # ============================================
+
+    def _podar(self, agora: float) -> None:
+        limite = agora - settings.circuito_janela_segundos
+        while self._eventos and self._eventos[0][0] < limite:
+            self._eventos.popleft()
+
+    def _avaliar(self, agora: float) -> None:
+        self._podar(agora)
+
+        total = len(self._eventos)
+        if self.estado != FECHADO or total < settings.circuito_min_amostras:
+            return
+
+        taxa_erro = sum(1 for _t, ok, _l in self._eventos if not ok) / total
+        taxa_lenta = sum(1 for _t, _ok, lenta in self._eventos if lenta) / total
+
+        if taxa_erro >= settings.circuito_limiar_erro:
+            self._abrir(f"taxa de erro {taxa_erro:.0%} em {total} chamadas")
+        elif taxa_lenta >= settings.circuito_limiar_lentidao:
+            self._abrir(f"{taxa_lenta:.0%} de chamadas lentas em {total}")
+
+    def _abrir(self, motivo: str) -> None:
+        self.estado = ABERTO
+        self._aberto_ate = time.monotonic() + settings.circuito_espera_segundos
+        self._eventos.clear()
+        logger.warning(
+            f"🔌 Disjuntor {self.provider}: ABERTO ({motivo}); "
+            f"desviando chamadas por {settings.circuito_espera_segundos:.0f}s"
+        )
+
+    def _fechar(self) -> None:
+        self.estado = FECHADO
+        self._eventos.clear()
+        self._sondas = 0
+        logger.success(f"🔌 Disjuntor {self.provider}: fechado (provider recuperado)")
+
+
+# ============================================
+# REGISTRO GLOBAL
+# ============================================
+
+_disjuntores: Dict[str, Disjuntor] = {}
+_registro_lock = threading.Lock()
+
+
+def obter_disjuntor(provider: str) -> Disjuntor:
+    """Disjuntor do provider (criado na primeira consulta)."""
+    provider = provider.lower()
+    with _registro_lock:
+        if provider not in _disjuntores:
+            _disjuntores[provider] = Disjuntor(provider)
+        return _disjuntores[provider]
+
+
+def estado_disjuntores() -> Dict[str, dict]:
+    """Resumo de todos os disjuntores (para o /health)."""
+    with _registro_lock:
+        disjuntores = list(_disjuntores.values())
+    return {d.provider: d.resumo() for d in disjuntores}
+
+
+def limpar_disjuntores() -> None:
+    with _registro_lock:
+        _disjuntores.clear()
+
+
+def segundos_para_sonda(providers) -> Optional[float]:
+    """Menor espera até algum dos providers aceitar uma sonda."""
+    esperas = [obter_disjuntor(p).segundos_para_sonda() for p in providers]
+    return min(esperas) if esperas else None
@@ -0,0 +1,183 @@
+# backend/services/especulacao.py
+"""
+Geração especulativa best-of-N (guias e mapas).
+
+No modo padrão, o pior caso de um guia/mapa são `max_tentativas` rodadas
+estritamente seriais de geração + revisão. No modo especulativo (opt-in),
+a 1ª rodada dispara N gerações em paralelo, cada uma revisada assim que
+fica pronta:
+
+- O primeiro candidato aprovado encerra a disputa: o trabalho pendente
+  é cancelado e vence o aprovado de maior nota entre os já concluídos
+- Se nenhum for aprovado, o de maior nota volta para o fluxo normal
+  (retry conversacional + re-revisão delta)
+
+N é escolhido pela taxa histórica de rejeição na 1ª tentativa (janela
+deslizante por pipeline/provider): o menor N com
+P(ao menos um aprovado) = 1 - taxa^N >= `especulacao_confianca`,
+limitado a [`especulacao_min_candidatos`, `especulacao_max_candidatos`].
+
+Troca tokens por latência de cauda: use em jobs sensíveis a latência.
+"""
+
+import asyncio
+import math
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from ..core.config import get_settings
+from .coalescencia import sem_coalescencia
+from ..utils.logger import logger
+
+settings = get_settings()
+
+
+# ============================================
+# HISTÓRICO DE REVISÕES (TAXA DE REJEIÇÃO)
+# ============================================
+
+_historico: "defaultdict[str, deque]" = defaultdict(
+    lambda: deque(maxlen=settings.especulacao_janela)
+)
+_historico_lock = threading.Lock()
+
+
+def chave_historico(pipeline: str, provider: str) -> str:
+    """Chave do histórico: pipeline (guias|mapas) + provider do gerador."""
+    return f"{pipeline}:{provider}"
+
+
+def registrar_revisao(chave: str, aprovado: bool) -> None:
+    """Registra o resultado de uma revisão de 1ª tentativa."""
+    with _historico_lock:
+        _historico[chave].append(bool(aprovado))
+
+
+def taxa_rejeicao(chave: str) -> Optional[float]:
+    """Taxa de rejeição na janela, ou None com poucas amostras."""
+    with _historico_lock:
+        amostras = list(_historico.get(chave, ()))
+
+    if len(amostras) < settings.especulacao_min_amostras:
+        return None
+
+    return 1 - sum(amostras) / len(amostras)
+
+
+def escolher_num_candidatos(chave: str) -> int:
+    """Menor N que atinge a confiança desejada, dado o histórico."""
+    minimo = max(1, settings.especulacao_min_candidatos)
+    maximo = max(minimo, settings.especulacao_max_candidatos)
+
+    taxa = taxa_rejeicao(chave)
+    if taxa is None:
+        taxa = settings.especulacao_taxa_rejeicao_inicial
+
+    if taxa <= 0:
+        return minimo
+    if taxa >= 1:
+        return maximo
+
+    n = math.ceil(math.log(1 - settings.especulacao_confianca) / math.log(taxa))
+    return min(maximo, max(minimo, n))
+
+
+def limpar_historico() -> None:
+    """Esvazia o histórico de revisões."""
+    with _historico_lock:
+        _historico.clear()
+
+
+# ============================================
+# DISPUTA ENTRE CANDIDATOS
+# ============================================
+
+@dataclass
+class Candidato:
+    """Uma geração especulativa e a sua avaliação."""
+    indice: int
+    saida: Any
+    avaliacao: Any
+
+
+async def disputar_candidatos(
+    num_candidatos: int,
+    gerar: Callable[[int], Awaitable[Any]],
+    revisar: Callable[[Any], Awaitable[Any]],
+    aprovado: Callable[[Any], bool],
+    nota: Callable[[Any], float],
+    chave: Optional[str] = None,
+    descricao: str = "candidato"
+) -> Tuple[Optional[Candidato], List[Candidato]]:
+    """
+    Gera e revisa N candidatos em paralelo; para no primeiro aprovado.
+
+    Args:
+        num_candidatos: N
+        gerar: Corrotina (indice) → saída do gerador
+        revisar: Corrotina (saída) → avaliação
+        aprovado: Avaliação → aprovado?
+        nota: Avaliação → nota (para escolher o melhor)
+        chave: Chave do histórico onde registrar a revisão do 1º
+               candidato concluído (uma amostra por disputa)
+        descricao: Rótulo para os logs
+
+    Returns:
+        (melhor, concluidos): o aprovado de maior nota (ou, sem aprovados,
+        o rejeitado de maior nota; None se todos falharam) e todos os
+        candidatos que chegaram a ser revisados.
+    """
+    async def rodar(indice: int) -> Candidato:
+        # Candidatos pedem de propósito a mesma geração: nada de coalescer
+        with sem_coalescencia():
+            saida = await gerar(indice)
+        avaliacao = await revisar(saida)
+        return Candidato(indice=indice, saida=saida, avaliacao=avaliacao)
+
+    tarefas = [asyncio.create_task(rodar(i)) for i in range(num_candidatos)]
+    concluidos: List[Candidato] = []
+
+    try:
+        for proximo in asyncio.as_completed(tarefas):
+            try:
+                candidato = await proximo
+            except Exception as e:
+                logger.warning(f"⚠️ [{descricao}] Candidato falhou: {e}")
+                continue
+
+            concluidos.append(candidato)
+
+            # Uma amostra por disputa (a do 1º candidato revisado): registrar
+            # todos enviesaria a taxa para cima, pois a disputa para no
+            # 1º aprovado e os rejeitados anteriores a ele sempre contam
+            if chave and len(concluidos) == 1:
+                registrar_revisao(chave, aprovado(candidato.avaliacao))
+
+            if aprovado(candidato.avaliacao):
+                break
+
+    finally:
+        pendentes = [t for t in tarefas if not t.done()]
+        for tarefa in pendentes:
+            tarefa.cancel()
+        if pendentes:
+            await asyncio.gather(*pendentes, return_exceptions=True)
+            logger.info(f"✂️ [{descricao}] {len(pendentes)} candidato(s) cancelado(s)")
+
+    aprovados = [c for c in concluidos if aprovado(c.avaliacao)]
+    disputa = aprovados or concluidos
+
+    if not disputa:
+        return None, concluidos
+
+    melhor = max(disputa, key=lambda c: nota(c.avaliacao))
+
+    logger.info(
+        f"🏁 [{descricao}] {len(concluidos)}/{num_candidatos} candidato(s) revisado(s), "
+        f"{len(aprovados)} aprovado(s); vencedor #{melhor.indice + 1} "
+        f"(nota {nota(melhor.avaliacao):.1f})"
+    )
+
+    return melhor, concluidos
@@ -1,6 +1,7 @@
 from pathlib import Path
 from backend.core.config import get_settings
 import json
+import hashlib
 
 settings = get_settings()
 
@@ -32,6 +33,20 @@ def save_mmd_file(filename: str, content: str, metadata: dict = None) -> str:
     
     return str(filepath)
 
+def referencia_artefato(filepath: str, content: str) -> dict:
+    """
+    Gera referência leve para um artefato já salvo em disco.
+    
+    O state guarda apenas esta referência (caminho, hash e tamanho),
+    e não o conteúdo completo do artefato.
+    """
+    dados = content.encode('utf-8')
+    return {
+        "caminho": str(filepath),
+        "sha256": hashlib.sha256(dados).hexdigest(),
+        "tamanho_bytes": len(dados)
+    }
+
 def listar_guias_html() -> list[str]:
     """Lista guias HTML gerados."""
     path = Path(settings.output_guias_dir)
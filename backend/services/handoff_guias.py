@@ -0,0 +1,51 @@
+# backend/services/handoff_guias.py
+"""
+Handoff do pipeline de guias para o de mapas.
+
+No /process-full o guia recém-gerado ainda está em memória quando é
+salvo. O salvar_node de guias extrai dele o title e a fundamentação
+(numa thread, fora do event loop) e semeia o cache do html_extractor
+para o arquivo salvo; o pipeline de mapas lê o guia pelo mesmo cache,
+sem reler nem reparsear o arquivo.
+
+O handoff guardado no state é só uma referência ao arquivo (o texto da
+fundamentação fica no cache do extractor, não no state):
+{
+    "html_filename": "dConst01_DirGarFun.html",
+    "caminho": "output/guias/dConst01_DirGarFun.html",
+    "sha256": "..."
+}
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Optional, Union
+
+from .html_extractor import extrair_guia_de_texto, registrar_extracao
+from ..utils.logger import logger
+
+
+async def criar_handoff(
+    html_filename: str,
+    caminho: Union[str, Path],
+    html_content: str,
+    sha256: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Extrai o guia em memória e devolve a referência do handoff.
+
+    Returns:
+        dict do handoff, ou None se o HTML não tiver title/fundamentação
+        (nesse caso o pipeline de mapas faz o parse do disco e reporta o
+        erro normalmente)
+    """
+    try:
+        extracao = await asyncio.to_thread(extrair_guia_de_texto, html_content)
+        if extracao.titulo is None or extracao.fundamentacao is None:
+            raise ValueError("title ou section#fundamentacao ausente")
+        registrar_extracao(caminho, extracao)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Handoff indisponível para {html_filename}: {e}")
+        return None
+
+    return {"html_filename": html_filename, "caminho": str(caminho), "sha256": sha256}
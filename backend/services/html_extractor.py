@@ -0,0 +1,340 @@
+# backend/services/html_extractor.py
+"""
+Extração rápida de <title> e section#fundamentacao dos guias HTML.
+
+O parse_html_node só precisa desses dois elementos. Em vez de montar a
+árvore BeautifulSoup inteira (lenta, síncrona, dentro do event loop),
+este módulo:
+
+1. Lê o arquivo em streaming com `lxml.etree.iterparse(html=True)`,
+   parando assim que a section#fundamentacao termina
+2. Roda em thread (`asyncio.to_thread`) para não bloquear o loop
+3. Cai para o BeautifulSoup apenas se o lxml não encontrar os elementos
+   (HTML muito malformado)
+4. Guarda o resultado num cache LRU chaveado por (caminho, mtime, tamanho):
+   o mesmo guia não é reparseado enquanto não mudar em disco
+
+Também extrai de HTML já em memória (`extrair_guia_de_texto`), e o
+resultado pode semear o cache (`registrar_extracao`): é o handoff
+guias → mapas (ver services/handoff_guias.py).
+
+O texto extraído é idêntico ao de
+`soup.find(...).get_text(separator='\\n', strip=True)`.
+
+Benchmark:
+    python -m backend.services.html_extractor [arquivo.html ...]
+"""
+
+import asyncio
+import io
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+from lxml import etree
+
+from ..utils.logger import logger
+
+
+# Strings que o BeautifulSoup não inclui em get_text()
+_TAGS_IGNORADAS = {"script", "style", "template"}
+
+MAX_CACHE_EXTRACAO = 256
+
+
+@dataclass(frozen=True)
+class ExtracaoHTML:
+    """Resultado da extração: title e texto da fundamentação."""
+    titulo: Optional[str]
+    fundamentacao: Optional[str]
+    metodo: str = "lxml"
+
+
+# ============================================
+# TEXTO (COMPATÍVEL COM BeautifulSoup.get_text)
+# ============================================
+
+def _textos(elemento) -> list:
+    """
+    Coleta os textos de um elemento, na ordem do documento.
+
+    Equivale a get_text(separator='\\n', strip=True): cada string é
+    aparada e strings vazias são descartadas. Comentários e conteúdo
+    de <script>/<style> ficam de fora; seus `tail` entram.
+    """
+    partes = []
+
+    def visitar(el):
+        tag = el.tag if isinstance(el.tag, str) else None
+
+        if tag is not None and tag.lower() not in _TAGS_IGNORADAS and el.text:
+            texto = el.text.strip()
+            if texto:
+                partes.append(texto)
+
+        for filho in el:
+            visitar(filho)
+            if filho.tail:
+                texto = filho.tail.strip()
+                if texto:
+                    partes.append(texto)
+
+    visitar(elemento)
+    return partes
+
+
+def texto_elemento(elemento) -> str:
+    """Texto de um elemento lxml, como no BeautifulSoup (separador '\\n')."""
+    return "\n".join(_textos(elemento))
+
+
+# ============================================
+# EXTRAÇÃO
+# ============================================
+
+def extrair_com_lxml(origem) -> ExtracaoHTML:
+    """
+    Extrai title e fundamentação lendo o arquivo em streaming.
+
+    Só são materializados os elementos <title> e <section>; o restante
+    da árvore é descartado à medida que o parser avança, e a leitura
+    para assim que a section#fundamentacao é encontrada.
+
+    Args:
+        origem: Caminho do arquivo ou objeto file-like binário
+    """
+    titulo = None
+    fundamentacao = None
+
+    if isinstance(origem, Path):
+        origem = str(origem)
+
+    contexto = etree.iterparse(
+        origem,
+        events=("end",),
+        tag=("title", "section"),
+        html=True,
+        recover=True,
+        encoding="utf-8"
+    )
+
+    for _evento, elemento in contexto:
+        if elemento.tag == "title" and titulo is None:
+            titulo = "".join(elemento.itertext()).strip()
+
+        elif elemento.tag == "section" and elemento.get("id") == "fundamentacao":
+            fundamentacao = texto_elemento(elemento)
+            break
+
+        # Libera o que já foi lido, exceto sections dentro da fundamentação
+        # (que ainda não fechou)
+        elif not any(
+            ancestral.get("id") == "fundamentacao"
+            for ancestral in elemento.iterancestors("section")
+        ):
+            elemento.clear(keep_tail=True)
+
+    del contexto
+
+    return ExtracaoHTML(titulo=titulo, fundamentacao=fundamentacao, metodo="lxml")
+
+
+def extrair_com_bs4(html_content: str) -> ExtracaoHTML:
+    """Caminho lento e tolerante (BeautifulSoup), usado como fallback."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, "lxml")
+
+    title_tag = soup.find("title")
+    section = soup.find("section", id="fundamentacao")
+
+    return ExtracaoHTML(
+        titulo=title_tag.get_text(strip=True) if title_tag else None,
+        fundamentacao=section.get_text(separator="\n", strip=True) if section else None,
+        metodo="bs4"
+    )
+
+
+def _extrair_arquivo(filepath: Union[str, Path]) -> ExtracaoHTML:
+    try:
+        resultado = extrair_com_lxml(filepath)
+        if resultado.titulo is not None and resultado.fundamentacao is not None:
+            return resultado
+        logger.debug(f"lxml não encontrou title/fundamentação em {filepath}; usando BeautifulSoup")
+    except (etree.LxmlError, ValueError) as e:
+        logger.debug(f"lxml falhou em {filepath} ({e}); usando BeautifulSoup")
+
+    with open(filepath, "r", encoding="utf-8") as f:
+        return extrair_com_bs4(f.read())
+
+
+def extrair_guia_de_texto(html_content: str) -> ExtracaoHTML:
+    """Extrai title e fundamentação de um HTML já em memória."""
+    try:
+        resultado = extrair_com_lxml(io.BytesIO(html_content.encode("utf-8")))
+        if resultado.titulo is not None and resultado.fundamentacao is not None:
+            return resultado
+    except (etree.LxmlError, ValueError) as e:
+        logger.debug(f"lxml falhou no HTML em memória ({e}); usando BeautifulSoup")
+
+    return extrair_com_bs4(html_content)
+
+
+# ============================================
+# CACHE DE PARSE (CAMINHO, MTIME, TAMANHO)
+# ============================================
+
+_cache: "OrderedDict[tuple, ExtracaoHTML]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _chave_cache(filepath: Union[str, Path]) -> tuple:
+    caminho = Path(filepath).resolve()
+    info = caminho.stat()
+    return (str(caminho), info.st_mtime_ns, info.st_size)
+
+
+def extrair_guia(filepath: Union[str, Path]) -> ExtracaoHTML:
+    """
+    Extrai title e fundamentação de um guia (síncrono, com cache).
+
+    Tenta o caminho rápido (lxml em streaming) e só recorre ao
+    BeautifulSoup se algum dos elementos não for encontrado ou o lxml
+    falhar. Se o arquivo não mudou (mesmo mtime e tamanho) desde a
+    última leitura, devolve o resultado em cache.
+    """
+    chave = _chave_cache(filepath)
+
+    with _cache_lock:
+        if chave in _cache:
+            _cache.move_to_end(chave)
+            return _cache[chave]
+
+    resultado = _extrair_arquivo(filepath)
+
+    with _cache_lock:
+        _cache[chave] = resultado
+        _cache.move_to_end(chave)
+        while len(_cache) > MAX_CACHE_EXTRACAO:
+            _cache.popitem(last=False)
+
+    return resultado
+
+
+def registrar_extracao(filepath: Union[str, Path], extracao: ExtracaoHTML) -> None:
+    """
+    Semeia o cache com uma extração já feita do conteúdo de `filepath`.
+
+    Usado pelo handoff guias → mapas: o guia recém-salvo já foi extraído
+    em memória, então a leitura seguinte do arquivo não reparseia nada.
+    """
+    chave = _chave_cache(filepath)
+
+    with _cache_lock:
+        _cache[chave] = extracao
+        _cache.move_to_end(chave)
+        while len(_cache) > MAX_CACHE_EXTRACAO:
+            _cache.popitem(last=False)
+
+
+def limpar_cache_extracao() -> None:
+    """Esvazia o cache de parse."""
+    with _cache_lock:
+        _cache.clear()
+
+
+async def extrair_guia_async(filepath: Union[str, Path]) -> ExtracaoHTML:
+    """Extrai title e fundamentação numa thread, fora do event loop."""
+    return await asyncio.to_thread(extrair_guia, filepath)
+
+
+def normalizar_fundamentacao(texto: str) -> str:
+    """Compacta linhas em branco e espaços repetidos."""
+    texto = re.sub(r'\n{3,}', '\n\n', texto)
+    return re.sub(r' {2,}', ' ', texto)
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def _gerar_guia_sintetico(num_secoes: int = 400) -> str:
+    """Gera um guia grande no formato produzido pelo gerador de guias."""
+    estilo = "\n".join(f".classe-{i} {{ margin: {i}px; color: #1e3a5f; }}" for i in range(300))
+    paragrafos = "\n".join(
+        f"<h3>Subtópico {i}</h3>\n"
+        f"<p>Conforme o <strong>art. {i} da CF/88</strong>, o princípio aplica-se "
+        f"<em>erga omnes</em>, segundo o STF (RE {1000 + i}).</p>\n"
+        f"<ul><li>Item A {i}</li><li>Item B {i}</li></ul>"
+        for i in range(num_secoes)
+    )
+    outras = "\n".join(
+        f"<section id='secao-{i}'><h2>Seção {i}</h2>{paragrafos[:5000]}</section>"
+        for i in range(10)
+    )
+
+    return (
+        "<!DOCTYPE html>\n<html lang='pt-BR'>\n<head>\n<meta charset='UTF-8'>\n"
+        "<title>[Direito Constitucional] - [Controle de Constitucionalidade] - "
+        "Guia Completo para Concursos</title>\n"
+        f"<style>\n{estilo}\n</style>\n</head>\n<body>\n"
+        "<nav><h2>Direito Constitucional</h2><!-- menu --></nav>\n"
+        "<div class='container'>\n"
+        f"<section id='fundamentacao'><h2>Fundamentação Teórica</h2>\n{paragrafos}\n</section>\n"
+        f"{outras}\n</div>\n"
+        "<script>document.querySelectorAll('a').forEach(a => {});</script>\n"
+        "</body>\n</html>\n"
+    )
+
+
+def _benchmark(arquivos: list, repeticoes: int = 5) -> None:
+    import tempfile
+    import time
+
+    if not arquivos:
+        tmp = Path(tempfile.mkdtemp()) / "guia_grande.html"
+        tmp.write_text(_gerar_guia_sintetico(), encoding="utf-8")
+        arquivos = [tmp]
+
+    for arquivo in arquivos:
+        arquivo = Path(arquivo)
+        tamanho_kb = arquivo.stat().st_size / 1024
+
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            with open(arquivo, "r", encoding="utf-8") as f:
+                lento = extrair_com_bs4(f.read())
+        tempo_bs4 = (time.perf_counter() - inicio) / repeticoes
+
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            rapido = _extrair_arquivo(arquivo)
+        tempo_lxml = (time.perf_counter() - inicio) / repeticoes
+
+        extrair_guia(arquivo)
+        inicio = time.perf_counter()
+        for _ in range(repeticoes):
+            extrair_guia(arquivo)
+        tempo_cache = (time.perf_counter() - inicio) / repeticoes
+
+        identico = (
+            lento.titulo == rapido.titulo
+            and lento.fundamentacao == rapido.fundamentacao
+        )
+
+        print(
+            f"{arquivo.name} ({tamanho_kb:.0f} KB)\n"
+            f"   BeautifulSoup: {tempo_bs4 * 1000:8.1f} ms\n"
+            f"   lxml stream:   {tempo_lxml * 1000:8.1f} ms ({rapido.metodo})\n"
+            f"   Cache:         {tempo_cache * 1000:8.3f} ms\n"
+            f"   Ganho:         {tempo_bs4 / max(tempo_lxml, 1e-9):8.1f}x\n"
+            f"   Texto idêntico: {'sim' if identico else 'NÃO'}"
+        )
+
+
+if __name__ == "__main__":
+    import sys
+    _benchmark(sys.argv[1:])
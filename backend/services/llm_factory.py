@@ -5,17 +5,20 @@ Factory para criação de instâncias de LLMs.
 Fornece uma interface unificada para trabalhar com diferentes
 provedores de LLM (OpenAI, Anthropic, Google, DeepSeek) usando
 as integrações nativas do LangChain.
+
+Os modelos saem envolvidos pelo gateway de chamadas (ver llm_gateway.py).
 """
 
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_deepseek import ChatDeepSeek
-from typing import Optional
+from typing import List, Optional, Union
 import os
 
 from ..core.config import get_settings
 from ..utils.logger import logger
+from .llm_gateway import LLMGateway, Rota
 
 
 # ============================================
@@ -29,44 +32,90 @@ DEFAULT_MODELS = {
     "deepseek": "deepseek-reasoner"
 }
 
+# Teto de max_tokens usado no dimensionamento automático (saída máxima
+# dos modelos padrão; conservador para os demais modelos do provider)
+TETO_MAX_TOKENS = {
+    "openai": 32768,
+    "anthropic": 32000,
+    "gemini": 65536,
+    "deepseek": 32768
+}
+
+
+# Esforço de raciocínio (OpenAI) equivalente a um orçamento em tokens
+ESFORCO_RACIOCINIO = [(2048, "low"), (8192, "medium")]
+
+
+# ============================================
+# RACIOCÍNIO (THINKING)
+# ============================================
+
+def parametros_raciocinio(
+    provider: str,
+    model: str,
+    raciocinio: Optional[Union[int, str]]
+) -> dict:
+    """
+    Traduz o orçamento de raciocínio do YAML para o parâmetro do provider.
+    
+    `raciocinio` é um orçamento em tokens (0 = desligado, quando o modelo
+    permite) ou, na OpenAI, o esforço ("low", "medium", "high"):
+    
+    - anthropic: `thinking` com `budget_tokens` (0/None = sem thinking)
+    - gemini: `thinking_budget` (se a versão do langchain-google-genai suportar)
+    - openai: `reasoning_effort` (apenas modelos de raciocínio: o*, gpt-5*)
+    - deepseek: sem orçamento (escolha deepseek-chat ou deepseek-reasoner)
+    """
+    if raciocinio is None:
+        return {}
+    
+    if provider == "anthropic":
+        if not raciocinio:
+            return {}
+        return {"thinking": {"type": "enabled", "budget_tokens": int(raciocinio)}}
+    
+    if provider == "gemini":
+        if "thinking_budget" not in ChatGoogleGenerativeAI.model_fields:
+            logger.warning(
+                "⚠️ langchain-google-genai sem suporte a thinking_budget; "
+                f"raciocinio={raciocinio} ignorado para {model}"
+            )
+            return {}
+        return {"thinking_budget": int(raciocinio)}
+    
+    if provider == "openai":
+        if not model.startswith(("o1", "o3", "o4", "gpt-5")):
+            return {}
+        if isinstance(raciocinio, str):
+            return {"reasoning_effort": raciocinio}
+        esforco = next((e for limite, e in ESFORCO_RACIOCINIO if raciocinio <= limite), "high")
+        return {"reasoning_effort": esforco}
+    
+    logger.debug(f"raciocinio={raciocinio} não se aplica a {provider}/{model}; ignorado")
+    return {}
+
 
 # ============================================
 # FUNÇÃO PRINCIPAL - FACTORY
 # ============================================
 
-def get_llm(
+def criar_modelo(
     provider: str,
     model: Optional[str] = None,
     temperature: float = 0.7,
     max_tokens: int = 16000,
+    raciocinio: Optional[Union[int, str]] = None,
+    api_key: Optional[str] = None,
     **kwargs
 ):
     """
-    Factory para obter instância de LLM configurada.
-    
-    Usa as integrações nativas do LangChain para cada provider,
-    garantindo compatibilidade total com recursos como structured output,
-    streaming, e function calling.
-    
-    Args:
-        provider: Nome do provider (openai, anthropic, gemini, deepseek)
-        model: Nome do modelo (opcional, usa padrão do provider)
-        temperature: Temperatura para geração (0.0 a 1.0)
-        max_tokens: Máximo de tokens na resposta
-        **kwargs: Argumentos adicionais específicos do provider
+    Cria o chat model nativo do LangChain para o provider (sem o gateway).
     
-    Returns:
-        ChatModel: Instância do modelo configurado
+    `raciocinio` é traduzido por `parametros_raciocinio`; `api_key` escolhe
+    uma chave do pool do provider (padrão: a 1ª configurada).
     
     Raises:
         ValueError: Se provider for inválido ou não configurado
-    
-    Examples:
-        >>> llm = get_llm("anthropic", temperature=0.3)
-        >>> response = llm.invoke("Hello!")
-        
-        >>> llm = get_llm("openai", model="gpt-4-turbo")
-        >>> response = await llm.ainvoke([{"role": "user", "content": "Hi"}])
     """
     
     settings = get_settings()
@@ -93,9 +142,19 @@ def get_llm(
     if model is None:
         model = DEFAULT_MODELS[provider]
     
+    if api_key is None:
+        api_key = settings.get_provider_keys(provider)[0]
+    
+    kwargs = {**parametros_raciocinio(provider, model, raciocinio), **kwargs}
+    
+    if "thinking" in kwargs:
+        # Thinking da Anthropic exige temperature 1 e max_tokens acima do orçamento
+        temperature = 1
+        max_tokens = max(max_tokens, kwargs["thinking"]["budget_tokens"] + 1024)
+    
     logger.debug(
         f"Criando LLM: provider={provider}, model={model}, "
-        f"temp={temperature}, max_tokens={max_tokens}"
+        f"temp={temperature}, max_tokens={max_tokens}, raciocinio={raciocinio}"
     )
     
     # ============================================
@@ -107,7 +166,7 @@ def get_llm(
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
-            api_key=settings.openai_api_key,
+            api_key=api_key,
             timeout=settings.llm_timeout,
             **kwargs
         )
@@ -121,7 +180,7 @@ def get_llm(
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
-            api_key=settings.anthropic_api_key,
+            api_key=api_key,
             timeout=settings.llm_timeout,
             **kwargs
         )
@@ -135,7 +194,7 @@ def get_llm(
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
-            google_api_key=settings.google_api_key,
+            google_api_key=api_key,
             timeout=settings.llm_timeout,
             **kwargs
         )
@@ -149,7 +208,7 @@ def get_llm(
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
-            api_key=settings.deepseek_api_key,
+            api_key=api_key,
             timeout=settings.llm_timeout,
             **kwargs
         )
@@ -159,6 +218,110 @@ def get_llm(
         raise ValueError(f"Provider não implementado: {provider}")
 
 
+def get_llm(
+    provider: str,
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 16000,
+    papel: Optional[str] = None,
+    fallbacks: Optional[List[dict]] = None,
+    raciocinio: Optional[Union[int, str]] = None,
+    **kwargs
+):
+    """
+    Factory para obter instância de LLM configurada.
+    
+    Usa as integrações nativas do LangChain para cada provider,
+    garantindo compatibilidade total com recursos como structured output,
+    streaming, e function calling.
+    
+    Args:
+        provider: Nome do provider (openai, anthropic, gemini, deepseek)
+        model: Nome do modelo (opcional, usa padrão do provider)
+        temperature: Temperatura para geração (0.0 a 1.0)
+        max_tokens: Máximo de tokens na resposta (aumentado a cada chamada
+                    se as saídas recentes do papel passarem dele)
+        papel: Papel da chamada (ex: "mapas_gerador"), usado na latência
+               e nos tokens de saída observados pelo gateway
+        fallbacks: Cadeia de failover, em ordem: [{"provedor", "modelo"}, ...]
+                   (padrão: settings.llm_fallback_padrao)
+        raciocinio: Orçamento de raciocínio em tokens ou esforço (ver
+                    `parametros_raciocinio`); None = padrão do modelo
+        **kwargs: Argumentos adicionais específicos do provider
+    
+    Returns:
+        LLMGateway: Modelo configurado, envolvido pelo gateway
+                    (mesma interface: ainvoke, with_structured_output)
+    
+    Raises:
+        ValueError: Se provider for inválido ou não configurado
+    
+    Examples:
+        >>> llm = get_llm("anthropic", temperature=0.3)
+        >>> response = llm.invoke("Hello!")
+        
+        >>> llm = get_llm("openai", model="gpt-4-turbo")
+        >>> response = await llm.ainvoke([{"role": "user", "content": "Hi"}])
+    """
+    
+    provider = provider.lower()
+    papel = papel or "geral"
+    
+    modelo = criar_modelo(provider, model, temperature, max_tokens, raciocinio, **kwargs)
+    
+    # max_tokens: o configurado; o gateway o dimensiona a cada chamada
+    # pelas saídas recentes do papel (até o teto do modelo)
+    rotas = [Rota(
+        provider,
+        model or DEFAULT_MODELS[provider],
+        lambda api_key, limite: criar_modelo(
+            provider, model, temperature, limite or max_tokens, raciocinio, api_key=api_key, **kwargs
+        ),
+        modelo,
+        max_tokens=max_tokens,
+        teto=TETO_MAX_TOKENS.get(provider)
+    )]
+    
+    # Cadeia de failover (providers criados só se forem usados)
+    if fallbacks is None:
+        fallbacks = [{"provedor": p} for p in get_settings().llm_fallback_padrao]
+    
+    for elo in fallbacks:
+        provider_fb = elo["provedor"].lower()
+        modelo_fb = elo.get("modelo")
+        
+        if provider_fb == provider and modelo_fb in (None, model):
+            continue
+        
+        rotas.append(Rota(
+            provider_fb,
+            modelo_fb or DEFAULT_MODELS.get(provider_fb, ""),
+            lambda api_key, limite, p=provider_fb, m=modelo_fb, e=elo: criar_modelo(
+                p, m,
+                e.get("temperatura", temperature),
+                limite or e.get("max_tokens", max_tokens),
+                e.get("raciocinio"),
+                api_key=api_key
+            ),
+            max_tokens=elo.get("max_tokens", max_tokens),
+            teto=TETO_MAX_TOKENS.get(provider_fb)
+        ))
+    
+    # Duplicatas do hedging: mesmo provider ou o secundário configurado
+    secundario = get_settings().hedge_provedor_secundario.lower()
+    criar_secundario = None
+    if secundario and secundario != provider:
+        criar_secundario = lambda: criar_modelo(secundario, None, temperature, max_tokens)
+    
+    return LLMGateway(
+        rotas,
+        papel=papel,
+        criar_secundario=criar_secundario,
+        provider_secundario=secundario or None,
+        assinatura=f"{temperature}|{max_tokens}|{raciocinio}|{sorted(kwargs.items())}"
+    )
+
+
 # ============================================
 # FUNÇÕES AUXILIARES
 # ============================================
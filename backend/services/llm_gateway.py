@@ -0,0 +1,650 @@
+# backend/services/llm_gateway.py
+"""
+Camada de chamadas aos LLMs (gateway).
+
+`get_llm` devolve o chat model do LangChain envolvido por `LLMGateway`,
+que mantém a mesma interface (`ainvoke`, `with_structured_output`).
+
+Failover: cada papel tem uma cadeia ordenada de providers (o principal
+do YAML + `fallback`). Providers com o disjuntor aberto (ver
+disjuntor.py) são pulados na hora, e uma falha de infraestrutura (rate
+limit, timeout, 5xx) passa a chamada ao próximo da cadeia.
+
+Hedging, para a latência de cauda:
+
+- A latência de cada chamada bem-sucedida é registrada por
+  (provider, modelo, papel), numa janela deslizante
+- Se uma chamada passa do percentil `hedge_percentil` dessa latência,
+  uma duplicata é disparada (no mesmo provider ou em
+  `hedge_provedor_secundario`) e vale a que terminar primeiro com
+  sucesso; a perdedora é cancelada
+- Um orçamento limita as duplicatas a `hedge_max_fracao_extra` das
+  chamadas recentes, para o hedging nunca virar uma rajada de custo
+
+Sem amostras suficientes (`hedge_min_amostras`) não há hedging: a
+chamada segue direto, só registrando a latência.
+
+Truncamento: uma resposta de texto cortada por `max_tokens`
+(finish_reason "length"/"max_tokens"/"MAX_TOKENS") é continuada com até
+`continuacao_max_chamadas` chamadas extras, que retomam da cauda do
+texto; as partes são costuradas (sem a sobreposição repetida) numa
+única resposta. O total de tokens de saída de cada resposta é
+registrado por (provider, modelo, papel), e antes de cada chamada
+`dimensionar_max_tokens` usa as saídas recentes para aumentar o
+`max_tokens` dos papéis que costumam estourar o limite configurado
+(voltando a ele quando as saídas diminuem).
+
+Coalescência: chamadas idênticas simultâneas (mesma assinatura de modelo
+e mesmas mensagens) compartilham uma única chamada em voo (ver
+coalescencia.py).
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage
+
+from ..core.config import get_settings
+from ..utils.errors import CircuitOpenError
+from ..utils.logger import logger
+from .disjuntor import obter_disjuntor, segundos_para_sonda
+from .pool_chaves import obter_pool
+from .coalescencia import chave_requisicao, coalescedor, coalescencia_ativa
+from .conversa_retry import preparar_para_provider
+from .retry_policy import RATE_LIMIT, SERVIDOR, TIMEOUT, classificar_erro
+from .saida_estruturada import estruturar
+
+settings = get_settings()
+
+
+Chave = Tuple[str, str, str]
+
+
+# ============================================
+# LATÊNCIA E TOKENS OBSERVADOS
+# ============================================
+
+class MonitorAmostras:
+    """Amostras recentes (latência, tokens de saída) por (provider, modelo, papel)."""
+
+    def __init__(self, janela: int):
+        self._amostras: "defaultdict[Chave, deque]" = defaultdict(lambda: deque(maxlen=janela))
+        self._lock = threading.Lock()
+
+    def registrar(self, chave: Chave, segundos: float) -> None:
+        with self._lock:
+            self._amostras[chave].append(segundos)
+
+    def percentil(self, chave: Chave, p: float, min_amostras: int = 1) -> Optional[float]:
+        """Percentil `p` (0–1) das amostras, ou None com poucas amostras."""
+        with self._lock:
+            amostras = sorted(self._amostras.get(chave, ()))
+
+        if not amostras or len(amostras) < min_amostras:
+            return None
+
+        indice = min(len(amostras) - 1, max(0, math.ceil(p * len(amostras)) - 1))
+        return amostras[indice]
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._amostras.clear()
+
+
+# ============================================
+# ORÇAMENTO DE HEDGING
+# ============================================
+
+class OrcamentoHedge:
+    """Fração de chamadas extras (duplicatas) na janela recente."""
+
+    def __init__(self, janela: int):
+        self._chamadas: deque = deque(maxlen=janela)
+        self._lock = threading.Lock()
+
+    def registrar_chamada(self) -> None:
+        with self._lock:
+            self._chamadas.append(False)
+
+    def tentar_reservar(self, fracao_max: float) -> bool:
+        """Reserva uma duplicata se ela couber no orçamento."""
+        with self._lock:
+            extras = sum(self._chamadas)
+            if (extras + 1) / (len(self._chamadas) + 1) > fracao_max:
+                return False
+            self._chamadas.append(True)
+            return True
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._chamadas.clear()
+
+
+monitor_latencia = MonitorAmostras(settings.hedge_janela)
+monitor_tokens_saida = MonitorAmostras(settings.max_tokens_janela)
+orcamento_hedge = OrcamentoHedge(settings.hedge_janela)
+
+
+# ============================================
+# TRUNCAMENTO E DIMENSIONAMENTO DE max_tokens
+# ============================================
+
+# finish_reason de resposta cortada pelo limite, por provider
+MOTIVOS_TRUNCAMENTO = {"length", "max_tokens", "MAX_TOKENS"}
+
+INSTRUCAO_CONTINUACAO = (
+    "Sua resposta foi cortada pelo limite de tokens. Continue EXATAMENTE de onde "
+    "parou, sem repetir nada e sem introdução ou comentários. O texto termina em:\n\n"
+    "{cauda}"
+)
+
+
+def foi_truncada(resposta) -> bool:
+    """A resposta do chat model parou por atingir `max_tokens`?"""
+    metadados = getattr(resposta, "response_metadata", None) or {}
+    motivo = metadados.get("finish_reason") or metadados.get("stop_reason")
+    return str(motivo) in MOTIVOS_TRUNCAMENTO or str(motivo).endswith("MAX_TOKENS")
+
+
+# Sobreposição mínima para ser tratada como repetição (abaixo disso,
+# "10" + "0 dias" ou "pas" + "sar" são só texto que continua)
+MIN_SOBREPOSICAO = 20
+
+
+def costurar(texto: str, continuacao: str, max_sobreposicao: int = 2000) -> str:
+    """
+    Concatena a continuação removendo o trecho que ela repetir do fim do texto.
+
+    Só conta como repetição uma sobreposição de `MIN_SOBREPOSICAO`
+    caracteres ou mais, ou uma linha inteira repetida; fora disso, as
+    partes são unidas sem alteração.
+    """
+    limite = min(len(texto), len(continuacao), max_sobreposicao)
+    for tamanho in range(limite, 0, -1):
+        trecho = continuacao[:tamanho]
+        if not texto.endswith(trecho):
+            continue
+
+        linha_inteira = trecho.strip() and trecho.endswith("\n") and (
+            tamanho == len(texto) or texto[-tamanho - 1] == "\n"
+        )
+        if tamanho >= MIN_SOBREPOSICAO or linha_inteira:
+            return texto + continuacao[tamanho:]
+
+    return texto + continuacao
+
+
+def texto_resposta(resposta) -> str:
+    conteudo = getattr(resposta, "content", "")
+    if isinstance(conteudo, str):
+        return conteudo
+    return "".join(
+        bloco.get("text", "") if isinstance(bloco, dict) else str(bloco)
+        for bloco in conteudo
+    )
+
+
+def tokens_saida(resposta) -> int:
+    uso = getattr(resposta, "usage_metadata", None) or {}
+    return uso.get("output_tokens", 0)
+
+
+def somar_uso(respostas: list) -> dict:
+    """usage_metadata somado das partes de uma resposta continuada."""
+    total = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for resposta in respostas:
+        uso = getattr(resposta, "usage_metadata", None) or {}
+        for campo in total:
+            total[campo] += uso.get(campo, 0)
+    return total
+
+
+# max_tokens dimensionado é arredondado para cima a múltiplos do passo,
+# para a Rota manter poucos clientes (um por limite)
+PASSO_MAX_TOKENS = 1024
+
+
+def dimensionar_max_tokens(chave: Chave, configurado: int, teto: Optional[int] = None) -> int:
+    """
+    Pré-voo do `max_tokens` de uma chamada.
+
+    Se as saídas recentes do papel (percentil `max_tokens_percentil` das
+    últimas `max_tokens_janela` × `max_tokens_margem`) passam do
+    configurado, aumenta o limite desta chamada até `teto` (o máximo do
+    modelo). Quando as saídas recentes voltam a caber no configurado, a
+    chamada volta a usá-lo; o limite nunca fica abaixo do configurado.
+    """
+    if not settings.max_tokens_dinamico:
+        return configurado
+
+    observado = monitor_tokens_saida.percentil(
+        chave, settings.max_tokens_percentil, settings.max_tokens_min_amostras
+    )
+    if observado is None:
+        return configurado
+
+    estimado = math.ceil(observado * settings.max_tokens_margem)
+    if estimado <= configurado:
+        return configurado
+
+    dimensionado = math.ceil(estimado / PASSO_MAX_TOKENS) * PASSO_MAX_TOKENS
+    if teto:
+        dimensionado = min(dimensionado, teto)
+    if dimensionado <= configurado:
+        return configurado
+
+    logger.debug(
+        f"📏 max_tokens de {chave[2]} ({chave[0]}/{chave[1]}): "
+        f"{configurado} → {dimensionado} (saídas recentes até ~{observado:.0f} tokens)"
+    )
+    return dimensionado
+
+
+# ============================================
+# ROTAS (CADEIA DE PROVIDERS)
+# ============================================
+
+class Rota:
+    """
+    Um elo da cadeia de failover: provider + modelo.
+
+    O modelo é criado sob demanda (`criar(api_key, max_tokens)`), de modo
+    que providers de fallback só são instanciados se chegarem a ser
+    usados; com várias chaves no pool do provider, há um modelo (cliente)
+    por chave (api_key None = chave padrão), e um por `max_tokens`
+    dimensionado (None = o configurado na rota).
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        nome_modelo: str,
+        criar: Callable[[Optional[str], Optional[int]], Any],
+        modelo=None,
+        max_tokens: Optional[int] = None,
+        teto: Optional[int] = None
+    ):
+        self.provider = provider
+        self.nome_modelo = nome_modelo
+        self.max_tokens = max_tokens
+        self.teto = teto
+        self._criar = criar
+        self._modelos = {(None, None): modelo} if modelo is not None else {}
+
+    def modelo(self, api_key: Optional[str] = None, max_tokens: Optional[int] = None):
+        if max_tokens == self.max_tokens:
+            max_tokens = None
+
+        chave = (api_key, max_tokens)
+        if chave not in self._modelos:
+            self._modelos[chave] = self._criar(api_key, max_tokens)
+        return self._modelos[chave]
+
+    def estruturada(self, schema, **kwargs) -> "Rota":
+        """Mesma rota com structured output (estratégia do provider)."""
+        return Rota(
+            self.provider, self.nome_modelo,
+            lambda api_key, max_tokens: estruturar(self.modelo(api_key, max_tokens), schema, **kwargs)
+        )
+
+
+# Erros que indicam problema no provider (contam no disjuntor e
+# disparam o failover); os demais são propagados direto
+CATEGORIAS_FAILOVER = {RATE_LIMIT, TIMEOUT, SERVIDOR}
+
+
+# ============================================
+# GATEWAY
+# ============================================
+
+class LLMGateway:
+    """
+    Chat model com failover entre providers e hedging de chamadas lentas.
+
+    Args:
+        rotas: Cadeia ordenada (a 1ª é o provider principal do papel)
+        papel: Papel da chamada (chave da latência observada)
+        criar_secundario: Fábrica do modelo usado na duplicata do hedge
+                          (None = o próprio modelo da rota)
+        provider_secundario: Provider criado por `criar_secundario`
+        estruturado: Saída estruturada (sem continuação de truncamento)
+        assinatura: Parâmetros do modelo (temperatura, max_tokens, schema...)
+                    que entram na chave de coalescência
+    """
+
+    def __init__(
+        self,
+        rotas: List[Rota],
+        papel: str,
+        criar_secundario: Optional[Callable[[], Any]] = None,
+        provider_secundario: Optional[str] = None,
+        estruturado: bool = False,
+        assinatura: str = ""
+    ):
+        self.rotas = rotas
+        self.papel = papel
+        self.estruturado = estruturado
+        self.assinatura = assinatura
+        self._criar_secundario = criar_secundario
+        self._provider_secundario = provider_secundario
+        self._secundario = None
+
+    @property
+    def provider(self) -> str:
+        return self.rotas[0].provider
+
+    @property
+    def nome_modelo(self) -> str:
+        return self.rotas[0].nome_modelo
+
+    def chave(self, rota: Rota) -> Chave:
+        return (rota.provider, rota.nome_modelo, self.papel)
+
+    def __getattr__(self, nome: str):
+        # Demais atributos/métodos do modelo principal (invoke, model_name, ...)
+        if nome.startswith("_") or nome == "rotas":
+            raise AttributeError(nome)
+        return getattr(self.rotas[0].modelo(), nome)
+
+    def with_structured_output(self, schema, **kwargs) -> "LLMGateway":
+        criar_secundario = None
+        if self._criar_secundario is not None:
+            fabrica = self._criar_secundario
+            criar_secundario = lambda: estruturar(fabrica(), schema, **kwargs)
+
+        return LLMGateway(
+            [rota.estruturada(schema, **kwargs) for rota in self.rotas],
+            self.papel,
+            criar_secundario,
+            self._provider_secundario,
+            estruturado=True,
+            assinatura=f"{self.assinatura}|{schema.__module__}.{schema.__qualname__}|{sorted(kwargs.items())}"
+        )
+
+    async def ainvoke(self, entrada, config=None, **kwargs):
+        if kwargs or not coalescencia_ativa():
+            return await self._invocar(entrada, config, **kwargs)
+
+        rotas = [(rota.provider, rota.nome_modelo) for rota in self.rotas]
+        chave = chave_requisicao(f"{rotas}|{self.assinatura}", entrada)
+        return await coalescedor.executar(
+            chave, lambda: self._invocar(entrada, config), rotulo=self.papel
+        )
+
+    async def _invocar(self, entrada, config=None, **kwargs):
+        resposta, rota = await self._executar_com_failover(
+            lambda modelo, provider: modelo.ainvoke(
+                preparar_para_provider(entrada, provider), config, **kwargs
+            )
+        )
+
+        if self.estruturado:
+            return resposta
+
+        if foi_truncada(resposta) and settings.continuacao_max_chamadas > 0:
+            resposta = await self._continuar(entrada, resposta, config, **kwargs)
+
+        monitor_tokens_saida.registrar(self.chave(rota), tokens_saida(resposta))
+        return resposta
+
+    # ============================================
+    # CONTINUAÇÃO DE RESPOSTAS TRUNCADAS
+    # ============================================
+
+    async def _continuar(self, entrada, resposta, config=None, **kwargs):
+        """
+        Pede a continuação de uma resposta cortada por `max_tokens` e
+        costura as partes (até `continuacao_max_chamadas` chamadas extras).
+        """
+        mensagens = [{"role": "user", "content": entrada}] if isinstance(entrada, str) else list(entrada)
+        texto = texto_resposta(resposta)
+        partes = [resposta]
+
+        for chamada in range(1, settings.continuacao_max_chamadas + 1):
+            logger.warning(
+                f"✂️ {self.papel}: resposta truncada em {len(texto)} caracteres; "
+                f"pedindo continuação ({chamada}/{settings.continuacao_max_chamadas})"
+            )
+
+            cauda = texto[-settings.continuacao_cauda_chars:]
+            conversa = mensagens + [
+                AIMessage(content=texto),
+                {"role": "user", "content": INSTRUCAO_CONTINUACAO.format(cauda=cauda)}
+            ]
+
+            ultima, _ = await self._executar_com_failover(
+                lambda modelo, provider: modelo.ainvoke(
+                    preparar_para_provider(conversa, provider), config, **kwargs
+                )
+            )
+            partes.append(ultima)
+            texto = costurar(texto, texto_resposta(ultima))
+
+            if not foi_truncada(ultima):
+                break
+        else:
+            logger.error(
+                f"❌ {self.papel}: resposta ainda truncada após "
+                f"{settings.continuacao_max_chamadas} continuação(ões)"
+            )
+
+        return ultima.model_copy(update={
+            "content": texto,
+            "usage_metadata": somar_uso(partes),
+            "response_metadata": {**ultima.response_metadata, "continuacoes": len(partes) - 1}
+        })
+
+    # ============================================
+    # FAILOVER
+    # ============================================
+
+    def _max_tokens(self, rota: Rota) -> Optional[int]:
+        """max_tokens desta chamada na rota (None = o configurado)."""
+        if self.estruturado or rota.max_tokens is None:
+            return None
+        return dimensionar_max_tokens(self.chave(rota), rota.max_tokens, rota.teto)
+
+    async def _executar_com_failover(self, operacao: Callable[[Any, str], Awaitable[Any]]):
+        """
+        Percorre a cadeia: pula providers com disjuntor aberto e passa
+        ao próximo quando um falha por rate limit/timeout/5xx. Dentro de
+        um provider com várias chaves, 429/401 numa chave põe a chave em
+        quarentena e repete com outra antes de contar como falha.
+
+        `operacao(modelo, provider)` recebe o provider que vai atender,
+        para montar as mensagens no formato dele.
+
+        Returns:
+            (resultado, rota que respondeu)
+        """
+        erro = None
+
+        for indice, rota in enumerate(self.rotas):
+            disjuntor = obter_disjuntor(rota.provider)
+
+            if not disjuntor.permitir():
+                logger.debug(f"🔌 {self.papel}: {rota.provider} com disjuntor aberto; pulando")
+                continue
+
+            pool = obter_pool(rota.provider)
+            chave = pool.escolher()
+
+            limite = self._max_tokens(rota)
+
+            try:
+                modelo = rota.modelo(chave.valor if chave and pool.tamanho > 1 else None, limite)
+            except Exception as e:
+                disjuntor.liberar()
+                logger.warning(f"⚠️ {self.papel}: {rota.provider} indisponível na cadeia ({e})")
+                erro = erro or e
+                continue
+
+            if indice > 0:
+                logger.warning(f"🔀 Failover: {self.papel} → {rota.provider}/{rota.nome_modelo}")
+
+            inicio = time.monotonic()
+
+            try:
+                resultado = await self._executar_com_chaves(rota, pool, chave, modelo, limite, operacao)
+
+            except asyncio.CancelledError:
+                disjuntor.liberar()
+                raise
+
+            except Exception as e:
+                if classificar_erro(e) not in CATEGORIAS_FAILOVER:
+                    disjuntor.liberar()
+                    raise
+
+                disjuntor.registrar_falha()
+                erro = e
+
+                if indice < len(self.rotas) - 1:
+                    logger.warning(
+                        f"⚠️ {self.papel}: {rota.provider} falhou [{classificar_erro(e)}]; "
+                        "tentando o próximo da cadeia"
+                    )
+                continue
+
+            disjuntor.registrar_sucesso(time.monotonic() - inicio)
+            return resultado, rota
+
+        if erro is not None:
+            raise erro
+
+        providers = [rota.provider for rota in self.rotas]
+        raise CircuitOpenError(providers, retry_after=segundos_para_sonda(providers))
+
+    async def _executar_com_chaves(self, rota: Rota, pool, chave, modelo, limite, operacao):
+        """Executa com a chave escolhida; troca de chave em 429/401 da chave."""
+        tentadas = set()
+
+        while True:
+            try:
+                with pool.usar(chave):
+                    return await self._executar(rota, modelo, operacao)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                tentadas.add(chave)
+                proxima = pool.alternativa(tentadas) if pool.quarentenar_por_erro(chave, e) else None
+                if proxima is None:
+                    raise
+
+                logger.info(f"🔑 {self.papel}: repetindo em {rota.provider} com a chave {proxima.rotulo}")
+                chave = proxima
+                modelo = rota.modelo(chave.valor, limite)
+
+    # ============================================
+    # HEDGING
+    # ============================================
+
+    def _modelo_hedge(self, modelo, provider: str):
+        """(modelo, provider) da duplicata (o secundário é criado sob demanda)."""
+        if self._criar_secundario is None:
+            return modelo, provider
+
+        if self._secundario is None:
+            try:
+                self._secundario = self._criar_secundario()
+            except Exception as e:
+                logger.warning(f"⚠️ Provider secundário indisponível para hedge ({e}); usando o mesmo")
+                self._criar_secundario = None
+                return modelo, provider
+
+        return self._secundario, self._provider_secundario or provider
+
+    def _limiar_hedge(self, chave: Chave) -> Optional[float]:
+        if not settings.hedge_ativo:
+            return None
+
+        limiar = monitor_latencia.percentil(
+            chave, settings.hedge_percentil, settings.hedge_min_amostras
+        )
+        if limiar is None:
+            return None
+
+        return max(limiar, settings.hedge_min_segundos)
+
+    async def _executar(self, rota: Rota, modelo, operacao: Callable[[Any, str], Awaitable[Any]]):
+        chave = self.chave(rota)
+        inicio = time.monotonic()
+        limiar = self._limiar_hedge(chave)
+
+        if limiar is None:
+            resultado = await operacao(modelo, rota.provider)
+            monitor_latencia.registrar(chave, time.monotonic() - inicio)
+            orcamento_hedge.registrar_chamada()
+            return resultado
+
+        principal = asyncio.create_task(operacao(modelo, rota.provider))
+
+        try:
+            concluidas, _ = await asyncio.wait({principal}, timeout=limiar)
+        except asyncio.CancelledError:
+            principal.cancel()
+            raise
+
+        orcamento_hedge.registrar_chamada()
+
+        if concluidas:
+            resultado = principal.result()
+            monitor_latencia.registrar(chave, time.monotonic() - inicio)
+            return resultado
+
+        if not orcamento_hedge.tentar_reservar(settings.hedge_max_fracao_extra):
+            logger.debug(f"Hedge: orçamento esgotado; aguardando {self.papel} sem duplicata")
+            resultado = await principal
+            monitor_latencia.registrar(chave, time.monotonic() - inicio)
+            return resultado
+
+        logger.info(
+            f"🪂 Hedge: {self.papel} ({rota.provider}/{rota.nome_modelo}) passou de "
+            f"{limiar:.1f}s; disparando duplicata"
+        )
+
+        duplicata = asyncio.create_task(operacao(*self._modelo_hedge(modelo, rota.provider)))
+        return await self._primeiro_sucesso(chave, principal, duplicata, inicio)
+
+    async def _primeiro_sucesso(
+        self,
+        chave: Chave,
+        principal: asyncio.Task,
+        duplicata: asyncio.Task,
+        inicio: float
+    ):
+        """Resultado da primeira tarefa bem-sucedida; cancela a outra."""
+        pendentes = {principal, duplicata}
+        erro = None
+
+        try:
+            while pendentes:
+                concluidas, pendentes = await asyncio.wait(
+                    pendentes, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for tarefa in concluidas:
+                    if tarefa.exception() is None:
+                        decorrido = time.monotonic() - inicio
+                        monitor_latencia.registrar(chave, decorrido)
+                        logger.info(
+                            f"🏁 Hedge: venceu a {'duplicata' if tarefa is duplicata else 'original'} "
+                            f"({decorrido:.1f}s)"
+                        )
+                        return tarefa.result()
+
+                    erro = erro or tarefa.exception()
+
+            raise erro
+
+        finally:
+            for tarefa in pendentes:
+                tarefa.cancel()
+            if pendentes:
+                await asyncio.gather(*pendentes, return_exceptions=True)
@@ -0,0 +1,335 @@
+# backend/services/mermaid_mindmap.py
+"""
+Parser de mapas mentais Mermaid (mindmap) com correção automática.
+
+Monta a árvore de nós a partir da indentação e serializa de volta no
+formato canônico dos prompts:
+
+    mindmap
+      {{**Título**}}
+        **Ramo**
+        ::icon(fa fa-book)
+          Sub-ramo
+
+Correções aplicadas no caminho (cada uma registrada em `correcoes`):
+
+- Cercas ```mermaid, texto antes do cabeçalho `mindmap` (ou, sem
+  cabeçalho, antes do título) e texto sem recuo depois da árvore
+- Indentação ímpar/inconsistente (a árvore é montada pela indentação
+  relativa e reindentada em múltiplos de 2)
+- Título central ausente ou com {{...}} desbalanceado
+- Formas Mermaid envolvendo o ramo inteiro (`(texto)`, `((texto))`,
+  `[texto]`, `))texto((`...) e parênteses/colchetes soltos no texto,
+  que quebram a renderização:
+  "Princípios (Lei 14.133/21)" → "Princípios: Lei 14.133/21".
+  Texto antes da forma não é tratado como id: "CF(88)" → "CF: 88"
+- Nós no nível da raiz (viram filhos da raiz)
+
+Erros mecânicos de sintaxe são assim corrigidos localmente, em vez de
+custar uma rodada gerar + revisar. A profundidade máxima é só medida
+(cortar níveis é decisão de conteúdo, fica com o revisor).
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ..utils.logger import logger
+
+
+INDENTACAO = 2
+
+RE_CERCA = re.compile(r"^\s*```")
+RE_ICONE = re.compile(r"^::icon\((?P<icone>[^)]*)\)\s*$")
+RE_TITULO = re.compile(r"^\{\{(?P<texto>.*?)\}\}$")
+
+# Formas Mermaid (abre → fecha), as duplas antes das simples
+PARES_FORMA = (
+    ("((", "))"),
+    ("))", "(("),
+    ("{{", "}}"),
+    ("(", ")"),
+    (")", "("),
+    ("[", "]")
+)
+
+# Grupo entre parênteses/colchetes dentro do texto
+RE_GRUPO = re.compile(r"\s*[(\[](?P<conteudo>[^()\[\]]*)[)\]]")
+RE_GRUPO_FINAL = re.compile(r"\s*[(\[](?P<conteudo>[^()\[\]]*)[)\]](?P<fim>\**)\s*$")
+RE_PROIBIDOS = re.compile(r"[()\[\]{}]")
+
+
+# ============================================
+# ÁRVORE
+# ============================================
+
+@dataclass
+class NoMindmap:
+    """Nó do mapa: texto, ícone opcional e filhos."""
+    texto: str
+    linha: int = 0
+    icone: Optional[str] = None
+    filhos: List["NoMindmap"] = field(default_factory=list)
+
+    def profundidade(self) -> int:
+        """Níveis abaixo deste nó."""
+        if not self.filhos:
+            return 0
+        return 1 + max(f.profundidade() for f in self.filhos)
+
+    def contar(self) -> int:
+        return 1 + sum(f.contar() for f in self.filhos)
+
+
+@dataclass
+class Mindmap:
+    """Resultado do parse: raiz, correções aplicadas e métricas."""
+    raiz: Optional[NoMindmap]
+    correcoes: List[str] = field(default_factory=list)
+
+    @property
+    def profundidade(self) -> int:
+        return self.raiz.profundidade() if self.raiz else 0
+
+    @property
+    def num_nos(self) -> int:
+        return self.raiz.contar() if self.raiz else 0
+
+    def metricas(self) -> dict:
+        return {
+            "profundidade": self.profundidade,
+            "num_nos": self.num_nos,
+            "ramos_principais": len(self.raiz.filhos) if self.raiz else 0,
+            "correcoes": len(self.correcoes)
+        }
+
+    def serializar(self) -> str:
+        """Código Mermaid canônico."""
+        linhas = ["mindmap"]
+        if self.raiz is None:
+            return "\n".join(linhas)
+
+        def escrever(no: NoMindmap, nivel: int) -> None:
+            recuo = " " * (INDENTACAO * nivel)
+            texto = f"{{{{{no.texto}}}}}" if nivel == 1 else no.texto
+            linhas.append(f"{recuo}{texto}")
+            if no.icone:
+                linhas.append(f"{recuo}::icon({no.icone})")
+            for filho in no.filhos:
+                escrever(filho, nivel + 1)
+
+        escrever(self.raiz, 1)
+        return "\n".join(linhas)
+
+
+# ============================================
+# TEXTO DOS NÓS
+# ============================================
+
+def _balanceado(texto: str) -> bool:
+    """Parênteses e colchetes de `texto` fecham na ordem certa?"""
+    pilha = []
+    for caractere in texto:
+        if caractere in "([":
+            pilha.append(caractere)
+        elif caractere in ")]":
+            if not pilha or pilha.pop() != "(["[")]".index(caractere)]:
+                return False
+    return not pilha
+
+
+def _sem_forma(texto: str) -> str:
+    """
+    Remove a forma Mermaid que envolve o nó inteiro ("((texto))" → "texto").
+
+    Só quando abertura e fechamento formam um par e o miolo é
+    balanceado: "(a) e (b)" não é uma forma, e "CF(88)" (texto antes da
+    abertura) fica para o `_sem_parenteses`.
+    """
+    for abre, fecha in PARES_FORMA:
+        if not (texto.startswith(abre) and texto.endswith(fecha)):
+            continue
+        if len(texto) <= len(abre) + len(fecha):
+            continue
+        interno = texto[len(abre):-len(fecha)].strip()
+        if interno and _balanceado(interno):
+            return interno
+    return texto
+
+
+def _sem_parenteses(texto: str) -> str:
+    """
+    Troca grupos (…)/[…] por texto sem delimitadores: no fim do ramo,
+    "A (B)" → "A: B"; no meio, "A (B) C" → "A -B- C".
+    """
+    anterior = None
+    while anterior != texto:
+        anterior = texto
+
+        m = RE_GRUPO_FINAL.search(texto)
+        if m and ":" not in texto[:m.start()]:
+            conteudo = m.group("conteudo").strip()
+            texto = texto[:m.start()] + (f": {conteudo}" if conteudo else "") + m.group("fim")
+            continue
+
+        texto = RE_GRUPO.sub(
+            lambda g: f" -{g.group('conteudo').strip()}-" if g.group("conteudo").strip() else "",
+            texto,
+            count=1
+        )
+
+    return RE_PROIBIDOS.sub("", texto).strip()
+
+
+def _texto_raiz(texto: str, correcoes: List[str]) -> str:
+    m = RE_TITULO.match(texto)
+    if m:
+        interno = m.group("texto").strip()
+    elif texto.startswith("{{") or texto.endswith("}}"):
+        interno = texto.strip("{} ")
+        correcoes.append("Título central com {{...}} desbalanceado")
+    else:
+        interno = _sem_forma(texto)
+        correcoes.append("Título central sem {{...}}")
+
+    limpo = _sem_parenteses(interno)
+    if limpo != interno:
+        correcoes.append("Parênteses/colchetes removidos do título")
+    return limpo
+
+
+def _texto_ramo(texto: str, linha: int, correcoes: List[str]) -> str:
+    sem_forma = _sem_forma(texto)
+    if sem_forma != texto:
+        correcoes.append(f"Linha {linha}: forma Mermaid removida do ramo")
+
+    limpo = _sem_parenteses(sem_forma)
+    if limpo != sem_forma:
+        correcoes.append(f"Linha {linha}: parênteses/colchetes no texto do ramo")
+    return limpo
+
+
+# ============================================
+# PARSE
+# ============================================
+
+def _inicio_sem_cabecalho(linhas: List[str]) -> int:
+    """
+    Sem cabeçalho `mindmap`, índice da linha do título central.
+
+    Pula o preâmbulo do modelo ("Aqui está o mapa:"): o título é a
+    primeira linha {{...}} ou, sem ela, a primeira linha seguida de
+    linhas mais recuadas (com filhos).
+    """
+    preenchidas = [(i, l) for i, l in enumerate(linhas) if l.strip()]
+
+    for i, linha in preenchidas:
+        if RE_TITULO.match(linha.strip()):
+            return i
+
+    for (i, linha), (_j, seguinte) in zip(preenchidas, preenchidas[1:]):
+        recuo = len(linha) - len(linha.lstrip())
+        if len(seguinte) - len(seguinte.lstrip()) > recuo and not linha.rstrip().endswith(":"):
+            return i
+
+    return preenchidas[0][0] if preenchidas else 0
+
+
+def parse_mindmap(codigo: str) -> Mindmap:
+    """
+    Monta a árvore de um código mindmap (tolerante a erros mecânicos).
+
+    Returns:
+        Mindmap com a raiz (None se não houver nós) e as correções feitas
+    """
+    correcoes: List[str] = []
+    linhas = (codigo or "").replace("\t", " " * INDENTACAO).split("\n")
+
+    if any(RE_CERCA.match(l) for l in linhas):
+        correcoes.append("Cercas ``` removidas")
+        linhas = [l for l in linhas if not RE_CERCA.match(l)]
+
+    cabecalho = next((i for i, l in enumerate(linhas) if l.strip() == "mindmap"), None)
+    if cabecalho is None:
+        correcoes.append("Cabeçalho 'mindmap' ausente")
+        cabecalho = _inicio_sem_cabecalho(linhas) - 1
+        if any(l.strip() for l in linhas[:cabecalho + 1]):
+            correcoes.append("Texto antes do mapa removido")
+    elif any(l.strip() for l in linhas[:cabecalho]):
+        correcoes.append("Texto antes do cabeçalho 'mindmap' removido")
+
+    raiz: Optional[NoMindmap] = None
+    pilha: List[tuple] = []  # (recuo, nó)
+    recuos = set()
+    apos_branco = False
+
+    for numero, linha in enumerate(linhas[cabecalho + 1:], cabecalho + 2):
+        texto = linha.strip()
+        if not texto:
+            apos_branco = raiz is not None
+            continue
+
+        recuo = len(linha) - len(linha.lstrip())
+
+        icone = RE_ICONE.match(texto)
+        if icone:
+            if pilha:
+                pilha[-1][1].icone = icone.group("icone").strip()
+            continue
+        if texto.startswith("::"):
+            continue
+
+        # Texto sem recuo depois da árvore (explicação do modelo) encerra
+        # o mapa; com a raiz na coluna 0, só depois de uma linha em branco
+        if raiz is not None and recuo == 0 and (pilha[0][0] > 0 or apos_branco):
+            correcoes.append(f"Linha {numero}: texto após o mapa removido")
+            break
+        apos_branco = False
+
+        recuos.add(recuo)
+
+        if raiz is None:
+            raiz = NoMindmap(_texto_raiz(texto, correcoes), numero)
+            pilha = [(recuo, raiz)]
+            continue
+
+        while len(pilha) > 1 and pilha[-1][0] >= recuo:
+            pilha.pop()
+
+        if pilha[-1][0] >= recuo:
+            correcoes.append(f"Linha {numero}: nó no nível da raiz movido para baixo dela")
+
+        no = NoMindmap(_texto_ramo(texto, numero, correcoes), numero)
+        pilha[-1][1].filhos.append(no)
+        pilha.append((recuo, no))
+
+    if any(r % INDENTACAO for r in recuos):
+        correcoes.append("Indentação reajustada para múltiplos de 2")
+
+    return Mindmap(raiz, correcoes)
+
+
+def corrigir_mindmap(codigo: str, rotulo: str = "mapa") -> str:
+    """
+    Código mindmap corrigido e canônico.
+
+    Sem nós reconhecíveis, devolve o código original (sem cercas) para o
+    revisor avaliar.
+    """
+    try:
+        mapa = parse_mindmap(codigo)
+    except Exception as e:
+        logger.warning(f"⚠️ [{rotulo}] Parser Mermaid falhou ({e}); mantendo o código original")
+        mapa = None
+
+    if mapa is None or mapa.raiz is None:
+        return "\n".join(l for l in (codigo or "").split("\n") if not RE_CERCA.match(l)).strip()
+
+    if mapa.correcoes:
+        logger.info(
+            f"🔧 [{rotulo}] {len(mapa.correcoes)} correção(ões) automática(s) no Mermaid: "
+            f"{'; '.join(mapa.correcoes[:3])}{'...' if len(mapa.correcoes) > 3 else ''}"
+        )
+    logger.debug(f"🌳 [{rotulo}] {mapa.metricas()}")
+
+    return mapa.serializar()
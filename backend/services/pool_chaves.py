@@ -0,0 +1,177 @@
+# backend/services/pool_chaves.py
+"""
+Pool de API keys por provider.
+
+Com várias chaves configuradas (`openai_api_keys`, ...), cada chamada
+usa a chave menos carregada do provider: menos chamadas em andamento e,
+no empate, menos chamadas no último minuto. Cada chave tem seu próprio
+cliente (um chat model por chave na Rota do gateway) e sua contagem de
+uso, então o teto de RPM/TPM cresce com o número de chaves.
+
+Erros por chave deixam a chave em quarentena temporária:
+
+- 429 (rate limit): `pool_quarentena_429_segundos` (ou o Retry-After)
+- 401/403 (chave inválida/revogada): `pool_quarentena_auth_segundos`
+
+e a chamada é refeita com outra chave do mesmo provider antes de contar
+como falha do provider (disjuntor/failover). Com uma única chave, nada
+muda: sem quarentena nem troca.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from ..core.config import get_settings
+from ..utils.logger import logger
+from .retry_policy import RATE_LIMIT, classificar_erro, extrair_retry_after, status_http
+
+settings = get_settings()
+
+JANELA_USO_SEGUNDOS = 60.0
+
+
+class ChaveAPI:
+    """Uma chave do pool: carga atual, uso recente e quarentena."""
+
+    def __init__(self, valor: str, indice: int):
+        self.valor = valor
+        self.rotulo = f"#{indice + 1} (…{valor[-4:]})"
+        self.em_andamento = 0
+        self.quarentena_ate = 0.0
+        self.usos: deque = deque()
+
+    def usos_recentes(self, agora: float) -> int:
+        while self.usos and agora - self.usos[0] > JANELA_USO_SEGUNDOS:
+            self.usos.popleft()
+        return len(self.usos)
+
+    def em_quarentena(self, agora: float) -> bool:
+        return agora < self.quarentena_ate
+
+
+class PoolChaves:
+    """Chaves de um provider com seleção pela menor carga."""
+
+    def __init__(self, provider: str, valores: List[str]):
+        self.provider = provider
+        self.chaves = [ChaveAPI(valor, i) for i, valor in enumerate(valores)]
+        self._lock = threading.Lock()
+
+    @property
+    def tamanho(self) -> int:
+        return len(self.chaves)
+
+    def _menos_carregada(self, chaves: List[ChaveAPI], agora: float) -> ChaveAPI:
+        return min(chaves, key=lambda c: (c.em_andamento, c.usos_recentes(agora)))
+
+    def escolher(self) -> Optional[ChaveAPI]:
+        """
+        Chave menos carregada fora de quarentena.
+
+        Com todas em quarentena, devolve a que sai primeiro dela (None só
+        com o pool vazio).
+        """
+        with self._lock:
+            if not self.chaves:
+                return None
+
+            agora = time.monotonic()
+            livres = [c for c in self.chaves if not c.em_quarentena(agora)]
+            if not livres:
+                return min(self.chaves, key=lambda c: c.quarentena_ate)
+
+            return self._menos_carregada(livres, agora)
+
+    def alternativa(self, tentadas: set) -> Optional[ChaveAPI]:
+        """Outra chave livre (fora de quarentena e de `tentadas`), se houver."""
+        with self._lock:
+            agora = time.monotonic()
+            livres = [
+                c for c in self.chaves
+                if c not in tentadas and not c.em_quarentena(agora)
+            ]
+            return self._menos_carregada(livres, agora) if livres else None
+
+    @contextmanager
+    def usar(self, chave: Optional[ChaveAPI]):
+        """Conta a chamada na carga e no uso recente da chave."""
+        if chave is None:
+            yield
+            return
+
+        with self._lock:
+            chave.em_andamento += 1
+            chave.usos.append(time.monotonic())
+        try:
+            yield
+        finally:
+            with self._lock:
+                chave.em_andamento -= 1
+
+    def quarentenar_por_erro(self, chave: Optional[ChaveAPI], erro: Exception) -> bool:
+        """
+        Põe a chave em quarentena se o erro for dela (429, 401/403).
+
+        Returns:
+            True se vale tentar outra chave do pool
+        """
+        if chave is None or self.tamanho < 2:
+            return False
+
+        status = status_http(erro)
+        if status in (401, 403):
+            segundos = settings.pool_quarentena_auth_segundos
+            motivo = f"HTTP {status}"
+        elif classificar_erro(erro) == RATE_LIMIT:
+            segundos = extrair_retry_after(erro) or settings.pool_quarentena_429_segundos
+            motivo = "rate limit"
+        else:
+            return False
+
+        with self._lock:
+            chave.quarentena_ate = max(chave.quarentena_ate, time.monotonic() + segundos)
+
+        logger.warning(
+            f"🔑 {self.provider}: chave {chave.rotulo} em quarentena por {segundos:.0f}s ({motivo})"
+        )
+        return True
+
+    def estado(self) -> List[dict]:
+        with self._lock:
+            agora = time.monotonic()
+            return [
+                {
+                    "chave": c.rotulo,
+                    "em_andamento": c.em_andamento,
+                    "chamadas_ultimo_minuto": c.usos_recentes(agora),
+                    "quarentena_segundos": round(max(0.0, c.quarentena_ate - agora), 1)
+                }
+                for c in self.chaves
+            ]
+
+
+# ============================================
+# REGISTRO GLOBAL
+# ============================================
+
+_pools: Dict[str, PoolChaves] = {}
+_pools_lock = threading.Lock()
+
+
+def obter_pool(provider: str) -> PoolChaves:
+    """Pool de chaves do provider (criado na 1ª chamada, a partir das settings)."""
+    provider = provider.lower()
+    with _pools_lock:
+        if provider not in _pools:
+            _pools[provider] = PoolChaves(provider, settings.get_provider_keys(provider))
+        return _pools[provider]
+
+
+def estado_pools() -> Dict[str, List[dict]]:
+    """Carga e quarentena de cada chave (só providers com mais de uma chave)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.provider: pool.estado() for pool in pools if pool.tamanho > 1}
@@ -0,0 +1,348 @@
+# backend/services/retry_policy.py
+"""
+Política de retry compartilhada para chamadas a LLMs.
+
+- Classifica erros (rate limit, timeout, 5xx, validação, cliente)
+- Backoff exponencial com "full jitter": espera ~ U(0, min(max, base * 2^n))
+- Respeita o header Retry-After do provider quando presente
+- Orçamento de retries por job, compartilhado por todas as tarefas do job
+
+O jitter evita que tópicos/partes paralelos que falharam juntos
+voltem a chamar a API no mesmo instante (tempestade de retries → 429).
+"""
+
+import asyncio
+import functools
+import json
+import random
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from pydantic import ValidationError
+
+from ..core.config import get_settings
+from ..utils.errors import (
+    CircuitOpenError,
+    RateLimitError,
+    TimeoutError as AppTimeoutError,
+    ValidationError as AppValidationError
+)
+from ..utils.logger import logger
+
+
+# ============================================
+# CLASSIFICAÇÃO DE ERROS
+# ============================================
+
+RATE_LIMIT = "rate_limit"
+TIMEOUT = "timeout"
+SERVIDOR = "servidor"
+VALIDACAO = "validacao"
+CLIENTE = "cliente"
+DESCONHECIDO = "desconhecido"
+
+CATEGORIAS_RETENTAVEIS = {RATE_LIMIT, TIMEOUT, SERVIDOR, VALIDACAO, DESCONHECIDO}
+
+# Status HTTP citado na mensagem ("Error code: 503", "HTTP 429", "status_code=502");
+# números soltos ("artigo 500", "0.503s") não contam
+RE_STATUS_MENSAGEM = re.compile(
+    r"\b(?:status(?:[ _]code)?|http|error code|code)\b\W{0,3}([45]\d\d)\b",
+    re.IGNORECASE
+)
+
+
+def status_http(erro: Exception) -> Optional[int]:
+    """Extrai status HTTP de exceções dos SDKs (openai, anthropic, google, httpx)."""
+    for attr in ("status_code", "code", "http_status"):
+        valor = getattr(erro, attr, None)
+        if isinstance(valor, int) and 100 <= valor < 600:
+            return valor
+
+    response = getattr(erro, "response", None)
+    valor = getattr(response, "status_code", None)
+    if isinstance(valor, int):
+        return valor
+
+    return None
+
+
+def status_na_mensagem(mensagem: str) -> Optional[int]:
+    """Status HTTP citado no texto do erro (SDKs que só o põem na mensagem)."""
+    encontrado = RE_STATUS_MENSAGEM.search(mensagem)
+    return int(encontrado.group(1)) if encontrado else None
+
+
+def classificar_erro(erro: Exception) -> str:
+    """
+    Classifica um erro de chamada a LLM.
+
+    Returns:
+        str: rate_limit | timeout | servidor | validacao | cliente | desconhecido
+    """
+    if isinstance(erro, RateLimitError):
+        return RATE_LIMIT
+
+    if isinstance(erro, CircuitOpenError):
+        return SERVIDOR
+
+    if isinstance(erro, (AppTimeoutError, asyncio.TimeoutError, TimeoutError)):
+        return TIMEOUT
+
+    if isinstance(erro, (ValidationError, AppValidationError, json.JSONDecodeError)):
+        return VALIDACAO
+
+    if type(erro).__name__ in ("OutputParserException", "JSONDecodeError"):
+        return VALIDACAO
+
+    nome = type(erro).__name__.lower()
+    mensagem = str(erro).lower()
+
+    status = status_http(erro)
+    if status is None:
+        status = status_na_mensagem(mensagem)
+
+    if status is not None:
+        if status == 429:
+            return RATE_LIMIT
+        if status in (408, 504):
+            return TIMEOUT
+        if status >= 500 or status == 529:
+            return SERVIDOR
+        if 400 <= status < 500:
+            return CLIENTE
+
+    if "ratelimit" in nome or any(
+        termo in mensagem
+        for termo in ("rate limit", "rate_limit", "quota", "resource exhausted", "resource_exhausted")
+    ):
+        return RATE_LIMIT
+
+    if "timeout" in nome or any(termo in mensagem for termo in ("timed out", "timeout", "deadline")):
+        return TIMEOUT
+
+    if any(
+        termo in mensagem
+        for termo in ("overloaded", "unavailable", "internal server error", "bad gateway")
+    ):
+        return SERVIDOR
+
+    return DESCONHECIDO
+
+
+def extrair_retry_after(erro: Exception) -> Optional[float]:
+    """
+    Extrai o tempo de espera sugerido pelo provider (em segundos).
+
+    Procura, nesta ordem: atributo `retry_after`, headers `retry-after-ms`
+    e `retry-after` da resposta HTTP, e o texto "retry in Xs" (Gemini).
+    """
+    valor = getattr(erro, "retry_after", None)
+    if isinstance(valor, (int, float)) and valor >= 0:
+        return float(valor)
+
+    response = getattr(erro, "response", None)
+    headers = getattr(response, "headers", None)
+
+    if headers:
+        try:
+            ms = headers.get("retry-after-ms")
+            if ms is not None:
+                return float(ms) / 1000
+
+            valor = headers.get("retry-after")
+            if valor is not None:
+                try:
+                    return max(0.0, float(valor))
+                except ValueError:
+                    data = parsedate_to_datetime(valor)
+                    return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+        except Exception:
+            pass
+
+    match = re.search(r'retry in ([\d.]+)\s*s', str(erro), flags=re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+
+    return None
+
+
+# ============================================
+# ORÇAMENTO DE RETRIES POR JOB
+# ============================================
+
+class OrcamentoRetry:
+    """
+    Limite de retries compartilhado por todas as chamadas de um job.
+
+    Evita que um provider degradado multiplique o custo do job com
+    retries em todos os tópicos/partes ao mesmo tempo.
+    """
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max_retries
+        self.usados = 0
+
+    @property
+    def restantes(self) -> int:
+        return max(0, self.max_retries - self.usados)
+
+    def consumir(self) -> bool:
+        """Consome um retry do orçamento. Retorna False se esgotado."""
+        if self.usados >= self.max_retries:
+            return False
+        self.usados += 1
+        return True
+
+
+_orcamento_atual: ContextVar[Optional[OrcamentoRetry]] = ContextVar("orcamento_retry", default=None)
+
+
+@contextmanager
+def orcamento_job(max_retries: Optional[int] = None):
+    """
+    Define o orçamento de retries do job corrente.
+
+    Tarefas asyncio criadas dentro do bloco herdam o orçamento
+    (contextvars), inclusive os workers dos pools.
+    """
+    if max_retries is None:
+        max_retries = get_settings().retry_orcamento_por_job
+
+    orcamento = OrcamentoRetry(max_retries)
+    token = _orcamento_atual.set(orcamento)
+    try:
+        yield orcamento
+    finally:
+        _orcamento_atual.reset(token)
+
+
+def com_orcamento_job(funcao: Callable[..., Awaitable[Any]]):
+    """
+    Decorator de rota/job: cada chamada roda em `orcamento_job()`.
+
+    Mantém a assinatura da função (FastAPI lê os parâmetros dela).
+    """
+    @functools.wraps(funcao)
+    async def com_orcamento(*args, **kwargs):
+        with orcamento_job():
+            return await funcao(*args, **kwargs)
+
+    return com_orcamento
+
+
+def orcamento_atual() -> Optional[OrcamentoRetry]:
+    """Retorna o orçamento do job corrente (ou None fora de um job)."""
+    return _orcamento_atual.get()
+
+
+# ============================================
+# POLÍTICA DE RETRY
+# ============================================
+
+class PoliticaRetry:
+    """
+    Backoff exponencial com full jitter, Retry-After e orçamento por job.
+
+    Args:
+        max_tentativas: Total de tentativas (1 = sem retry)
+        base: Espera base em segundos (tentativa 1 → até `base`)
+        maximo: Teto da espera em segundos
+    """
+
+    def __init__(
+        self,
+        max_tentativas: int = 3,
+        base: Optional[float] = None,
+        maximo: Optional[float] = None
+    ):
+        settings = get_settings()
+        self.max_tentativas = max_tentativas
+        self.base = settings.retry_base_segundos if base is None else base
+        self.maximo = settings.retry_max_segundos if maximo is None else maximo
+
+    def calcular_espera(self, tentativa: int, erro: Optional[Exception] = None) -> float:
+        """
+        Calcula a espera antes da próxima tentativa.
+
+        Args:
+            tentativa: Número da tentativa que acabou de falhar (1, 2, ...)
+            erro: Erro ocorrido (para Retry-After e classificação)
+        """
+        if erro is not None:
+            retry_after = extrair_retry_after(erro)
+            if retry_after is not None:
+                # Respeita o provider, com um pequeno jitter para dessincronizar
+                return min(self.maximo, retry_after) + random.uniform(0, self.base)
+
+        teto = min(self.maximo, self.base * (2 ** (tentativa - 1)))
+
+        # Rate limit: espera pelo menos metade do teto
+        if erro is not None and classificar_erro(erro) == RATE_LIMIT:
+            return random.uniform(teto / 2, teto)
+
+        return random.uniform(0, teto)
+
+    def deve_retentar(self, erro: Exception, tentativa: int) -> bool:
+        """Decide se vale tentar de novo (categoria, tentativas e orçamento)."""
+        if tentativa >= self.max_tentativas:
+            return False
+
+        categoria = classificar_erro(erro)
+        if categoria not in CATEGORIAS_RETENTAVEIS:
+            logger.warning(f"⚠️ Erro não recuperável ({categoria}): {erro}")
+            return False
+
+        orcamento = orcamento_atual()
+        if orcamento is not None and not orcamento.consumir():
+            logger.warning(f"⚠️ Orçamento de retries do job esgotado ({orcamento.max_retries})")
+            return False
+
+        return True
+
+    async def aguardar(self, tentativa: int, erro: Optional[Exception] = None) -> float:
+        """Dorme o tempo de backoff e retorna a espera aplicada."""
+        espera = self.calcular_espera(tentativa, erro)
+        if espera > 0:
+            logger.info(
+                f"⏳ Retry em {espera:.1f}s"
+                + (f" ({classificar_erro(erro)})" if erro is not None else "")
+            )
+            await asyncio.sleep(espera)
+        return espera
+
+    async def executar(
+        self,
+        operacao: Callable[[], Awaitable[Any]],
+        descricao: str = "chamada"
+    ) -> Any:
+        """
+        Executa `operacao` com retry conforme a política.
+
+        Args:
+            operacao: Função sem argumentos que retorna uma coroutine nova
+                      a cada chamada
+            descricao: Texto usado nos logs
+
+        Raises:
+            A última exceção, se as tentativas se esgotarem
+        """
+        tentativa = 1
+        while True:
+            try:
+                return await operacao()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not self.deve_retentar(e, tentativa):
+                    raise
+
+                logger.warning(
+                    f"⚠️ {descricao}: falha na tentativa {tentativa}/{self.max_tentativas} "
+                    f"[{classificar_erro(e)}]: {e}"
+                )
+                await self.aguardar(tentativa, e)
+                tentativa += 1
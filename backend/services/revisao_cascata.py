@@ -0,0 +1,172 @@
+# backend/services/revisao_cascata.py
+"""
+Revisão em cascata (guias e mapas).
+
+Um revisor rápido/barato (`revisor_rapido` no YAML) avalia primeiro:
+
+- Nota >= `aprovar_acima` e aprovado, ou nota <= `reprovar_abaixo` e
+  reprovado: a decisão é tomada na hora, sem o revisor forte
+- Faixa intermediária (ou veredito incoerente com a nota): escala para
+  o revisor configurado em `revisor` (o forte)
+- Falha do revisor rápido: escala direto (sem retries no rápido)
+
+`RevisorCascata` tem a mesma interface do LLM estruturado (`ainvoke`),
+então entra no lugar dele sem mudar as chamadas. As taxas de escalação
+por papel ficam em `estatisticas_cascata()` (exposto no /health).
+"""
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional
+
+from ..core.config import get_settings
+from ..utils.logger import logger
+from .llm_factory import get_llm
+
+settings = get_settings()
+
+
+# ============================================
+# TELEMETRIA
+# ============================================
+
+_contadores: "defaultdict[str, Dict[str, int]]" = defaultdict(
+    lambda: {"revisoes": 0, "decididas_rapido": 0, "escaladas": 0, "falhas_rapido": 0}
+)
+_contadores_lock = threading.Lock()
+
+
+def _registrar(papel: str, evento: str) -> None:
+    with _contadores_lock:
+        contador = _contadores[papel]
+        contador["revisoes"] += 1
+        contador[evento] += 1
+
+
+def estatisticas_cascata() -> Dict[str, dict]:
+    """Revisões por papel e taxa de escalação ao revisor forte."""
+    with _contadores_lock:
+        return {
+            papel: {
+                **contador,
+                "taxa_escalacao": round(
+                    (contador["escaladas"] + contador["falhas_rapido"]) / contador["revisoes"], 3
+                ) if contador["revisoes"] else 0.0
+            }
+            for papel, contador in _contadores.items()
+        }
+
+
+def limpar_estatisticas_cascata() -> None:
+    with _contadores_lock:
+        _contadores.clear()
+
+
+# ============================================
+# REVISOR EM CASCATA
+# ============================================
+
+class RevisorCascata:
+    """
+    Revisor estruturado em dois níveis (rápido → forte).
+
+    Args:
+        rapido: LLM estruturado do revisor rápido
+        forte: LLM estruturado do revisor forte
+        nota: Avaliação → nota (0–10)
+        papel: Papel da revisão (chave da telemetria)
+        aprovar_acima: Nota a partir da qual o rápido aprova sozinho
+        reprovar_abaixo: Nota até a qual o rápido reprova sozinho
+    """
+
+    def __init__(
+        self,
+        rapido,
+        forte,
+        nota: Callable[[Any], float],
+        papel: str,
+        aprovar_acima: float,
+        reprovar_abaixo: float
+    ):
+        self.rapido = rapido
+        self.forte = forte
+        self.nota = nota
+        self.papel = papel
+        self.aprovar_acima = aprovar_acima
+        self.reprovar_abaixo = reprovar_abaixo
+
+    def decidida(self, avaliacao) -> bool:
+        """A avaliação do rápido está fora da faixa de incerteza?"""
+        nota = self.nota(avaliacao)
+        if avaliacao.aprovado:
+            return nota >= self.aprovar_acima
+        return nota <= self.reprovar_abaixo
+
+    async def ainvoke(self, entrada, config=None, **kwargs):
+        try:
+            avaliacao = await self.rapido.ainvoke(entrada, config, **kwargs)
+        except Exception as e:
+            logger.warning(f"⚠️ Cascata {self.papel}: revisor rápido falhou ({e}); escalando")
+            _registrar(self.papel, "falhas_rapido")
+            return await self.forte.ainvoke(entrada, config, **kwargs)
+
+        if self.decidida(avaliacao):
+            logger.debug(
+                f"⚡ Cascata {self.papel}: decidida no revisor rápido "
+                f"(nota {self.nota(avaliacao):.1f})"
+            )
+            _registrar(self.papel, "decididas_rapido")
+            return avaliacao
+
+        logger.info(
+            f"⬆️ Cascata {self.papel}: nota {self.nota(avaliacao):.1f} na faixa "
+            f"({self.reprovar_abaixo:.1f}, {self.aprovar_acima:.1f}); escalando ao revisor forte"
+        )
+        _registrar(self.papel, "escaladas")
+        return await self.forte.ainvoke(entrada, config, **kwargs)
+
+
+def criar_revisor(
+    llm_forte,
+    schema,
+    nota: Callable[[Any], float],
+    papel: str,
+    rapido: Optional[dict] = None
+):
+    """
+    LLM estruturado do revisor: em cascata se houver `rapido`.
+
+    Args:
+        llm_forte: LLM do revisor configurado (já com failover)
+        schema: Modelo pydantic da avaliação
+        nota: Avaliação → nota (0–10)
+        papel: Papel da revisão (ex: "guias_revisor")
+        rapido: Config do revisor rápido ({provedor, modelo, temperatura,
+                max_tokens, raciocinio, aprovar_acima, reprovar_abaixo}) ou None
+
+    Returns:
+        `llm_forte.with_structured_output(schema)` ou um RevisorCascata
+    """
+    forte = llm_forte.with_structured_output(schema)
+
+    if not rapido or not settings.cascata_ativa:
+        return forte
+
+    llm_rapido = get_llm(
+        provider=rapido["provedor"],
+        model=rapido.get("modelo"),
+        temperature=rapido.get("temperatura", 0.2),
+        max_tokens=rapido.get("max_tokens", 4096),
+        raciocinio=rapido.get("raciocinio"),
+        papel=f"{papel}_rapido",
+        fallbacks=[]
+    )
+
+    return RevisorCascata(
+        llm_rapido.with_structured_output(schema),
+        forte,
+        nota=nota,
+        papel=papel,
+        aprovar_acima=rapido.get("aprovar_acima", settings.cascata_aprovar_acima),
+        reprovar_abaixo=rapido.get("reprovar_abaixo", settings.cascata_reprovar_abaixo)
+    )
@@ -0,0 +1,87 @@
+# backend/services/revisao_delta.py
+"""
+Re-revisão delta (guias e mapas).
+
+Num retry o revisor não reaplica a rubrica inteira: recebe a lista
+numerada dos problemas da revisão anterior e devolve só quais foram
+corrigidos, as regressões graves e o veredito. `aplicar_delta` converte
+essa resposta de volta na avaliação completa do pipeline (problemas =
+anteriores não corrigidos + regressões).
+
+Os trechos de prompt comuns aos dois revisores ficam aqui; cada
+pipeline monta o seu DELTA_SYSTEM_PROMPT/DELTA_USER_PROMPT_TEMPLATE com
+eles (ver agents/*/prompts/revisor_prompts.py).
+"""
+
+from typing import List, Type
+
+from pydantic import BaseModel
+
+
+# ============================================
+# TRECHOS DE PROMPT COMUNS
+# ============================================
+
+DELTA_INSTRUCAO = """Você NÃO deve refazer a avaliação completa.
+Verifique APENAS:"""
+
+DELTA_CRITERIO_APROVACAO = """Aprove (true) se todos os problemas de gravidade crítica/alta foram corrigidos
+e não há regressões graves."""
+
+DELTA_PROBLEMAS_ANTERIORES = """**PROBLEMAS APONTADOS NA REVISÃO ANTERIOR:**
+{problemas_anteriores}"""
+
+DELTA_PEDIDO = "Indique pelo número quais problemas foram corrigidos, liste regressões graves (se houver)"
+
+
+# ============================================
+# PROBLEMAS ANTERIORES E CONVERSÃO
+# ============================================
+
+def formatar_problemas(problemas: List[dict]) -> str:
+    """Lista numerada dos problemas da revisão anterior."""
+    return "\n".join(
+        f"{i}. [{p.get('gravidade', '').upper()}] {p.get('categoria', '')}: "
+        f"{p.get('descricao', '')} (local: {p.get('localizacao', '-')})"
+        for i, p in enumerate(problemas, 1)
+    )
+
+
+def aplicar_delta(
+    delta: BaseModel,
+    problemas_anteriores: List[dict],
+    modelo: Type[BaseModel],
+    campo_nota: str,
+    campo_texto: str
+) -> BaseModel:
+    """
+    Converte a re-revisão numa avaliação completa (`modelo`).
+
+    Args:
+        delta: Resposta da re-revisão (problemas_corrigidos, regressoes,
+               aprovado, nota, comentario)
+        problemas_anteriores: Problemas da revisão anterior, na ordem
+                              em que foram numerados no prompt
+        modelo: Schema da avaliação completa do pipeline
+        campo_nota: Campo da nota em `delta` e `modelo`
+                    ("pontuacao_geral" nos guias, "nota_geral" nos mapas)
+        campo_texto: Campo do texto livre em `modelo`
+                     ("observacoes" nos guias, "justificativa" nos mapas)
+    """
+    corrigidos = set(delta.problemas_corrigidos)
+    pendentes = [
+        p for i, p in enumerate(problemas_anteriores, 1)
+        if i not in corrigidos
+    ]
+
+    return modelo(**{
+        "aprovado": delta.aprovado,
+        campo_nota: getattr(delta, campo_nota),
+        "problemas": pendentes + [r.model_dump() for r in delta.regressoes],
+        "sugestoes_melhoria": [],
+        campo_texto: (
+            f"[Revisão delta] {len(problemas_anteriores) - len(pendentes)}/"
+            f"{len(problemas_anteriores)} problema(s) corrigido(s), "
+            f"{len(delta.regressoes)} regressão(ões). {delta.comentario}"
+        )
+    })
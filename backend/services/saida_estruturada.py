@@ -0,0 +1,262 @@
+# backend/services/saida_estruturada.py
+"""
+Estratégias de structured output por provider.
+
+- "ferramenta": tool calling (padrão da Anthropic, Gemini e DeepSeek)
+- "json_schema": JSON Schema nativo do provider (OpenAI)
+- "json": JSON mode (OpenAI/DeepSeek) ou JSON pedido no prompt (demais),
+  com o schema no prompt e validação local
+
+A estratégia de cada provider vem de `saida_estruturada_estrategia`
+(ex.: {"anthropic": "json"}); sem entrada, vale `ESTRATEGIA_PADRAO`.
+
+Em qualquer estratégia, uma resposta malformada (sem tool call, JSON
+quebrado ou truncado) passa primeiro pelo reparo local
+(`repair_structured_output`). Só se o reparo falhar a chamada levanta
+`SaidaEstruturadaInvalida` (erro de validação → a política de retry
+refaz a chamada), em vez de devolver None ao node.
+
+Modo benchmark (`saida_estruturada_benchmark`): as chamadas alternam
+entre as estratégias suportadas pelo provider, e
+`estatisticas_saida_estruturada()` (exposto no /health) compara
+latência média, taxa de falha e de reparo por estratégia.
+"""
+
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import get_settings
+from ..utils.errors import ValidationError
+from ..utils.llm_validators import repair_structured_output
+from ..utils.logger import logger
+
+settings = get_settings()
+
+
+FERRAMENTA = "ferramenta"
+JSON_SCHEMA = "json_schema"
+JSON = "json"
+
+# Estratégias suportadas, na ordem de preferência do provider
+SUPORTADAS = {
+    "openai": (JSON_SCHEMA, FERRAMENTA, JSON),
+    "anthropic": (FERRAMENTA, JSON),
+    "gemini": (FERRAMENTA, JSON),
+    "deepseek": (FERRAMENTA, JSON)
+}
+
+ESTRATEGIA_PADRAO = {provider: estrategias[0] for provider, estrategias in SUPORTADAS.items()}
+
+# Providers com parâmetro `method` no with_structured_output / JSON mode na API
+COM_METODO = {"openai", "deepseek"}
+
+PROVIDER_POR_CLASSE = {
+    "ChatOpenAI": "openai",
+    "ChatAnthropic": "anthropic",
+    "ChatGoogleGenerativeAI": "gemini",
+    "ChatDeepSeek": "deepseek"
+}
+
+INSTRUCAO_JSON = (
+    "Responda APENAS com um objeto JSON válido (sem texto fora dele e sem "
+    "cercas ```), seguindo este JSON Schema:\n{schema}"
+)
+
+
+class SaidaEstruturadaInvalida(ValidationError):
+    """Structured output irrecuperável (nem o reparo local resolveu)."""
+    def __init__(self, schema: str, estrategia: str, motivo: str):
+        super().__init__(
+            f"Saída estruturada inválida ({schema}, {estrategia}): {motivo}",
+            {"schema": schema, "estrategia": estrategia}
+        )
+
+
+# ============================================
+# TELEMETRIA
+# ============================================
+
+_estatisticas: "defaultdict[Tuple[str, str], Dict[str, float]]" = defaultdict(
+    lambda: {"chamadas": 0, "falhas": 0, "reparadas": 0, "segundos": 0.0}
+)
+_estatisticas_lock = threading.Lock()
+_rodizio = defaultdict(itertools.count)
+
+
+def _registrar(provider: str, estrategia: str, segundos: float, evento: Optional[str] = None) -> None:
+    with _estatisticas_lock:
+        estatistica = _estatisticas[(provider, estrategia)]
+        estatistica["chamadas"] += 1
+        estatistica["segundos"] += segundos
+        if evento:
+            estatistica[evento] += 1
+
+
+def estatisticas_saida_estruturada() -> Dict[str, dict]:
+    """Chamadas, latência média e taxas de falha/reparo por provider/estratégia."""
+    with _estatisticas_lock:
+        return {
+            f"{provider}/{estrategia}": {
+                "chamadas": int(e["chamadas"]),
+                "latencia_media": round(e["segundos"] / e["chamadas"], 2),
+                "taxa_falha": round(e["falhas"] / e["chamadas"], 3),
+                "taxa_reparo": round(e["reparadas"] / e["chamadas"], 3)
+            }
+            for (provider, estrategia), e in _estatisticas.items()
+            if e["chamadas"]
+        }
+
+
+def limpar_estatisticas_saida_estruturada() -> None:
+    with _estatisticas_lock:
+        _estatisticas.clear()
+
+
+# ============================================
+# ESCOLHA DA ESTRATÉGIA
+# ============================================
+
+def estrategia_configurada(provider: str) -> str:
+    """Estratégia do provider (settings), caindo na padrão se não suportada."""
+    estrategia = settings.saida_estruturada_estrategia.get(provider, ESTRATEGIA_PADRAO[provider])
+
+    if estrategia not in SUPORTADAS[provider]:
+        logger.warning(
+            f"⚠️ Estratégia '{estrategia}' não suportada por {provider} "
+            f"(opções: {', '.join(SUPORTADAS[provider])}); usando '{ESTRATEGIA_PADRAO[provider]}'"
+        )
+        return ESTRATEGIA_PADRAO[provider]
+
+    return estrategia
+
+
+def escolher_estrategia(provider: str) -> str:
+    """Estratégia da próxima chamada (rodízio no modo benchmark)."""
+    if settings.saida_estruturada_benchmark:
+        estrategias = SUPORTADAS[provider]
+        return estrategias[next(_rodizio[provider]) % len(estrategias)]
+    return estrategia_configurada(provider)
+
+
+# ============================================
+# MODELO ESTRUTURADO
+# ============================================
+
+def _texto_bruto(raw) -> str:
+    """Texto (ou args da tool call) de uma resposta bruta, para o reparo."""
+    if raw is None:
+        return ""
+
+    for chamada in getattr(raw, "tool_calls", None) or []:
+        if chamada.get("args"):
+            return json.dumps(chamada["args"], ensure_ascii=False)
+
+    for chamada in getattr(raw, "invalid_tool_calls", None) or []:
+        if chamada.get("args"):
+            return chamada["args"]
+
+    conteudo = getattr(raw, "content", raw)
+    if isinstance(conteudo, list):
+        return "".join(
+            bloco.get("text", "") if isinstance(bloco, dict) else str(bloco)
+            for bloco in conteudo
+        )
+    return str(conteudo)
+
+
+class ModeloEstruturado:
+    """
+    Chat model com structured output pela estratégia do provider.
+
+    Args:
+        modelo: Chat model nativo do LangChain
+        provider: Provider do modelo
+        schema: Modelo pydantic da saída
+    """
+
+    def __init__(self, modelo, provider: str, schema, **kwargs):
+        self.modelo = modelo
+        self.provider = provider
+        self.schema = schema
+        self._kwargs = kwargs
+        self._runnables: Dict[str, Any] = {}
+
+    def _runnable(self, estrategia: str):
+        if estrategia not in self._runnables:
+            if estrategia == JSON:
+                runnable = self.modelo
+                if self.provider in COM_METODO:
+                    runnable = self.modelo.bind(response_format={"type": "json_object"})
+            else:
+                metodo = {"method": "function_calling" if estrategia == FERRAMENTA else "json_schema"}
+                runnable = self.modelo.with_structured_output(
+                    self.schema,
+                    include_raw=True,
+                    **(metodo if self.provider in COM_METODO else {}),
+                    **self._kwargs
+                )
+            self._runnables[estrategia] = runnable
+        return self._runnables[estrategia]
+
+    def _com_instrucao_json(self, entrada):
+        instrucao = INSTRUCAO_JSON.format(
+            schema=json.dumps(self.schema.model_json_schema(), ensure_ascii=False)
+        )
+        if isinstance(entrada, str):
+            return f"{entrada}\n\n{instrucao}"
+        return list(entrada) + [{"role": "user", "content": instrucao}]
+
+    async def ainvoke(self, entrada, config=None, **kwargs):
+        estrategia = escolher_estrategia(self.provider)
+        runnable = self._runnable(estrategia)
+        inicio = time.monotonic()
+
+        try:
+            if estrategia == JSON:
+                raw = await runnable.ainvoke(self._com_instrucao_json(entrada), config, **kwargs)
+                parsed, erro = None, None
+            else:
+                resposta = await runnable.ainvoke(entrada, config, **kwargs)
+                raw, parsed, erro = resposta["raw"], resposta["parsed"], resposta.get("parsing_error")
+        except Exception:
+            _registrar(self.provider, estrategia, time.monotonic() - inicio, "falhas")
+            raise
+
+        if parsed is not None:
+            _registrar(self.provider, estrategia, time.monotonic() - inicio)
+            return parsed
+
+        # Reparo local antes de qualquer retry
+        valido, motivo, reparado = repair_structured_output(_texto_bruto(raw), self.schema)
+        decorrido = time.monotonic() - inicio
+
+        if not valido:
+            _registrar(self.provider, estrategia, decorrido, "falhas")
+            raise SaidaEstruturadaInvalida(self.schema.__name__, estrategia, erro or motivo)
+
+        if estrategia != JSON:
+            logger.info(f"🩹 {self.schema.__name__}: saída malformada ({estrategia}) reparada localmente")
+            _registrar(self.provider, estrategia, decorrido, "reparadas")
+        else:
+            _registrar(self.provider, estrategia, decorrido)
+
+        return reparado
+
+
+def estruturar(modelo, schema, **kwargs):
+    """
+    `modelo.with_structured_output(schema)` pela estratégia do provider.
+
+    Modelos de classe desconhecida (ou pedidos com `include_raw`) seguem
+    pelo `with_structured_output` do próprio modelo.
+    """
+    provider = PROVIDER_POR_CLASSE.get(type(modelo).__name__)
+
+    if provider is None or kwargs.get("include_raw"):
+        return modelo.with_structured_output(schema, **kwargs)
+
+    return ModeloEstruturado(modelo, provider, schema, **kwargs)
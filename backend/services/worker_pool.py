@@ -0,0 +1,232 @@
+# backend/services/worker_pool.py
+"""
+Pool de workers assíncronos com fila limitada.
+
+Substitui o padrão "uma coroutine por item + asyncio.gather" por um
+esquema produtor/consumidor: um número fixo de workers consome itens de
+uma asyncio.Queue limitada. O custo de agendamento fica constante,
+independente do tamanho da lista, e cada resultado é entregue por
+callback assim que fica pronto.
+"""
+
+import asyncio
+import inspect
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+from ..utils.logger import logger
+
+
+_FIM = object()
+
+
+async def _chamar_callback(callback: Optional[Callable], *args) -> None:
+    """Executa callback síncrono ou assíncrono sem derrubar o worker."""
+    if callback is None:
+        return
+
+    try:
+        retorno = callback(*args)
+        if inspect.isawaitable(retorno):
+            await retorno
+    except Exception as e:
+        logger.warning(f"⚠️ Erro em callback do pool: {e}")
+
+
+class PoolTrabalho:
+    """
+    Pool com número fixo de workers alimentado por uma fila limitada.
+
+    Uso típico:
+        async with PoolTrabalho(processar, max_workers=3) as pool:
+            for item in itens:
+                await pool.adicionar(item)
+
+    Args:
+        processar: Coroutine function aplicada a cada item
+        max_workers: Número fixo de workers
+        on_resultado: Callback (indice, item, resultado) chamado a cada
+                      item concluído. Se `processar` levantar exceção,
+                      `resultado` é a própria exceção.
+        on_progresso: Callback (concluidos, total) chamado a cada item
+                      concluído. `total` é None se desconhecido.
+        total: Total de itens esperado (apenas informativo)
+        nome: Nome usado nos logs
+    """
+
+    def __init__(
+        self,
+        processar: Callable[[Any], Awaitable[Any]],
+        max_workers: int = 3,
+        on_resultado: Optional[Callable] = None,
+        on_progresso: Optional[Callable] = None,
+        total: Optional[int] = None,
+        nome: str = "pool"
+    ):
+        self.processar = processar
+        self.max_workers = max(1, max_workers)
+        self.on_resultado = on_resultado
+        self.on_progresso = on_progresso
+        self.total = total
+        self.nome = nome
+
+        self.adicionados = 0
+        self.concluidos = 0
+        self.erros = 0
+
+        self._fila: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._fechado = False
+
+    # ============================================
+    # CICLO DE VIDA
+    # ============================================
+
+    def iniciar(self) -> "PoolTrabalho":
+        """Cria a fila e inicia os workers."""
+        if self._workers:
+            return self
+
+        self._fila = asyncio.Queue(maxsize=self.max_workers * 2)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"{self.nome}-worker-{i}")
+            for i in range(self.max_workers)
+        ]
+
+        logger.debug(f"⚙️ [{self.nome}] {self.max_workers} worker(s) iniciado(s)")
+        return self
+
+    async def adicionar(self, item: Any) -> int:
+        """
+        Enfileira um item. Bloqueia se a fila estiver cheia (backpressure).
+
+        Returns:
+            int: Índice atribuído ao item
+        """
+        if self._fechado:
+            raise RuntimeError(f"Pool '{self.nome}' já foi fechado")
+
+        self.iniciar()
+
+        indice = self.adicionados
+        self.adicionados += 1
+        await self._fila.put((indice, item))
+        return indice
+
+    async def fechar(self) -> None:
+        """Sinaliza fim dos itens e aguarda os workers terminarem."""
+        if self._fechado:
+            return
+
+        self.iniciar()
+        self._fechado = True
+
+        for _ in self._workers:
+            await self._fila.put(_FIM)
+
+        await asyncio.gather(*self._workers)
+
+        logger.debug(
+            f"⚙️ [{self.nome}] Encerrado: {self.concluidos} item(ns), "
+            f"{self.erros} erro(s)"
+        )
+
+    def cancelar(self) -> None:
+        """Cancela os workers imediatamente."""
+        self._fechado = True
+        for worker in self._workers:
+            worker.cancel()
+
+    async def __aenter__(self) -> "PoolTrabalho":
+        return self.iniciar()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.fechar()
+        else:
+            self.cancelar()
+            # Aguarda os workers saírem de fato (e os finally rodarem)
+            await asyncio.gather(*self._workers, return_exceptions=True)
+
+    # ============================================
+    # WORKER
+    # ============================================
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            entrada = await self._fila.get()
+
+            if entrada is _FIM:
+                return
+
+            indice, item = entrada
+
+            try:
+                resultado = await self.processar(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ [{self.nome}] Item {indice + 1} falhou: {e}")
+                resultado = e
+                self.erros += 1
+
+            self.concluidos += 1
+
+            await _chamar_callback(self.on_resultado, indice, item, resultado)
+            await _chamar_callback(self.on_progresso, self.concluidos, self.total)
+
+
+# ============================================
+# ATALHO PARA LISTAS
+# ============================================
+
+async def executar_em_pool(
+    itens: Iterable[Any],
+    processar: Callable[[Any], Awaitable[Any]],
+    max_workers: int = 3,
+    on_resultado: Optional[Callable] = None,
+    on_progresso: Optional[Callable] = None,
+    coletar: bool = True,
+    nome: str = "pool"
+) -> Optional[List[Any]]:
+    """
+    Processa todos os itens com um pool de tamanho fixo.
+
+    Equivalente a `asyncio.gather(*tasks, return_exceptions=True)` com
+    semáforo, mas sem criar uma coroutine por item de antemão.
+
+    Args:
+        itens: Iterável de itens (pode ser um gerador)
+        processar: Coroutine function aplicada a cada item
+        max_workers: Número fixo de workers
+        on_resultado: Callback (indice, item, resultado) por item concluído
+        on_progresso: Callback (concluidos, total) por item concluído
+        coletar: Se True, retorna a lista de resultados na ordem de entrada
+                 (exceções aparecem no lugar do resultado)
+        nome: Nome usado nos logs
+
+    Returns:
+        Lista de resultados (se coletar=True) ou None
+    """
+    total = len(itens) if hasattr(itens, "__len__") else None
+    resultados = {} if coletar else None
+
+    async def _on_resultado(indice, item, resultado):
+        if resultados is not None:
+            resultados[indice] = resultado
+        await _chamar_callback(on_resultado, indice, item, resultado)
+
+    async with PoolTrabalho(
+        processar,
+        max_workers=max_workers,
+        on_resultado=_on_resultado,
+        on_progresso=on_progresso,
+        total=total,
+        nome=nome
+    ) as pool:
+        for item in itens:
+            await pool.adicionar(item)
+
+    if resultados is None:
+        return None
+
+    return [resultados[i] for i in range(len(resultados))]
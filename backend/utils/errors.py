@@ -24,6 +24,17 @@ class TimeoutError(AppError):
     def __init__(self, operation: str, details: dict = None):
         super().__init__(f"Timeout na operação: {operation}", "TIMEOUT_ERROR", details)
 
+class CircuitOpenError(AppError):
+    """Todos os providers da cadeia estão com o disjuntor aberto."""
+    def __init__(self, providers: list, retry_after: float = None, details: dict = None):
+        super().__init__(
+            f"Disjuntor aberto para {', '.join(providers)}",
+            "CIRCUIT_OPEN_ERROR",
+            details
+        )
+        self.providers = providers
+        self.retry_after = retry_after
+
 def is_recoverable_error(error: Exception) -> bool:
     """Determina se erro é recuperável."""
     return isinstance(error, (TimeoutError, APIError))
@@ -4,10 +4,13 @@ Validadores robustos para saídas de LLMs.
 Previne erros de parsing e garante dados consistentes.
 """
 
+import json
 import re
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, Iterator
 from pydantic import BaseModel, ValidationError
 from .logger import logger
+from ..services.content_linter import lint, GRAVIDADES_REPROVAM, PREFIXO_LINT
+from ..services.mermaid_mindmap import corrigir_mindmap, parse_mindmap
 
 
 # ============================================
@@ -18,6 +21,9 @@ def validate_mermaid_syntax(code: str) -> Tuple[bool, str]:
     """
     Valida sintaxe básica de código Mermaid.
     
+    As verificações são as regras de mapa do linter local
+    (services/content_linter.py); só achados críticos/altos invalidam.
+    
     Args:
         code: Código Mermaid a validar
         
@@ -35,35 +41,11 @@ def validate_mermaid_syntax(code: str) -> Tuple[bool, str]:
     code = re.sub(r'\s*```$', '', code, flags=re.MULTILINE)
     code = code.strip()
     
-    # 1. Deve começar com 'mindmap'
-    if not code.startswith('mindmap'):
-        return False, "Código não começa com 'mindmap'"
-    
-    # 2. Deve ter um título central com {{...}}
-    if not re.search(r'\{\{.*?\}\}', code):
-        return False, "Título central {{...}} não encontrado"
-    
-    # 3. Verifica caracteres problemáticos que podem quebrar o Mermaid
-    problematic_chars = [
-        (r'[^\s]\(', "Parênteses '(' detectados (use '-' ou ':' no lugar)"),
-        (r'\)[^\s]', "Parênteses ')' detectados (use '-' ou ':' no lugar)"),
-        (r'\[(?![^\]]*\])', "Colchetes '[' mal formatados"),
-    ]
-    
-    for pattern, msg in problematic_chars:
-        if re.search(pattern, code):
-            return False, msg
-    
-    # 4. Verifica níveis de indentação (múltiplos de 2)
-    lines = code.split('\n')
-    for i, line in enumerate(lines, 1):
-        if line.strip() and not line.strip().startswith('mindmap'):
-            # Conta espaços iniciais
-            leading_spaces = len(line) - len(line.lstrip())
-            if leading_spaces % 2 != 0:
-                return False, f"Linha {i}: indentação inválida (não é múltiplo de 2)"
-    
-    # 5. Verifica se tem pelo menos um ícone
+    for achado in lint("mapa", code):
+        if achado["gravidade"] in GRAVIDADES_REPROVAM:
+            return False, achado["descricao"].removeprefix(PREFIXO_LINT).strip()
+    
+    # Verifica se tem pelo menos um ícone
     if not re.search(r'::icon\(fa fa-[\w-]+\)', code):
         logger.warning("Nenhum ícone encontrado no mapa (não é erro crítico)")
     
@@ -72,28 +54,43 @@ def validate_mermaid_syntax(code: str) -> Tuple[bool, str]:
 
 def clean_mermaid_code(code: str) -> str:
     """
-    Limpa código Mermaid removendo wrappers e caracteres problemáticos.
+    Limpa código Mermaid: remove wrappers e corrige erros mecânicos
+    (indentação, parênteses nos ramos, título sem {{...}}) pelo parser
+    de mindmap.
     
     Args:
         code: Código Mermaid bruto
         
     Returns:
-        str: Código limpo
+        str: Código limpo (formato canônico)
     """
     
-    # Remove markdown wrappers
-    code = re.sub(r'^```mermaid\s*', '', code, flags=re.MULTILINE)
-    code = re.sub(r'\s*```$', '', code, flags=re.MULTILINE)
+    return corrigir_mindmap(code)
+
+
+def analyze_mermaid_code(code: str) -> Dict[str, Any]:
+    """
+    Diagnóstico completo de um mindmap: correções aplicáveis, métricas
+    da árvore e validade do código já corrigido.
     
-    # Remove linhas vazias extras
-    lines = [line for line in code.split('\n') if line.strip()]
-    code = '\n'.join(lines)
+    Args:
+        code: Código Mermaid bruto
+        
+    Returns:
+        dict: {valido, erro, correcoes, metricas, codigo_corrigido}
+    """
     
-    # Substitui parênteses problemáticos por alternativas
-    # Nota: Isso é agressivo - use com cuidado
-    # code = code.replace('(', '-').replace(')', '-')
+    mapa = parse_mindmap(code)
+    corrigido = mapa.serializar()
+    valido, erro = validate_mermaid_syntax(corrigido)
     
-    return code.strip()
+    return {
+        "valido": valido and mapa.raiz is not None,
+        "erro": erro or ("Nenhum nó encontrado" if mapa.raiz is None else ""),
+        "correcoes": mapa.correcoes,
+        "metricas": mapa.metricas(),
+        "codigo_corrigido": corrigido
+    }
 
 
 # ============================================
@@ -289,6 +286,123 @@ def validate_structured_output(
         return False, error_msg, None
 
 
+# ============================================
+# REPARO LOCAL DE JSON
+# ============================================
+
+RE_CERCA_JSON = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+RE_VIRGULA_FINAL = re.compile(r",(\s*[}\]])")
+
+
+def _fechar_estruturas(texto: str) -> str:
+    """Fecha string, objetos e listas abertos de um JSON truncado."""
+    pilha = []
+    em_string = False
+    escape = False
+    
+    for char in texto:
+        if escape:
+            escape = False
+        elif char == "\\":
+            escape = em_string
+        elif char == '"':
+            em_string = not em_string
+        elif not em_string and char in "{[":
+            pilha.append("}" if char == "{" else "]")
+        elif not em_string and char in "}]" and pilha:
+            pilha.pop()
+    
+    fechado = texto + ('"' if em_string else "")
+    fechado = re.sub(r",\s*$", "", fechado.rstrip())
+    return fechado + "".join(reversed(pilha))
+
+
+def _candidatos_json(text: str) -> Iterator[Any]:
+    """
+    Objetos decodificáveis do texto, do mais completo ao mais curto.
+    
+    O texto inteiro (fechando o que o truncamento deixou aberto) vem
+    antes do corte no último `}`/`]`, que só serve para descartar texto
+    depois do objeto: cortar primeiro perderia os campos finais de um
+    JSON truncado.
+    """
+    if not text:
+        return
+    
+    texto = RE_CERCA_JSON.sub("", text.strip())
+    
+    inicio = min((i for i in (texto.find("{"), texto.find("[")) if i >= 0), default=-1)
+    if inicio < 0:
+        return
+    texto = texto[inicio:]
+    
+    candidatos = [texto]
+    fim = max(texto.rfind("}"), texto.rfind("]"))
+    if 0 <= fim < len(texto) - 1:
+        candidatos.append(texto[:fim + 1])
+    
+    for candidato in candidatos:
+        for tentativa in (
+            candidato,
+            RE_VIRGULA_FINAL.sub(r"\1", candidato),
+            RE_VIRGULA_FINAL.sub(r"\1", _fechar_estruturas(candidato))
+        ):
+            try:
+                yield json.loads(tentativa)
+                break
+            except json.JSONDecodeError:
+                continue
+
+
+def repair_json_text(text: str) -> Optional[Any]:
+    """
+    Extrai e conserta o JSON de uma resposta de LLM.
+    
+    Trata cercas ```json, texto antes/depois do objeto, vírgulas finais
+    e JSON truncado (strings/objetos/listas abertos).
+    
+    Returns:
+        Objeto decodificado, ou None se não houver JSON recuperável
+    """
+    return next(_candidatos_json(text), None)
+
+
+def _desembrulhar(dados: Any, expected_model: type[BaseModel]) -> Any:
+    """{"AvaliacaoMapa": {...}} → {...} (chave única fora do schema)."""
+    if isinstance(dados, dict) and len(dados) == 1:
+        chave, interno = next(iter(dados.items()))
+        if chave not in expected_model.model_fields and isinstance(interno, dict):
+            return interno
+    return dados
+
+
+def repair_structured_output(
+    text: str,
+    expected_model: type[BaseModel]
+) -> Tuple[bool, str, Optional[Any]]:
+    """
+    Reparo local de um structured output malformado (antes de qualquer retry).
+    
+    Conserta o JSON do texto/args brutos e valida cada candidato com
+    `validate_structured_output`, devolvendo o primeiro válido; aceita o
+    objeto embrulhado numa chave única ({"AvaliacaoMapa": {...}}).
+    
+    Returns:
+        tuple: (is_valid, error_message, validated_data)
+    """
+    erro = None
+    
+    for dados in _candidatos_json(text):
+        valido, motivo, validado = validate_structured_output(
+            _desembrulhar(dados, expected_model), expected_model, fallback_on_error=False
+        )
+        if valido:
+            return valido, motivo, validado
+        erro = erro or motivo
+    
+    return False, erro or "Nenhum JSON recuperável na resposta", None
+
+
 # ============================================
 # HELPER: EXTRAÇÃO SEGURA DE CONTEÚDO
 # ============================================
@@ -3,6 +3,7 @@ from loguru import logger
 from pathlib import Path
 import sys
 from datetime import datetime
+from collections import deque
 
 def setup_logger(settings):
     """
@@ -83,4 +84,29 @@ def log_execution_time(func):
 def _get_timestamp():
     return datetime.now().isoformat()
 
-logger._get_timestamp = _get_timestamp
\ No newline at end of file
+logger._get_timestamp = _get_timestamp
+
+def criar_buffer_logs(maxlen: int = None) -> deque:
+    """
+    Cria buffer circular para os logs guardados no state.
+    
+    Mantém apenas as últimas `maxlen` entradas, de modo que o consumo
+    de memória não cresce com o número de tópicos/partes processados.
+    """
+    if maxlen is None:
+        from backend.core.config import get_settings
+        maxlen = get_settings().max_logs_estado
+    return deque(maxlen=maxlen)
+
+def limitar_logs(atual, novos) -> deque:
+    """
+    Reducer do campo `logs` dos states do LangGraph.
+    
+    O limite não pode depender do tipo do valor: um node (ou rota) que
+    devolve `logs` como lista, ou monta o state a partir de dicts,
+    perderia o `maxlen` do deque. O reducer reaplica o limite a cada
+    atualização, qualquer que seja o tipo devolvido.
+    """
+    buffer = criar_buffer_logs()
+    buffer.extend(novos if novos is not None else (atual or ()))
+    return buffer
@@ -0,0 +1,160 @@
+"""Testes do motor de lote de mapas (backend/agents/mapas/batch.py)."""
+
+import asyncio
+
+import pytest
+
+from backend.agents.mapas import batch
+from backend.agents.mapas.state import resumir_estado_mapa
+
+
+DIVISOES = [
+    {"parte_numero": 1, "titulo": "Parte 1", "conteudo": "a", "estimativa_mapas": 1},
+    {"parte_numero": 2, "titulo": "Parte 2", "conteudo": "b", "estimativa_mapas": 1},
+]
+
+
+@pytest.fixture
+def etapas(monkeypatch):
+    """Substitui parse/divisão/partes/salvamento por versões locais."""
+    chamadas = {"partes": [], "salvos": []}
+
+    async def parse(state):
+        state["fundamentacao"] = "texto"
+        state["status"] = "dividindo"
+        return state
+
+    async def dividir(state):
+        state["divisoes"] = [dict(d) for d in DIVISOES]
+        state["status"] = "gerando"
+        return state
+
+    async def salvar(state):
+        chamadas["salvos"].append(state["html_filename"])
+        return state
+
+    monkeypatch.setattr(batch, "parse_html_node", parse)
+    monkeypatch.setattr(batch, "executar_divisao", dividir)
+    monkeypatch.setattr(batch, "salvar_resultado", salvar)
+    monkeypatch.setattr(batch.PoliticaRetry, "aguardar", lambda self, *a, **k: asyncio.sleep(0))
+    return chamadas
+
+
+def _resultado(parte_info):
+    return {
+        "parte_numero": parte_info["parte_numero"],
+        "mapa_numero": parte_info["mapa_numero"],
+        "parte_titulo": parte_info["titulo"],
+        "aprovado": True,
+        "nota_geral": 9.0,
+        "tentativas": 1
+    }
+
+
+def _rodar(**kwargs):
+    return asyncio.run(batch.processar_lote_mapas(
+        ["a.html", "b.html"], "openai", "openai", "openai", **kwargs
+    ))
+
+
+def test_lote_conclui_todos_os_arquivos(etapas, monkeypatch):
+    async def parte(parte_info, state, parte_index, max_tentativas):
+        return _resultado(parte_info)
+
+    monkeypatch.setattr(batch, "processar_parte_completa", parte)
+
+    finais = _rodar()
+
+    assert [s["status"] for s in finais] == ["concluido", "concluido"]
+    assert sorted(etapas["salvos"]) == ["a.html", "b.html"]
+
+
+def test_erro_ao_salvar_vira_estado_de_erro(etapas, monkeypatch):
+    async def parte(parte_info, state, parte_index, max_tentativas):
+        return _resultado(parte_info)
+
+    async def salvar(state):
+        if state["html_filename"] == "a.html":
+            raise OSError("disco cheio")
+        return state
+
+    monkeypatch.setattr(batch, "processar_parte_completa", parte)
+    monkeypatch.setattr(batch, "salvar_resultado", salvar)
+
+    finais = _rodar()
+
+    assert finais[0]["status"] == "erro"
+    assert "disco cheio" in finais[0]["erro_msg"]
+    assert finais[1]["status"] == "concluido"
+
+
+def test_erro_ao_enfileirar_vira_estado_de_erro(etapas, monkeypatch):
+    def expandir(divisoes):
+        raise KeyError("estimativa_mapas")
+
+    monkeypatch.setattr(batch, "expandir_divisoes", expandir)
+
+    finais = _rodar()
+
+    assert all(s is not None and s["status"] == "erro" for s in finais)
+
+
+def test_retry_de_arquivo_refaz_so_as_partes_que_falharam(etapas, monkeypatch):
+    tentativas = {}
+
+    async def parte(parte_info, state, parte_index, max_tentativas):
+        chave = (state["html_filename"], parte_info["parte_numero"])
+        tentativas[chave] = tentativas.get(chave, 0) + 1
+        if chave == ("a.html", 2) and tentativas[chave] == 1:
+            raise TimeoutError("timeout do provider")
+        return _resultado(parte_info)
+
+    monkeypatch.setattr(batch, "processar_parte_completa", parte)
+
+    finais = _rodar(max_retries=2)
+
+    assert [s["status"] for s in finais] == ["concluido", "concluido"]
+    assert tentativas[("a.html", 1)] == 1
+    assert tentativas[("a.html", 2)] == 2
+    assert etapas["salvos"].count("a.html") == 1
+
+
+def test_sem_retry_arquivo_fica_parcial(etapas, monkeypatch):
+    async def parte(parte_info, state, parte_index, max_tentativas):
+        if parte_info["parte_numero"] == 2:
+            raise TimeoutError("timeout do provider")
+        return _resultado(parte_info)
+
+    monkeypatch.setattr(batch, "processar_parte_completa", parte)
+
+    finais = _rodar()
+
+    assert [s["status"] for s in finais] == ["parcial", "parcial"]
+
+
+def test_resumo_sem_estado_e_de_erro():
+    resumo = resumir_estado_mapa(None, "a.html")
+
+    assert resumo["html_file"] == "a.html"
+    assert resumo["status"] == "erro"
+    assert resumo["partes_processadas"] == []
+
+
+def test_revisao_em_lote_entra_na_fila_como_um_item_por_arquivo(etapas, monkeypatch):
+    lotes = []
+
+    async def lote(state, unidades, max_workers, max_tentativas):
+        lotes.append((state["html_filename"], len(unidades)))
+        return [_resultado(u) for u in unidades]
+
+    async def parte(*args, **kwargs):
+        pytest.fail("revisão individual com revisão em lote ativa")
+
+    monkeypatch.setattr(batch.settings, "mapas_revisao_em_lote", True)
+    monkeypatch.setattr(batch, "processar_unidades_revisao_lote", lote)
+    monkeypatch.setattr(batch, "processar_parte_completa", parte)
+
+    finais = _rodar(especulativo=False)
+
+    assert [s["status"] for s in finais] == ["concluido", "concluido"]
+    assert sorted(lotes) == [("a.html", 2), ("b.html", 2)]
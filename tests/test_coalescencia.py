@@ -0,0 +1,93 @@
+"""Testes da coalescência de chamadas (backend/services/coalescencia.py)."""
+
+import asyncio
+
+import pytest
+
+from backend.services.coalescencia import Coalescedor, chave_requisicao
+
+
+def test_chave_ignora_campos_extras_das_mensagens():
+    a = chave_requisicao("m", [{"role": "user", "content": "oi", "id": 1}])
+    b = chave_requisicao("m", [{"role": "user", "content": "oi", "id": 2}])
+
+    assert a == b
+    assert a != chave_requisicao("outro", [{"role": "user", "content": "oi"}])
+
+
+def test_chamadas_simultaneas_compartilham_o_voo():
+    coalescedor = Coalescedor()
+    chamadas = []
+
+    async def operacao():
+        chamadas.append(1)
+        await asyncio.sleep(0.01)
+        return {"valor": 1}
+
+    async def cenario():
+        return await asyncio.gather(*(coalescedor.executar("k", operacao) for _ in range(3)))
+
+    resultados = asyncio.run(cenario())
+
+    assert len(chamadas) == 1
+    assert resultados == [{"valor": 1}] * 3
+    assert resultados[0] is not resultados[1]
+    assert coalescedor.estatisticas() == {"em_voo": 0, "coalescidas": 2}
+
+
+def test_erro_propaga_para_todos():
+    coalescedor = Coalescedor()
+
+    async def operacao():
+        await asyncio.sleep(0.01)
+        raise ValueError("falhou")
+
+    async def cenario():
+        return await asyncio.gather(
+            coalescedor.executar("k", operacao),
+            coalescedor.executar("k", operacao),
+            return_exceptions=True
+        )
+
+    assert all(isinstance(r, ValueError) for r in asyncio.run(cenario()))
+
+
+def test_cancelar_um_interessado_nao_afeta_os_demais():
+    coalescedor = Coalescedor()
+
+    async def operacao():
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def cenario():
+        dono = asyncio.create_task(coalescedor.executar("k", operacao))
+        await asyncio.sleep(0)
+        outro = asyncio.create_task(coalescedor.executar("k", operacao))
+        await asyncio.sleep(0)
+        dono.cancel()
+        return await outro
+
+    assert asyncio.run(cenario()) == "ok"
+
+
+def test_apos_cancelar_o_ultimo_nova_chamada_abre_voo_novo():
+    coalescedor = Coalescedor()
+    chamadas = []
+
+    async def operacao():
+        chamadas.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    async def cenario():
+        primeira = asyncio.create_task(coalescedor.executar("k", operacao))
+        await asyncio.sleep(0)
+        primeira.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await primeira
+
+        # Antes do done-callback da tarefa cancelada rodar
+        return await coalescedor.executar("k", operacao)
+
+    assert asyncio.run(cenario()) == "ok"
+    assert len(chamadas) == 2
@@ -0,0 +1,105 @@
+"""Testes do circuit breaker por provider (backend/services/disjuntor.py)."""
+
+import pytest
+
+from backend.services import disjuntor as modulo
+from backend.services.disjuntor import ABERTO, FECHADO, MEIO_ABERTO, Disjuntor
+
+
+@pytest.fixture(autouse=True)
+def configuracao(monkeypatch):
+    monkeypatch.setattr(modulo.settings, "circuito_janela_segundos", 60.0)
+    monkeypatch.setattr(modulo.settings, "circuito_min_amostras", 4)
+    monkeypatch.setattr(modulo.settings, "circuito_limiar_erro", 0.5)
+    monkeypatch.setattr(modulo.settings, "circuito_limiar_lentidao", 0.8)
+    monkeypatch.setattr(modulo.settings, "circuito_lento_segundos", 10.0)
+    monkeypatch.setattr(modulo.settings, "circuito_espera_segundos", 30.0)
+    monkeypatch.setattr(modulo.settings, "circuito_max_sondas", 1)
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(modulo.time, "monotonic", lambda: agora[0])
+    return agora
+
+
+def _abrir(d: Disjuntor):
+    for _ in range(2):
+        d.registrar_sucesso(1.0)
+    for _ in range(2):
+        d.registrar_falha()
+
+
+def test_poucas_amostras_nao_abrem():
+    d = Disjuntor("teste")
+    for _ in range(3):
+        d.registrar_falha()
+
+    assert d.estado == FECHADO
+    assert d.permitir()
+
+
+def test_abre_pela_taxa_de_erro(relogio):
+    d = Disjuntor("teste")
+    _abrir(d)
+
+    assert d.estado == ABERTO
+    assert not d.permitir()
+    assert d.segundos_para_sonda() == 30.0
+
+
+def test_abre_pela_taxa_de_lentidao():
+    d = Disjuntor("teste")
+    for _ in range(4):
+        d.registrar_sucesso(20.0)
+
+    assert d.estado == ABERTO
+
+
+def test_sonda_com_sucesso_fecha(relogio):
+    d = Disjuntor("teste")
+    _abrir(d)
+
+    relogio[0] += 31
+    assert d.permitir()
+    assert d.estado == MEIO_ABERTO
+    assert not d.permitir()  # só uma sonda por vez
+
+    d.registrar_sucesso(1.0)
+    assert d.estado == FECHADO
+
+
+def test_sonda_com_falha_reabre(relogio):
+    d = Disjuntor("teste")
+    _abrir(d)
+
+    relogio[0] += 31
+    assert d.permitir()
+    d.registrar_falha()
+
+    assert d.estado == ABERTO
+    assert not d.permitir()
+
+
+def test_liberar_devolve_a_vaga_de_sonda(relogio):
+    d = Disjuntor("teste")
+    _abrir(d)
+
+    relogio[0] += 31
+    assert d.permitir()
+    d.liberar()
+
+    assert d.permitir()
+
+
+def test_eventos_antigos_saem_da_janela(relogio):
+    d = Disjuntor("teste")
+    for _ in range(3):
+        d.registrar_falha()
+
+    relogio[0] += 61
+    d.registrar_falha()
+
+    assert d.estado == FECHADO
+    assert d.resumo()["amostras"] == 1
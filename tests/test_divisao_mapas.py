@@ -0,0 +1,114 @@
+"""Testes da divisão local de conteúdo dos mapas (subdivisão, fatiamento e rebalanceamento)."""
+
+from backend.agents.mapas.graph_parallel import MIN_CHARS_POR_MAPA, subdividir_conteudo
+from backend.agents.mapas.nodes.divisor_node import (
+    MIN_CHARS_PARTE_BLOCO,
+    fatiar_fundamentacao,
+    rebalancear_partes
+)
+
+
+def _paragrafos(n, tamanho=300):
+    return "\n\n".join(f"{i}" * tamanho for i in range(n))
+
+
+def _parte(numero, chars, estimativa=1):
+    return {
+        "numero": numero,
+        "titulo": f"P{numero}",
+        "conteudo": "x" * chars,
+        "estimativa_mapas": estimativa
+    }
+
+
+# ============================================
+# SUBDIVISÃO (estimativa_mapas)
+# ============================================
+
+def test_subdivide_em_blocos_equilibrados_sem_perder_texto():
+    conteudo = _paragrafos(6)
+    blocos = subdividir_conteudo(conteudo, 3)
+
+    assert len(blocos) == 3
+    assert [len(b.split("\n\n")) for b in blocos] == [2, 2, 2]
+    assert "\n\n".join(blocos) == conteudo
+
+
+def test_texto_curto_gera_menos_blocos():
+    conteudo = _paragrafos(4, tamanho=100)
+    assert len(conteudo) // MIN_CHARS_POR_MAPA == 1
+
+    assert subdividir_conteudo(conteudo, 3) == [conteudo]
+
+
+def test_sem_paragrafos_suficientes_corta_por_linha():
+    conteudo = "\n".join("y" * 400 for _ in range(3))
+    blocos = subdividir_conteudo(conteudo, 3)
+
+    assert len(blocos) == 3
+
+
+def test_um_paragrafo_so_nao_e_cortado():
+    conteudo = "z" * 2000
+    assert subdividir_conteudo(conteudo, 3) == [conteudo]
+
+
+# ============================================
+# FATIAMENTO DA FUNDAMENTAÇÃO
+# ============================================
+
+def test_fatia_respeitando_o_limite():
+    texto = "\n".join(f"Linha {i} do texto." * 5 for i in range(100))
+    blocos = fatiar_fundamentacao(texto, 1000)
+
+    assert len(blocos) > 1
+    assert all(len(b) <= 1000 for b in blocos)
+    assert "\n".join(blocos) == texto
+
+
+def test_linha_longa_e_cortada_no_ponto():
+    texto = "Frase curta. " * 200
+    blocos = fatiar_fundamentacao(texto, 500)
+
+    assert all(len(b) <= 500 for b in blocos)
+    assert all(b.rstrip().endswith(".") for b in blocos[:-1])
+
+
+def test_texto_curto_fica_inteiro():
+    assert fatiar_fundamentacao("curto", 100) == ["curto"]
+
+
+# ============================================
+# REBALANCEAMENTO
+# ============================================
+
+def test_absorve_parte_pequena_no_vizinho_menor():
+    partes = [_parte(1, 1000), _parte(2, 100), _parte(3, 500)]
+    resultado = rebalancear_partes(partes, max_partes=10)
+
+    assert [p["titulo"] for p in resultado] == ["P1", "P2 / P3"]
+    assert [p["numero"] for p in resultado] == [1, 2]
+    assert all(len(p["conteudo"]) >= MIN_CHARS_PARTE_BLOCO for p in resultado)
+
+
+def test_limite_une_o_par_adjacente_menor():
+    partes = [_parte(1, 900), _parte(2, 400), _parte(3, 400), _parte(4, 900)]
+    resultado = rebalancear_partes(partes, max_partes=3)
+
+    assert [p["titulo"] for p in resultado] == ["P1", "P2 / P3", "P4"]
+
+
+def test_preserva_ordem_e_limita_estimativa():
+    partes = [_parte(i, 400, estimativa=2) for i in range(1, 6)]
+    resultado = rebalancear_partes(partes, max_partes=2)
+
+    assert len(resultado) == 2
+    assert "".join(p["conteudo"].replace("\n", "") for p in resultado) == "x" * 2000
+    assert all(p["estimativa_mapas"] <= 3 for p in resultado)
+
+
+def test_nao_altera_a_entrada():
+    partes = [_parte(1, 100), _parte(2, 100)]
+    rebalancear_partes(partes, max_partes=1)
+
+    assert partes[0]["titulo"] == "P1"
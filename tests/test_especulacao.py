@@ -0,0 +1,61 @@
+"""Testes da geração especulativa (backend/services/especulacao.py)."""
+
+import asyncio
+
+import pytest
+
+from backend.services import especulacao
+from backend.services.especulacao import disputar_candidatos, taxa_rejeicao
+
+
+@pytest.fixture(autouse=True)
+def historico_limpo(monkeypatch):
+    monkeypatch.setattr(especulacao.settings, "especulacao_min_amostras", 1)
+    especulacao.limpar_historico()
+    yield
+    especulacao.limpar_historico()
+
+
+def _disputar(notas, atrasos, chave="teste"):
+    async def gerar(indice):
+        await asyncio.sleep(atrasos[indice])
+        return indice
+
+    async def revisar(indice):
+        return notas[indice]
+
+    return asyncio.run(disputar_candidatos(
+        len(notas), gerar, revisar,
+        aprovado=lambda nota: nota >= 7,
+        nota=lambda nota: nota,
+        chave=chave
+    ))
+
+
+def test_para_no_primeiro_aprovado_e_cancela_o_resto():
+    melhor, concluidos = _disputar([5, 8, 9], [0.0, 0.01, 0.5])
+
+    assert melhor.indice == 1
+    assert [c.indice for c in concluidos] == [0, 1]
+
+
+def test_sem_aprovados_vence_a_maior_nota():
+    melhor, concluidos = _disputar([4, 6, 5], [0.0, 0.01, 0.02])
+
+    assert melhor.indice == 1
+    assert len(concluidos) == 3
+
+
+def test_historico_recebe_uma_amostra_por_disputa():
+    # Rejeitado, rejeitado, aprovado: registrar todos daria taxa 2/3
+    for _ in range(10):
+        _disputar([5, 6, 9], [0.0, 0.005, 0.01])
+
+    assert len(especulacao._historico["teste"]) == 10
+    assert taxa_rejeicao("teste") == 1.0
+
+    especulacao.limpar_historico()
+    for _ in range(10):
+        _disputar([9, 5, 6], [0.0, 0.005, 0.01])
+
+    assert taxa_rejeicao("teste") == 0.0
@@ -0,0 +1,29 @@
+"""Testes dos reducers do state de guias (backend/agents/guias/state.py)."""
+
+from collections import deque
+
+from backend.agents.guias import state as guias_state
+from backend.agents.guias.state import limitar_historicos
+from backend.utils.logger import limitar_logs
+
+
+def test_historico_devolvido_como_lista_volta_a_ser_limitado(monkeypatch):
+    monkeypatch.setattr(guias_state, "criar_historico_topico", lambda: deque(maxlen=3))
+    topicos = [{"id": "t1", "historico": list(range(10))}]
+
+    resultado = limitar_historicos([], topicos)
+
+    assert resultado[0]["historico"] == deque([7, 8, 9])
+    assert resultado[0]["historico"].maxlen == 3
+
+
+def test_sem_atualizacao_mantem_os_topicos_atuais():
+    atuais = [{"id": "t1", "historico": deque([1])}]
+
+    assert limitar_historicos(atuais, None) is atuais
+
+
+def test_logs_devolvidos_como_lista_voltam_a_ser_limitados(monkeypatch):
+    monkeypatch.setattr("backend.utils.logger.criar_buffer_logs", lambda: deque(maxlen=2))
+
+    assert limitar_logs(deque(), [1, 2, 3]) == deque([2, 3])
@@ -0,0 +1,98 @@
+"""Testes da extração de guias HTML (backend/services/html_extractor.py)."""
+
+import asyncio
+
+import pytest
+from bs4 import BeautifulSoup
+
+from backend.services import html_extractor
+from backend.services.handoff_guias import criar_handoff
+from backend.services.html_extractor import (
+    extrair_com_bs4,
+    extrair_guia,
+    extrair_guia_de_texto,
+    limpar_cache_extracao
+)
+
+FUNDAMENTACAO = "Os contratos obrigam as partes. " * 10
+
+GUIA = f"""<!DOCTYPE html>
+<html><head><title>[Direito Civil] - [Contratos] - Guia Completo</title>
+<style>.x {{ color: red }}</style></head>
+<body>
+<section id="intro"><p>Introdução</p></section>
+<section id="fundamentacao">
+  <h2>Fundamentação</h2>
+  <p>{FUNDAMENTACAO}</p>
+  <ul><li>Art. 421 &amp; 422</li><li>Boa-fé <b>objetiva</b></li></ul>
+  <script>ignorar()</script>
+</section>
+<section id="questoes"><p>Não entra</p></section>
+</body></html>"""
+
+
+@pytest.fixture(autouse=True)
+def cache_limpo():
+    limpar_cache_extracao()
+    yield
+    limpar_cache_extracao()
+
+
+def _texto_bs4(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.find("section", id="fundamentacao").get_text(separator="\n", strip=True)
+
+
+def test_lxml_extrai_o_mesmo_texto_que_o_beautifulsoup():
+    extracao = extrair_guia_de_texto(GUIA)
+
+    assert extracao.metodo == "lxml"
+    assert extracao.titulo == "[Direito Civil] - [Contratos] - Guia Completo"
+    assert extracao.fundamentacao == _texto_bs4(GUIA)
+    assert "Não entra" not in extracao.fundamentacao
+    assert "ignorar()" not in extracao.fundamentacao
+
+
+def test_sem_fundamentacao_devolve_none():
+    extracao = extrair_guia_de_texto("<html><head><title>T</title></head><body></body></html>")
+
+    assert extracao.titulo == "T"
+    assert extracao.fundamentacao is None
+    assert extrair_com_bs4("<html></html>").fundamentacao is None
+
+
+def test_cache_evita_reparse_enquanto_o_arquivo_nao_muda(tmp_path, monkeypatch):
+    arquivo = tmp_path / "guia.html"
+    arquivo.write_text(GUIA, encoding="utf-8")
+
+    chamadas = []
+    original = html_extractor._extrair_arquivo
+    monkeypatch.setattr(html_extractor, "_extrair_arquivo", lambda p: chamadas.append(p) or original(p))
+
+    primeira = extrair_guia(arquivo)
+    segunda = extrair_guia(arquivo)
+    assert primeira == segunda
+    assert len(chamadas) == 1
+
+    arquivo.write_text(GUIA.replace("Contratos", "Obrigações"), encoding="utf-8")
+    assert "Obrigações" in extrair_guia(arquivo).titulo
+    assert len(chamadas) == 2
+
+
+def test_handoff_semeia_o_cache_e_guarda_so_a_referencia(tmp_path, monkeypatch):
+    arquivo = tmp_path / "guia.html"
+    arquivo.write_text(GUIA, encoding="utf-8")
+
+    handoff = asyncio.run(criar_handoff("guia.html", arquivo, GUIA, "sha"))
+
+    assert handoff == {"html_filename": "guia.html", "caminho": str(arquivo), "sha256": "sha"}
+
+    monkeypatch.setattr(html_extractor, "_extrair_arquivo", lambda p: pytest.fail("reparseou o guia"))
+    assert extrair_guia(arquivo).fundamentacao == _texto_bs4(GUIA)
+
+
+def test_handoff_de_html_invalido_e_none(tmp_path):
+    arquivo = tmp_path / "vazio.html"
+    arquivo.write_text("<html></html>", encoding="utf-8")
+
+    assert asyncio.run(criar_handoff("vazio.html", arquivo, "<html></html>")) is None
@@ -0,0 +1,152 @@
+"""Testes da continuação, do dimensionamento de max_tokens e do failover (backend/services/llm_gateway.py)."""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from backend.services import disjuntor, llm_gateway
+from backend.services.conversa_retry import montar_conversa
+from backend.services.llm_gateway import LLMGateway, Rota, costurar, dimensionar_max_tokens
+
+CHAVE = ("teste", "modelo", "papel")
+
+
+@pytest.fixture(autouse=True)
+def monitor_limpo(monkeypatch):
+    monkeypatch.setattr(llm_gateway.settings, "max_tokens_dinamico", True)
+    monkeypatch.setattr(llm_gateway.settings, "max_tokens_min_amostras", 3)
+    monkeypatch.setattr(llm_gateway.settings, "max_tokens_percentil", 0.95)
+    monkeypatch.setattr(llm_gateway.settings, "max_tokens_margem", 1.25)
+    monkeypatch.setattr(llm_gateway.settings, "coalescencia_ativa", False)
+    monkeypatch.setattr(llm_gateway.settings, "hedge_ativo", False)
+    monkeypatch.setattr(
+        llm_gateway, "monitor_tokens_saida", llm_gateway.MonitorAmostras(5)
+    )
+    yield
+
+
+# ============================================
+# COSTURA
+# ============================================
+
+@pytest.mark.parametrize("texto, continuacao, esperado", [
+    ("O prazo é de 10", "0 dias corridos", "O prazo é de 100 dias corridos"),
+    ("pas", "sar", "passar"),
+    ("<td>1", "1</td>", "<td>11</td>"),
+])
+def test_sobreposicao_curta_nao_e_removida(texto, continuacao, esperado):
+    assert costurar(texto, continuacao) == esperado
+
+
+def test_remove_sobreposicao_longa():
+    repetido = "a competência da Justiça do Trabalho"
+    texto = f"Compete definir {repetido}"
+    continuacao = f"{repetido} nos termos do art. 114."
+
+    assert costurar(texto, continuacao) == f"Compete definir {repetido} nos termos do art. 114."
+
+
+def test_remove_linha_inteira_repetida():
+    texto = "# Título\n- item\n"
+    continuacao = "- item\n- outro"
+
+    assert costurar(texto, continuacao) == "# Título\n- item\n- outro"
+
+
+def test_sem_sobreposicao_concatena():
+    assert costurar("abc", "def") == "abcdef"
+
+
+# ============================================
+# DIMENSIONAMENTO DE max_tokens
+# ============================================
+
+def _registrar(*tokens):
+    for t in tokens:
+        llm_gateway.monitor_tokens_saida.registrar(CHAVE, t)
+
+
+def test_sem_amostras_usa_configurado():
+    _registrar(9000)
+    assert dimensionar_max_tokens(CHAVE, 4000) == 4000
+
+
+def test_aumenta_ate_o_teto():
+    _registrar(5000, 5000, 5000)
+    assert dimensionar_max_tokens(CHAVE, 4000) == 7168
+    assert dimensionar_max_tokens(CHAVE, 4000, teto=6000) == 6000
+
+
+def test_volta_ao_configurado_quando_saidas_diminuem():
+    _registrar(5000, 5000, 5000)
+    assert dimensionar_max_tokens(CHAVE, 4000) > 4000
+
+    _registrar(1000, 1000, 1000, 1000, 1000)
+    assert dimensionar_max_tokens(CHAVE, 4000) == 4000
+
+
+class _Modelo:
+    def __init__(self, max_tokens):
+        self.max_tokens = max_tokens
+
+    async def ainvoke(self, entrada, config=None, **kwargs):
+        return AIMessage(
+            content="ok",
+            response_metadata={"finish_reason": "stop"},
+            usage_metadata={"input_tokens": 1, "output_tokens": 5000, "total_tokens": 5001}
+        )
+
+
+def test_gateway_dimensiona_a_cada_chamada():
+    criados = []
+
+    def criar(api_key, limite):
+        criados.append(limite)
+        return _Modelo(limite)
+
+    rota = Rota("provider-teste", "modelo", criar, max_tokens=4000, teto=32000)
+    gateway = LLMGateway([rota], papel="papel-teste")
+
+    for _ in range(4):
+        asyncio.run(gateway.ainvoke("oi"))
+
+    # 3 primeiras com o configurado (sem amostras); a 4ª já dimensionada
+    assert criados == [None, 7168]
+
+
+# ============================================
+# MARCAÇÃO DE CACHE POR PROVIDER
+# ============================================
+
+class _ModeloRegistrando:
+    def __init__(self, recebidas, erro=None):
+        self.recebidas = recebidas
+        self.erro = erro
+
+    async def ainvoke(self, entrada, config=None, **kwargs):
+        self.recebidas.append(entrada)
+        if self.erro:
+            raise self.erro
+        return AIMessage(content="ok", response_metadata={"finish_reason": "stop"})
+
+
+def test_failover_do_anthropic_nao_leva_cache_control(monkeypatch):
+    monkeypatch.setattr(llm_gateway.settings, "retry_conversacional", True)
+    monkeypatch.setattr(disjuntor.settings, "circuito_min_amostras", 100)
+    disjuntor.limpar_disjuntores()
+
+    anthropic, openai = [], []
+    gateway = LLMGateway([
+        Rota("anthropic", "claude", lambda *_: _ModeloRegistrando(anthropic, TimeoutError("lento"))),
+        Rota("openai", "gpt", lambda *_: _ModeloRegistrando(openai)),
+    ], papel="papel-teste")
+
+    asyncio.run(gateway.ainvoke(montar_conversa("sistema", "pedido")))
+
+    assert anthropic[0][1]["content"] == [
+        {"type": "text", "text": "pedido", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert openai[0][1] == {"role": "user", "content": "pedido"}
+
+    disjuntor.limpar_disjuntores()
@@ -0,0 +1,56 @@
+"""Testes do reparo local de JSON (backend/utils/llm_validators.py)."""
+
+from backend.agents.mapas.nodes.revisor_node import AvaliacaoMapa
+from backend.utils.llm_validators import repair_json_text, repair_structured_output
+
+AVALIACAO_TRUNCADA = (
+    '{"aprovado": true, "nota_geral": 8.5, '
+    '"problemas": [{"categoria": "cobertura", "gravidade": "baixa", "descricao": "ramo raso", "localizacao": "raiz"}], '
+    '"sugestoes_melhoria": [], "justificativa": "Mapa completo e fiel ao tex'
+)
+
+
+def test_cercas_e_texto_em_volta():
+    texto = 'Segue:\n```json\n{"a": 1, "b": [1, 2,]}\n```'
+    assert repair_json_text(texto) == {"a": 1, "b": [1, 2]}
+
+
+def test_texto_depois_do_objeto():
+    assert repair_json_text('{"a": {"b": 1}} Espero ter ajudado!') == {"a": {"b": 1}}
+
+
+def test_truncado_fecha_o_texto_inteiro():
+    dados = repair_json_text(AVALIACAO_TRUNCADA)
+
+    assert dados["justificativa"] == "Mapa completo e fiel ao tex"
+    assert dados["sugestoes_melhoria"] == []
+
+
+def test_sem_json():
+    assert repair_json_text("nada aqui") is None
+    assert repair_json_text("") is None
+
+
+def test_structured_output_truncado_valida():
+    valido, _, avaliacao = repair_structured_output(AVALIACAO_TRUNCADA, AvaliacaoMapa)
+
+    assert valido
+    assert avaliacao.justificativa == "Mapa completo e fiel ao tex"
+
+
+def test_structured_output_embrulhado():
+    texto = '{"AvaliacaoMapa": {"aprovado": false, "nota_geral": 4, "problemas": [], ' \
+            '"sugestoes_melhoria": ["x"], "justificativa": "ok"}}'
+
+    valido, _, avaliacao = repair_structured_output(texto, AvaliacaoMapa)
+
+    assert valido
+    assert avaliacao.nota_geral == 4
+
+
+def test_structured_output_invalido():
+    valido, motivo, dados = repair_structured_output('{"aprovado": true}', AvaliacaoMapa)
+
+    assert not valido
+    assert dados is None
+    assert "validação" in motivo
@@ -0,0 +1,98 @@
+"""Testes do parser de mindmaps Mermaid (backend/services/mermaid_mindmap.py)."""
+
+import pytest
+
+from backend.services.mermaid_mindmap import corrigir_mindmap, parse_mindmap
+
+CANONICO = """mindmap
+  {{**Licitações**}}
+    **Princípios**
+    ::icon(fa fa-book)
+      Legalidade
+    **Modalidades**
+      Pregão"""
+
+
+def _ramos(codigo: str) -> list:
+    mapa = parse_mindmap(codigo)
+    return [filho.texto for filho in mapa.raiz.filhos]
+
+
+def test_mapa_canonico_nao_sofre_correcoes():
+    mapa = parse_mindmap(CANONICO)
+
+    assert mapa.correcoes == []
+    assert mapa.serializar() == CANONICO
+    assert mapa.metricas() == {"profundidade": 2, "num_nos": 5, "ramos_principais": 2, "correcoes": 0}
+
+
+def test_cercas_e_indentacao_impar_sao_corrigidas():
+    codigo = "```mermaid\nmindmap\n   {{**Licitações**}}\n      **Princípios**\n         Legalidade\n```"
+
+    mapa = parse_mindmap(codigo)
+
+    assert mapa.serializar() == "mindmap\n  {{**Licitações**}}\n    **Princípios**\n      Legalidade"
+    assert "Cercas ``` removidas" in mapa.correcoes
+
+
+@pytest.mark.parametrize("ramo, esperado", [
+    ("(Legalidade)", "Legalidade"),
+    ("((Legalidade))", "Legalidade"),
+    ("[Legalidade]", "Legalidade"),
+    ("))Legalidade((", "Legalidade"),
+    ("Princípios (Lei 14.133/21)", "Princípios: Lei 14.133/21"),
+    # Texto antes da forma não é id: o conteúdo inteiro é preservado
+    ("CF(88)", "CF: 88"),
+    ("Art(5º)", "Art: 5º"),
+    ("A[Direito Civil]", "A: Direito Civil"),
+    # Delimitadores que não formam par não são forma
+    ("(a) e (b)", "-a- e: b"),
+    ("Prazo)", "Prazo"),
+])
+def test_formas_e_parenteses_nos_ramos(ramo, esperado):
+    assert _ramos(f"mindmap\n  {{{{Raiz}}}}\n    {ramo}") == [esperado]
+
+
+def test_texto_depois_da_arvore_nao_vira_ramo():
+    codigo = CANONICO + "\n\nEspero que ajude! O mapa cobre os dois temas."
+
+    mapa = parse_mindmap(codigo)
+
+    assert mapa.serializar() == CANONICO
+    assert any("texto após o mapa" in c for c in mapa.correcoes)
+
+
+def test_texto_sem_recuo_colado_na_arvore_encerra_o_mapa():
+    assert _ramos(CANONICO + "\nObservação: revise os prazos.") == ["**Princípios**", "**Modalidades**"]
+
+
+def test_sem_cabecalho_pula_o_preambulo():
+    codigo = "Aqui está o mapa:\n\n{{**Licitações**}}\n  **Princípios**\n    Legalidade"
+
+    mapa = parse_mindmap(codigo)
+
+    assert mapa.raiz.texto == "**Licitações**"
+    assert [f.texto for f in mapa.raiz.filhos] == ["**Princípios**"]
+    assert "Texto antes do mapa removido" in mapa.correcoes
+
+
+def test_sem_cabecalho_nem_titulo_escolhe_a_linha_com_filhos():
+    codigo = "Segue o mapa mental pedido\nLicitações\n  Princípios\n    Legalidade"
+
+    mapa = parse_mindmap(codigo)
+
+    assert mapa.raiz.texto == "Licitações"
+    assert mapa.raiz.filhos[0].texto == "Princípios"
+
+
+def test_no_no_nivel_da_raiz_vai_para_baixo_dela():
+    codigo = "mindmap\n  {{Raiz}}\n  Ramo solto\n    Filho"
+
+    mapa = parse_mindmap(codigo)
+
+    assert [f.texto for f in mapa.raiz.filhos] == ["Ramo solto"]
+    assert any("nível da raiz" in c for c in mapa.correcoes)
+
+
+def test_corrigir_sem_nos_devolve_o_original_sem_cercas():
+    assert corrigir_mindmap("```mermaid\nmindmap\n```") == "mindmap"
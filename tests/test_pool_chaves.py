@@ -0,0 +1,95 @@
+"""Testes do pool de API keys (backend/services/pool_chaves.py)."""
+
+import pytest
+
+from backend.services import pool_chaves as modulo
+from backend.services.pool_chaves import PoolChaves
+
+
+class ErroHTTP(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        self.response = type("Resposta", (), {"status_code": status_code, "headers": headers or {}})()
+
+
+@pytest.fixture(autouse=True)
+def configuracao(monkeypatch):
+    monkeypatch.setattr(modulo.settings, "pool_quarentena_429_segundos", 30.0)
+    monkeypatch.setattr(modulo.settings, "pool_quarentena_auth_segundos", 600.0)
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(modulo.time, "monotonic", lambda: agora[0])
+    return agora
+
+
+def _pool(n=3):
+    return PoolChaves("teste", [f"sk-chave-{i:04d}" for i in range(n)])
+
+
+def test_escolhe_a_menos_carregada():
+    pool = _pool()
+    primeira = pool.escolher()
+
+    with pool.usar(primeira):
+        segunda = pool.escolher()
+        assert segunda is not primeira
+
+        with pool.usar(segunda):
+            assert pool.escolher() not in (primeira, segunda)
+
+    assert primeira.em_andamento == 0
+
+
+def test_desempata_pelo_uso_recente():
+    pool = _pool(2)
+    with pool.usar(pool.chaves[0]):
+        pass
+
+    assert pool.escolher() is pool.chaves[1]
+
+
+def test_429_poe_em_quarentena_e_oferece_alternativa(relogio):
+    pool = _pool(2)
+    chave = pool.chaves[0]
+
+    assert pool.quarentenar_por_erro(chave, ErroHTTP(429, {"retry-after": "12"}))
+    assert pool.escolher() is pool.chaves[1]
+    assert pool.alternativa({chave}) is pool.chaves[1]
+    assert pool.estado()[0]["quarentena_segundos"] == 12.0
+
+    relogio[0] += 13
+    assert not chave.em_quarentena(relogio[0])
+
+
+def test_401_usa_quarentena_longa(relogio):
+    pool = _pool(2)
+    pool.quarentenar_por_erro(pool.chaves[0], ErroHTTP(401))
+
+    assert pool.estado()[0]["quarentena_segundos"] == 600.0
+
+
+def test_erro_de_servidor_nao_e_da_chave():
+    pool = _pool(2)
+
+    assert not pool.quarentenar_por_erro(pool.chaves[0], ErroHTTP(500))
+    assert not pool.chaves[0].em_quarentena(0.0)
+
+
+def test_todas_em_quarentena_devolve_a_que_sai_primeiro(relogio):
+    pool = _pool(2)
+    pool.quarentenar_por_erro(pool.chaves[0], ErroHTTP(401))
+    pool.quarentenar_por_erro(pool.chaves[1], ErroHTTP(429))
+
+    assert pool.escolher() is pool.chaves[1]
+    assert pool.alternativa(set()) is None
+
+
+def test_chave_unica_nao_entra_em_quarentena():
+    pool = _pool(1)
+
+    assert not pool.quarentenar_por_erro(pool.chaves[0], ErroHTTP(429))
+    assert pool.escolher() is pool.chaves[0]
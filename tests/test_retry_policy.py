@@ -0,0 +1,221 @@
+"""Testes da política de retry (backend/services/retry_policy.py)."""
+
+import asyncio
+import inspect
+
+import pytest
+
+from backend.services.retry_policy import (
+    CLIENTE,
+    DESCONHECIDO,
+    RATE_LIMIT,
+    SERVIDOR,
+    TIMEOUT,
+    VALIDACAO,
+    PoliticaRetry,
+    classificar_erro,
+    com_orcamento_job,
+    extrair_retry_after,
+    orcamento_atual,
+    orcamento_job
+)
+from backend.services import retry_policy
+from backend.utils.errors import RateLimitError
+
+
+class ErroHTTP(Exception):
+    def __init__(self, status_code, mensagem="erro", headers=None):
+        super().__init__(mensagem)
+        self.status_code = status_code
+        self.response = type("Resposta", (), {"status_code": status_code, "headers": headers or {}})()
+
+
+# ============================================
+# CLASSIFICAÇÃO
+# ============================================
+
+@pytest.mark.parametrize("status, categoria", [
+    (429, RATE_LIMIT),
+    (408, TIMEOUT),
+    (504, TIMEOUT),
+    (500, SERVIDOR),
+    (503, SERVIDOR),
+    (529, SERVIDOR),
+    (400, CLIENTE),
+    (401, CLIENTE),
+])
+def test_classifica_pelo_status_http(status, categoria):
+    assert classificar_erro(ErroHTTP(status)) == categoria
+
+
+@pytest.mark.parametrize("mensagem, categoria", [
+    ("Error code: 503 - {'error': 'overloaded'}", SERVIDOR),
+    ("HTTP 502 from upstream", SERVIDOR),
+    ("status_code=429", RATE_LIMIT),
+    ("Error code: 400 - invalid request", CLIENTE),
+    ("Service Unavailable", SERVIDOR),
+    ("Request timed out", TIMEOUT),
+    ("Resource exhausted: quota", RATE_LIMIT),
+])
+def test_classifica_pela_mensagem(mensagem, categoria):
+    assert classificar_erro(Exception(mensagem)) == categoria
+
+
+@pytest.mark.parametrize("mensagem", [
+    "Mapa cita o artigo 500 do Código Civil",
+    "Parte com 1503 caracteres",
+    "resposta em 0.502s",
+    "Partes com erro: [429]",
+])
+def test_numeros_soltos_na_mensagem_nao_viram_status(mensagem):
+    assert classificar_erro(Exception(mensagem)) == DESCONHECIDO
+
+
+def test_classifica_erros_da_aplicacao():
+    assert classificar_erro(RateLimitError("openai")) == RATE_LIMIT
+    assert classificar_erro(asyncio.TimeoutError()) == TIMEOUT
+    assert classificar_erro(ValueError("x")) == DESCONHECIDO
+
+    from pydantic import BaseModel
+
+    class Modelo(BaseModel):
+        nota: int
+
+    with pytest.raises(Exception) as erro:
+        Modelo(nota="abc")
+    assert classificar_erro(erro.value) == VALIDACAO
+
+
+# ============================================
+# RETRY-AFTER E BACKOFF
+# ============================================
+
+def test_retry_after_por_header_e_por_texto():
+    assert extrair_retry_after(ErroHTTP(429, headers={"retry-after": "7"})) == 7.0
+    assert extrair_retry_after(ErroHTTP(429, headers={"retry-after-ms": "1500"})) == 1.5
+    assert extrair_retry_after(Exception("Please retry in 2.5s")) == 2.5
+    assert extrair_retry_after(Exception("sem dica")) is None
+
+
+@pytest.mark.parametrize("tentativa, teto", [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (6, 8.0)])
+def test_full_jitter_entre_zero_e_o_teto(tentativa, teto):
+    politica = PoliticaRetry(max_tentativas=10, base=1.0, maximo=8.0)
+    esperas = [politica.calcular_espera(tentativa) for _ in range(300)]
+
+    assert all(0 <= espera <= teto for espera in esperas)
+    # Jitter de verdade: não fica preso perto do teto nem de zero
+    assert min(esperas) < teto * 0.25
+    assert max(esperas) > teto * 0.75
+
+
+def test_rate_limit_espera_ao_menos_metade_do_teto():
+    politica = PoliticaRetry(max_tentativas=10, base=1.0, maximo=8.0)
+    esperas = [politica.calcular_espera(3, ErroHTTP(429)) for _ in range(200)]
+
+    assert all(2.0 <= espera <= 4.0 for espera in esperas)
+
+
+def test_retry_after_prevalece_com_jitter_pequeno():
+    politica = PoliticaRetry(max_tentativas=5, base=1.0, maximo=8.0)
+
+    espera = politica.calcular_espera(1, ErroHTTP(429, headers={"retry-after": "5"}))
+    assert 5.0 <= espera <= 6.0
+
+    # Retry-After acima do máximo é limitado por ele
+    espera = politica.calcular_espera(1, ErroHTTP(429, headers={"retry-after": "120"}))
+    assert 8.0 <= espera <= 9.0
+
+
+def test_deve_retentar_respeita_categoria_e_tentativas():
+    politica = PoliticaRetry(max_tentativas=3)
+
+    assert politica.deve_retentar(ErroHTTP(503), 1)
+    assert not politica.deve_retentar(ErroHTTP(503), 3)
+    assert not politica.deve_retentar(ErroHTTP(400), 1)
+
+
+# ============================================
+# ORÇAMENTO E EXECUÇÃO
+# ============================================
+
+def test_orcamento_do_job_limita_retries():
+    politica = PoliticaRetry(max_tentativas=10)
+
+    with orcamento_job(max_retries=2) as orcamento:
+        assert politica.deve_retentar(ErroHTTP(503), 1)
+        assert politica.deve_retentar(ErroHTTP(503), 1)
+        assert not politica.deve_retentar(ErroHTTP(503), 1)
+        assert orcamento.restantes == 0
+
+    assert orcamento_atual() is None
+
+
+def test_executar_refaz_ate_dar_certo(monkeypatch):
+    monkeypatch.setattr(PoliticaRetry, "calcular_espera", lambda self, *a: 0)
+    chamadas = []
+
+    async def operacao():
+        chamadas.append(1)
+        if len(chamadas) < 3:
+            raise ErroHTTP(503)
+        return "ok"
+
+    resultado = asyncio.run(PoliticaRetry(max_tentativas=3).executar(operacao))
+
+    assert resultado == "ok"
+    assert len(chamadas) == 3
+
+
+def test_executar_propaga_erro_nao_recuperavel():
+    chamadas = []
+
+    async def operacao():
+        chamadas.append(1)
+        raise ErroHTTP(401)
+
+    with pytest.raises(ErroHTTP):
+        asyncio.run(PoliticaRetry(max_tentativas=3).executar(operacao))
+
+    assert len(chamadas) == 1
+
+
+def test_decorator_aplica_o_orcamento_configurado(monkeypatch):
+    monkeypatch.setattr(retry_policy.get_settings(), "retry_orcamento_por_job", 2)
+    politica = PoliticaRetry(max_tentativas=10)
+
+    @com_orcamento_job
+    async def rota():
+        return [politica.deve_retentar(ErroHTTP(503), 1) for _ in range(3)], orcamento_atual()
+
+    decisoes, orcamento = asyncio.run(rota())
+
+    assert decisoes == [True, True, False]
+    assert orcamento.max_retries == 2 and orcamento.restantes == 0
+
+
+def test_decorator_da_um_orcamento_por_chamada():
+    @com_orcamento_job
+    async def rota():
+        orcamento = orcamento_atual()
+        orcamento.consumir()
+        return orcamento
+
+    async def cenario():
+        return await asyncio.gather(rota(), rota())
+
+    a, b = asyncio.run(cenario())
+
+    assert a is not b
+    assert a.usados == b.usados == 1
+
+
+def test_decorator_da_orcamento_proprio_e_preserva_assinatura():
+    @com_orcamento_job
+    async def rota(nome: str, modo: str = "sequencial"):
+        return orcamento_atual()
+
+    orcamento = asyncio.run(rota("x"))
+
+    assert orcamento is not None
+    assert list(inspect.signature(rota).parameters) == ["nome", "modo"]
+    assert orcamento_atual() is None
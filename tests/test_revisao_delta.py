@@ -0,0 +1,51 @@
+"""Testes da re-revisão delta (backend/services/revisao_delta.py)."""
+
+from backend.agents.guias.nodes.revisor_node import AvaliacaoGuia, RevisaoDeltaGuia
+from backend.agents.mapas.nodes.revisor_node import AvaliacaoMapa, RevisaoDeltaMapa
+from backend.services.revisao_delta import aplicar_delta, formatar_problemas
+
+PROBLEMAS = [
+    {"categoria": "cobertura", "gravidade": "alta", "descricao": "Falta o art. 5º", "localizacao": "ramo 2"},
+    {"categoria": "precisao", "gravidade": "media", "descricao": "Prazo errado", "localizacao": "ramo 3"},
+]
+
+REGRESSAO = {"categoria": "alucinacao", "gravidade": "critica", "descricao": "Súmula inexistente", "localizacao": "ramo 4"}
+
+
+def test_formatar_problemas_numera_na_ordem():
+    texto = formatar_problemas(PROBLEMAS)
+
+    assert texto.splitlines() == [
+        "1. [ALTA] cobertura: Falta o art. 5º (local: ramo 2)",
+        "2. [MEDIA] precisao: Prazo errado (local: ramo 3)",
+    ]
+
+
+def test_aplicar_delta_mapa_mantem_nao_corrigidos_e_soma_regressoes():
+    delta = RevisaoDeltaMapa(
+        problemas_corrigidos=[1], regressoes=[REGRESSAO],
+        aprovado=False, nota_geral=6.0, comentario="Ainda há erros."
+    )
+
+    avaliacao = aplicar_delta(delta, PROBLEMAS, AvaliacaoMapa, campo_nota="nota_geral", campo_texto="justificativa")
+
+    assert isinstance(avaliacao, AvaliacaoMapa)
+    assert [p.descricao for p in avaliacao.problemas] == ["Prazo errado", "Súmula inexistente"]
+    assert avaliacao.nota_geral == 6.0
+    assert avaliacao.justificativa.startswith("[Revisão delta] 1/2 problema(s) corrigido(s), 1 regressão(ões).")
+
+
+def test_aplicar_delta_guia_usa_os_campos_do_guia():
+    delta = RevisaoDeltaGuia(
+        problemas_corrigidos=[1, 2], aprovado=True, pontuacao_geral=9.0, comentario="Ok."
+    )
+
+    avaliacao = aplicar_delta(
+        delta, PROBLEMAS, AvaliacaoGuia, campo_nota="pontuacao_geral", campo_texto="observacoes"
+    )
+
+    assert isinstance(avaliacao, AvaliacaoGuia)
+    assert avaliacao.aprovado
+    assert avaliacao.problemas == []
+    assert avaliacao.pontuacao_geral == 9.0
+    assert "2/2" in avaliacao.observacoes
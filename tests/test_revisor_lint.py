@@ -0,0 +1,43 @@
+"""Lint em paralelo com o revisor (backend/agents/mapas/graph_parallel.py)."""
+
+import asyncio
+
+import pytest
+
+from backend.agents.mapas import graph_parallel
+
+
+class _RevisorComErro:
+    async def ainvoke(self, mensagens):
+        await asyncio.sleep(0)
+        raise TimeoutError("revisor caiu")
+
+
+def test_erro_do_revisor_cancela_o_lint(monkeypatch):
+    estado = {}
+
+    async def lintar_lento(tipo, conteudo):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            estado["cancelado"] = True
+            raise
+
+    monkeypatch.setattr(graph_parallel, "lintar", lintar_lento)
+
+    async def cenario():
+        with pytest.raises(TimeoutError):
+            await graph_parallel.revisar_mapa_parte(
+                _RevisorComErro(),
+                {"ramo_direito": "Civil", "topico": "Contratos"},
+                {"titulo": "Parte 1", "conteudo": "texto"},
+                "mindmap\n  root((Contratos))",
+                tentativa=1,
+                max_tentativas=3
+            )
+        await asyncio.sleep(0)
+
+        # Antes de o asyncio.run cancelar as tarefas restantes
+        assert estado.get("cancelado")
+
+    asyncio.run(cenario())
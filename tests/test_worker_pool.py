@@ -0,0 +1,100 @@
+"""Testes do pool de workers (backend/services/worker_pool.py)."""
+
+import asyncio
+
+import pytest
+
+from backend.services.worker_pool import PoolTrabalho, executar_em_pool
+
+
+def test_executar_em_pool_preserva_ordem_e_devolve_excecoes():
+    async def processar(n):
+        await asyncio.sleep(0.001 * (5 - n))
+        if n == 3:
+            raise ValueError("falhou")
+        return n * 10
+
+    resultados = asyncio.run(executar_em_pool(range(5), processar, max_workers=2))
+
+    assert resultados[:3] == [0, 10, 20]
+    assert isinstance(resultados[3], ValueError)
+    assert resultados[4] == 40
+
+
+def test_pool_limita_concorrencia_ao_numero_de_workers():
+    ativos = 0
+    pico = 0
+
+    async def processar(_):
+        nonlocal ativos, pico
+        ativos += 1
+        pico = max(pico, ativos)
+        await asyncio.sleep(0.005)
+        ativos -= 1
+
+    asyncio.run(executar_em_pool(range(20), processar, max_workers=3, coletar=False))
+
+    assert pico == 3
+
+
+def test_callbacks_recebem_resultado_e_progresso():
+    resultados = {}
+    progresso = []
+
+    async def processar(n):
+        return n + 1
+
+    async def rodar():
+        async with PoolTrabalho(
+            processar,
+            max_workers=2,
+            on_resultado=lambda i, item, r: resultados.__setitem__(i, r),
+            on_progresso=lambda feitos, total: progresso.append(feitos),
+            total=4
+        ) as pool:
+            for n in range(4):
+                await pool.adicionar(n)
+
+    asyncio.run(rodar())
+
+    assert resultados == {0: 1, 1: 2, 2: 3, 3: 4}
+    assert progresso == [1, 2, 3, 4]
+
+
+def test_aexit_com_erro_aguarda_workers_cancelados():
+    finalizados = []
+
+    async def rodar():
+        comecou = asyncio.Event()
+
+        async def processar(n):
+            try:
+                comecou.set()
+                await asyncio.sleep(10)
+            finally:
+                await asyncio.sleep(0)
+                finalizados.append(n)
+
+        pool = PoolTrabalho(processar, max_workers=2)
+        with pytest.raises(RuntimeError):
+            async with pool:
+                await pool.adicionar(1)
+                await pool.adicionar(2)
+                await comecou.wait()
+                raise RuntimeError("erro no produtor")
+
+        assert all(worker.done() for worker in pool._workers)
+
+    asyncio.run(rodar())
+
+    assert sorted(finalizados) == [1, 2]
+
+
+def test_adicionar_depois_de_fechar_levanta_erro():
+    async def rodar():
+        pool = PoolTrabalho(lambda n: asyncio.sleep(0), max_workers=1)
+        await pool.fechar()
+        with pytest.raises(RuntimeError):
+            await pool.adicionar(1)
+
+    asyncio.run(rodar())